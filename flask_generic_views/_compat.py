@@ -10,6 +10,7 @@
 """
 
 import sys
+from datetime import timedelta, tzinfo
 
 PY3 = sys.version_info[0] == 3
 
@@ -34,3 +35,25 @@ else:
 
     def iteritems(d, **kw):
         return d.iteritems(**kw)
+
+if PY3:
+    from datetime import timezone
+
+    def fixed_offset(seconds):
+        return timezone(timedelta(seconds=seconds))
+else:
+    class _FixedOffset(tzinfo):
+        def __init__(self, seconds):
+            self._offset = timedelta(seconds=seconds)
+
+        def utcoffset(self, dt):
+            return self._offset
+
+        def tzname(self, dt):
+            return None
+
+        def dst(self, dt):
+            return timedelta(0)
+
+    def fixed_offset(seconds):
+        return _FixedOffset(seconds)
@@ -0,0 +1,722 @@
+"""
+    flask_generic_views.async_sqlalchemy
+    ====================================
+
+    Provides counterparts of the views in :mod:`flask_generic_views.sqlalchemy`
+    that use an SQLAlchemy :class:`~sqlalchemy.ext.asyncio.AsyncSession`
+    instead of the session provided by Flask-SQLAlchemy.
+
+    Requires Python 3.6 and SQLAlchemy 1.4 or later.
+
+    :copyright: (c) 2015 Daniel Knell
+    :license: BSD, see LICENSE for more information.
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+
+from flask import abort, redirect
+from sqlalchemy.sql import func, select
+
+from flask_generic_views import sqlalchemy
+from flask_generic_views.asyncio import (ContextMixin, FormMixin, MethodView,
+                                         ProcessFormView,
+                                         TemplateResponseMixin)
+from flask_generic_views.cache import invalidate_tags
+from flask_generic_views.signals import object_lookup
+from flask_generic_views.sqlalchemy import (_column_values,
+                                            _expired_columns,
+                                            _restore_column_values,
+                                            _shares_connection)
+
+
+class AsyncSessionMixin(object):
+    """Provides the :class:`~sqlalchemy.ext.asyncio.AsyncSession` used by
+    a view, sessions are created from :attr:`session_factory` and closed
+    once the request has been handled.
+
+    .. code-block:: python
+
+        engine = create_async_engine('postgresql+asyncpg://localhost/blog',
+                                     poolclass=NullPool)
+
+        Session = sessionmaker(engine, class_=AsyncSession,
+                               expire_on_commit=False)
+
+        class PostDetailView(DetailView):
+            model = Post
+            session_factory = Session
+
+    Unless the Flask version supports async views itself, each request is
+    handled in a new event loop. Drivers whose connections are bound to an
+    event loop, such as asyncpg, should then not pool connections.
+
+    """
+    session_factory = None
+
+    def __init__(self, **kwargs):
+        self._sessions = []
+
+        super(AsyncSessionMixin, self).__init__(**kwargs)
+
+    async def dispatch_request(self, *args, **kwargs):
+        """Handle the request, closing the sessions from
+        :meth:`create_session` afterwards.
+
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        try:
+            return await super(AsyncSessionMixin, self).dispatch_request(
+                *args, **kwargs)
+        finally:
+            while self._sessions:
+                await self._sessions.pop().close()
+
+    def get_session_factory(self):
+        """Retrieve the callable creating sessions.
+
+        By default returns :attr:`session_factory`.
+
+        :returns: session factory
+        :rtype: sqlalchemy.orm.sessionmaker
+        :raises NotImplementedError: when :attr:`session_factory` is not set
+
+        """
+        if self.session_factory is None:
+            error = ("{0} requires either a definition of 'session_factory' "
+                     "or an implementation of 'get_session_factory()'")
+
+            raise NotImplementedError(error.format(self.__class__.__name__))
+
+        return self.session_factory
+
+    def create_session(self):
+        """Create a session that will be closed once the request has been
+        handled.
+
+        :returns: session
+        :rtype: sqlalchemy.ext.asyncio.AsyncSession
+
+        """
+        session = self.get_session_factory()()
+
+        self._sessions.append(session)
+
+        return session
+
+    def get_session(self):
+        """Retrieve the session used by the view, the first session from
+        :meth:`create_session`.
+
+        :returns: session
+        :rtype: sqlalchemy.ext.asyncio.AsyncSession
+
+        """
+        if not self._sessions:
+            return self.create_session()
+
+        return self._sessions[0]
+
+
+class SingleObjectMixin(AsyncSessionMixin, sqlalchemy.SingleObjectMixin,
+                        ContextMixin):
+    """Provides the ability to retrieve an object based on the current HTTP
+    request using an :class:`~sqlalchemy.ext.asyncio.AsyncSession`.
+
+    :attr:`query` is a :func:`~sqlalchemy.sql.expression.select` statement
+    rather than a :class:`~sqlalchemy.orm.query.Query`, objects are always
+    looked up with a statement so :attr:`use_identity_map`,
+    :attr:`use_lambda_statements` and :attr:`object_cache` are ignored.
+
+    Related objects can not be loaded when first accessed, relationships
+    used by templates should be listed in :attr:`joined_load` or
+    :attr:`selectin_load`.
+
+    """
+
+    def get_model(self):
+        """Retrieve the model used to retrieve the object used by this view.
+
+        By default returns the model selected by :attr:`query` when it's set,
+        otherwise it will return :attr:`model`.
+
+        :returns: model
+        :rtype: flask_sqlalchemy.Model
+
+        """
+        if self.query is not None:
+            return sqlalchemy.model_registry.get_query_model(self.query)
+
+        return self.model
+
+    async def get_object(self):
+        """Retrieve the object used by the view.
+
+        The statement from :meth:`get_query` is filtered using
+        :meth:`get_lookup_filters` and executed in the session from
+        :meth:`get_session`.
+
+        :returns: object
+        :rtype: flask_sqlalchemy.Model
+        :raises werkzeug.exceptions.NotFound: when no result found
+
+        """
+        statement = self.get_query().filter_by(**self.get_lookup_filters())
+
+        result = await self.get_session().execute(statement)
+        obj = result.scalars().one_or_none()
+
+        object_lookup.send(self, lookup='query')
+
+        if obj is None:
+            abort(404)
+
+        return obj
+
+    def get_query(self):
+        """Retrieve the statement used to retrieve the object used by this
+        view.
+
+        By default returns :attr:`query` when it's set, otherwise it will
+        return a statement selecting :attr:`model`, with the loader options
+        from :meth:`get_load_options` applied.
+
+        :returns: statement
+        :rtype: sqlalchemy.sql.expression.Select
+
+        """
+        if self.query is None and self.model is None:
+            error = ("{0} requires either a definition of 'query', 'model', "
+                     "or an implementation of 'get_query()'")
+
+            raise NotImplementedError(error.format(self.__class__.__name__))
+
+        if self.query is not None:
+            statement = self.query
+        else:
+            statement = select(self.model)
+
+        return self.apply_load_options(statement)
+
+
+class BaseDetailView(SingleObjectMixin, MethodView):
+    """Async view class to retrieve an object."""
+
+    async def get(self, **kwargs):
+        """Set :attr:`object` to the result of :meth:`get_object` and
+        create a response using the return value of :meth:`get_context_data()`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object = await self.get_object()
+
+        return await self.create_response(await self.get_context_data())
+
+
+class DetailView(sqlalchemy.SingleObjectTemplateResponseMixin,
+                 TemplateResponseMixin, BaseDetailView):
+    """Async view class to render a given template, with the context
+    containing an object retrieved from the database.
+
+    .. code-block:: python
+
+        class PostDetailView(DetailView):
+            model = Post
+            session_factory = Session
+            joined_load = ('author',)
+
+    """
+
+
+class MultipleObjectMixin(AsyncSessionMixin, sqlalchemy.MultipleObjectMixin,
+                          ContextMixin):
+    """Provides the ability to retrieve a list of objects using an
+    :class:`~sqlalchemy.ext.asyncio.AsyncSession`.
+
+    :attr:`query` is a :func:`~sqlalchemy.sql.expression.select` statement
+    rather than a :class:`~sqlalchemy.orm.query.Query`. Only numbered pages
+    with an exact count are supported, the count and the page are retrieved
+    at the same time in separate sessions when :attr:`concurrent_count` is
+    ``True`` and the database allows it.
+
+    Setting :attr:`pagination_mode`, :attr:`count_strategy`,
+    :attr:`row_mode`, :attr:`yield_per` or :attr:`page_cache` raises a
+    :exc:`RuntimeError` instead of being ignored.
+
+    """
+    concurrent_count = True
+
+    def get_model(self):
+        """Retrieve the model used to retrieve the objects used by this view.
+
+        By default returns the model selected by :attr:`query` when it's set,
+        otherwise it will return :attr:`model`.
+
+        :returns: model
+        :rtype: flask_sqlalchemy.Model
+
+        """
+        if self.query is not None:
+            return sqlalchemy.model_registry.get_query_model(self.query)
+
+        return self.model
+
+    def get_query(self):
+        """Retrieve the statement used to retrieve the objects used by this
+        view.
+
+        By default returns :attr:`query` when it's set, otherwise it will
+        return a statement selecting :attr:`model`, ordered by
+        :meth:`get_order_by` and with the loader options from
+        :meth:`get_load_options` applied.
+
+        :returns: statement
+        :rtype: sqlalchemy.sql.expression.Select
+
+        """
+        if self.query is None and self.model is None:
+            error = ("{0} requires either a definition of 'query', 'model', "
+                     "or an implementation of 'get_query()'")
+
+            raise NotImplementedError(error.format(self.__class__.__name__))
+
+        if self.query is not None:
+            statement = self.query
+        else:
+            statement = select(self.model)
+
+        order_by = self.get_order_by()
+
+        if order_by:
+            statement = statement.order_by(*order_by)
+
+        return self.apply_load_options(statement)
+
+    def get_concurrent_count(self):
+        """Retrieve wether the count is retrieved in a separate session at
+        the same time as the page.
+
+        By default returns :attr:`concurrent_count`.
+
+        :returns: concurrent count
+        :rtype: bool
+
+        """
+        return self.concurrent_count
+
+    def check_options(self):
+        """Check the view does not use options of the synchronous views that
+        are not supported.
+
+        :raises RuntimeError: when :meth:`get_pagination_mode` is not
+                              ``'offset'``, :meth:`get_count_strategy` is not
+                              an ``ExactCount``, or :meth:`get_row_mode`,
+                              :meth:`get_yield_per` or :meth:`get_page_cache`
+                              are set
+
+        """
+        unsupported = [name for name, value in (
+            ('pagination_mode', self.get_pagination_mode() != 'offset'),
+            ('count_strategy',
+             type(self.get_count_strategy()) is not sqlalchemy.ExactCount),
+            ('row_mode', self.get_row_mode()),
+            ('yield_per', self.get_yield_per()),
+            ('page_cache', self.get_page_cache() is not None)) if value]
+
+        if unsupported:
+            error = "{0} does not support '{1}'"
+
+            raise RuntimeError(error.format(self.__class__.__name__,
+                                            "', '".join(unsupported)))
+
+    async def count(self, statement, session):
+        """Count the rows ``statement`` would return.
+
+        :param statement: statement
+        :type statement: sqlalchemy.sql.expression.Select
+        :param session: session
+        :type session: sqlalchemy.ext.asyncio.AsyncSession
+        :returns: count
+        :rtype: int
+
+        """
+        subquery = statement.order_by(None).subquery()
+
+        return await session.scalar(select(func.count()).select_from(subquery))
+
+    async def apply_pagination(self, object_list, per_page, error_out):
+        """Retrieves a 3-item tuple containing (pagination, object_list,
+        is_paginated).
+
+        The ``pagination`` from :meth:`get_pagination`, The ``object_list``
+        paginated with page from :meth:`get_page` and ``per_page``, and
+        wether there is more than one page will be returned.
+
+        When :meth:`get_concurrent_count` is ``True``, and sessions do not
+        share a connection, the total is counted by :meth:`count` in a
+        session from :meth:`create_session` while the page is retrieved.
+
+        :param object_list: statement
+        :type object_list: sqlalchemy.sql.expression.Select
+        :param per_page: items per page
+        :type per_page: int
+        :param error_out: error out
+        :type error_out: bool
+        :returns: pagination instance, object list, is paginated
+        :rtype: tuple
+        :raises werkzeug.exceptions.NotFound: when page number is invalid
+
+        """
+        page = self.get_page(error_out)
+        session = self.get_session()
+
+        statement = object_list.limit(per_page).offset((page - 1) * per_page)
+
+        async def fetch():
+            result = await session.execute(statement)
+
+            return result.scalars().all()
+
+        if self.get_concurrent_count() and \
+                not _shares_connection(session.sync_session.bind):
+            items, total = await asyncio.gather(
+                fetch(), self.count(object_list, self.create_session()))
+        else:
+            items = await fetch()
+            total = await self.count(object_list, session)
+
+        if not items and page != 1 and error_out:
+            abort(404)
+
+        result = self.get_pagination(object_list, page, per_page, total,
+                                     items)
+
+        return (result, result.items, result.pages > 1)
+
+    async def get_context_data(self, **kwargs):
+        """Extends the view context with :attr:`object_list`.
+
+        When the return value of :meth:`get_per_page` is not ``None``, then
+        :attr:`object_list` will be paginated with :meth:`apply_pagination`
+        and the resulting ``pagination``, ``object_list`` and ``is_paginated``
+        will be stored in the view context. Otherwise the result of executing
+        :attr:`object_list` will be stored in ``object_list``, ``pagination``
+        will be ``None``, and ``is_paginated`` will be ``False``.
+
+        A variable named with the result of :meth:`get_context_object_name`
+        containing ``object_list`` will be added to the context.
+
+        :param kwargs: context
+        :type kwargs: dict
+        :returns: context
+        :rtype: dict
+        :raises RuntimeError: when :meth:`check_options` fails
+
+        """
+        self.check_options()
+
+        statement = self.object_list
+
+        per_page = self.get_per_page()
+        error_out = self.get_error_out()
+
+        if per_page:
+            paginated = await self.apply_pagination(statement, per_page,
+                                                    error_out)
+
+            pagination, object_list, is_paginated = paginated
+        else:
+            result = await self.get_session().execute(statement)
+            object_list = result.scalars().all()
+
+            pagination, is_paginated = None, False
+
+        kwargs.setdefault('pagination', pagination)
+        kwargs.setdefault('object_list', object_list)
+        kwargs.setdefault('is_paginated', is_paginated)
+
+        context_object_name = self.get_context_object_name()
+
+        if context_object_name is not None:
+            kwargs.setdefault(context_object_name, object_list)
+
+        # skip the synchronous implementation, which executes the query.
+        return await super(sqlalchemy.MultipleObjectMixin, self) \
+            .get_context_data(**kwargs)
+
+
+class BaseListView(MultipleObjectMixin, MethodView):
+    """Async view class to retrieve a list of objects."""
+
+    async def get(self, **kwargs):
+        """Set :attr:`object_list` to the result of :meth:`get_query` and
+        create a view from the context.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object_list = self.get_query()
+
+        return await self.create_response(await self.get_context_data())
+
+
+class ListView(sqlalchemy.MultipleObjectTemplateResponseMixin,
+               TemplateResponseMixin, BaseListView):
+    """Async view class to render a given template, with the context
+    containing a list of objects retrieved from the database.
+
+    .. code-block:: python
+
+        class PostListView(ListView):
+            model = Post
+            session_factory = Session
+            order_by = (Post.created_at.desc(),)
+            per_page = 20
+
+    """
+
+
+class ModelFormMixin(FormMixin, sqlalchemy.ModelFormMixin, SingleObjectMixin):
+    """Provides facilities for creating and displaying forms for models using
+    an :class:`~sqlalchemy.ext.asyncio.AsyncSession`.
+
+    Generated forms can not contain relationship fields, as their choices
+    would be queried with the session provided by Flask-SQLAlchemy, such
+    fields have to be declared on a :attr:`form_class`.
+
+    """
+
+    def get_form_class(self):
+        """Retrieve the form class to instantiate, see
+        :meth:`flask_generic_views.sqlalchemy.ModelFormMixin.get_form_class`.
+
+        :returns: form class
+        :rtype: type
+        :raises RuntimeError: when :attr:`fields` contains relationships
+
+        """
+        if not self.form_class and self.fields is not None:
+            metadata = sqlalchemy.model_registry.get(self.get_model())
+
+            names = [name for name in self.fields
+                     if name in metadata.mapper.relationships]
+
+            if names:
+                error = ("{0} does not support relationship fields '{1}', "
+                         "use a 'form_class' instead")
+
+                raise RuntimeError(error.format(self.__class__.__name__,
+                                                "', '".join(names)))
+
+        return super(ModelFormMixin, self).get_form_class()
+
+    async def form_valid(self, form):
+        """Creates or updates :attr:`object` from :attr:`model`, persists it to
+        the database and redirects to :meth:`get_success_url`.
+
+        :param form: form instance
+        :type form: flask_wtf.Form
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        session = self.get_session()
+
+        if self.object is None:
+            self.object = self.get_model()()
+            session.add(self.object)
+
+        form.populate_obj(self.object)
+
+        await session.flush()
+
+        expired = _expired_columns(self.object)
+
+        if expired:
+            await session.refresh(self.object, expired)
+
+        values = _column_values(self.object)
+
+        await session.commit()
+
+        _restore_column_values(self.object, values)
+
+        invalidate_tags(self.get_model())
+
+        return await super(ModelFormMixin, self).form_valid(form)
+
+
+class BaseCreateView(ModelFormMixin, ProcessFormView):
+    """Async view class for creating an object."""
+
+    async def get(self, **kwargs):
+        """Set :attr:`object` to ``None`` and create a response using the
+        return value of :meth:`get_context_data()`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object = None
+
+        return await super(BaseCreateView, self).get(**kwargs)
+
+    async def post(self, **kwargs):
+        """Set :attr:`object` to ``None`` and process the form.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object = None
+
+        return await super(BaseCreateView, self).post(**kwargs)
+
+
+class CreateView(sqlalchemy.SingleObjectTemplateResponseMixin,
+                 TemplateResponseMixin, BaseCreateView):
+    """Async view class to display a form for creating an object.
+
+    .. code-block:: python
+
+        post_create = CreateView.as_view('post_create', model=Post,
+                                         session_factory=Session,
+                                         fields=('title', 'body'),
+                                         success_url='/posts/{id}')
+
+    """
+    template_name_suffix = '_form'
+
+
+class BaseUpdateView(ModelFormMixin, ProcessFormView):
+    """Async view class for updating an object."""
+
+    async def get(self, **kwargs):
+        """Set :attr:`object` to the result of :meth:`get_object` and
+        create a response using the return value of :meth:`get_context_data()`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object = await self.get_object()
+
+        return await super(BaseUpdateView, self).get(**kwargs)
+
+    async def post(self, **kwargs):
+        """Set :attr:`object` to the result of :meth:`get_object` and
+        process the form.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object = await self.get_object()
+
+        return await super(BaseUpdateView, self).post(**kwargs)
+
+
+class UpdateView(sqlalchemy.SingleObjectTemplateResponseMixin,
+                 TemplateResponseMixin, BaseUpdateView):
+    """Async view class to display a form for updating an object.
+
+    .. code-block:: python
+
+        post_update = UpdateView.as_view('post_update', model=Post,
+                                         session_factory=Session,
+                                         fields=('title', 'body'),
+                                         success_url='/posts/{id}')
+
+    """
+    template_name_suffix = '_form'
+
+
+class DeletionMixin(sqlalchemy.DeletionMixin):
+    """Handle the DELETE http method using an
+    :class:`~sqlalchemy.ext.asyncio.AsyncSession`.
+
+    Objects are always loaded and deleted by the session, setting
+    :attr:`delete_by_query` or :attr:`passive_deletes` raises a
+    :exc:`RuntimeError` instead of being ignored.
+
+    """
+
+    async def delete(self, **kwargs):
+        """Set :attr:`object` to the result of :meth:`get_object`, delete
+        it from the database and redirect to :meth:`get_success_url`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+        :raises RuntimeError: when :attr:`delete_by_query` or
+                              :attr:`passive_deletes` are set
+
+        """
+        unsupported = [name for name in ('delete_by_query', 'passive_deletes')
+                       if getattr(self, name)]
+
+        if unsupported:
+            error = "{0} does not support '{1}'"
+
+            raise RuntimeError(error.format(self.__class__.__name__,
+                                            "', '".join(unsupported)))
+
+        session = self.get_session()
+
+        self.object = await self.get_object()
+
+        await session.delete(self.object)
+        await session.commit()
+
+        invalidate_tags(self.get_model())
+
+        return redirect(self.get_success_url())
+
+    async def post(self, **kwargs):
+        """Passes all keyword arguments to :meth:`delete`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        return await self.delete(**kwargs)
+
+
+class BaseDeleteView(DeletionMixin, BaseDetailView):
+    """Async view class for deleting an object."""
+    methods = ['GET', 'POST', 'DELETE']
+
+
+class DeleteView(sqlalchemy.SingleObjectTemplateResponseMixin,
+                 TemplateResponseMixin, BaseDeleteView):
+    """Async view class to display a confirmation before deleting an object.
+
+    .. code-block:: python
+
+        post_delete = DeleteView.as_view('post_delete', model=Post,
+                                         session_factory=Session,
+                                         success_url='/posts')
+
+    """
+    template_name_suffix = '_delete'
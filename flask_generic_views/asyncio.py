@@ -0,0 +1,473 @@
+"""
+    flask_generic_views.asyncio
+    ===========================
+
+    Provides counterparts of the views in :mod:`flask_generic_views.core`
+    whose handlers and hooks may be coroutines, for views that spend most of
+    their time waiting on other services.
+
+    Requires Python 3.6 or later.
+
+    :copyright: (c) 2015 Daniel Knell
+    :license: BSD, see LICENSE for more information.
+"""
+
+from __future__ import absolute_import
+
+import asyncio
+from inspect import isawaitable
+
+from flask import abort, current_app, redirect, request
+from flask.signals import template_rendered
+
+from flask_generic_views import core
+
+
+async def _maybe_await(value):
+    """Await ``value`` when it is awaitable, allowing hooks to be either
+    plain methods or coroutines."""
+    if isawaitable(value):
+        return await value
+
+    return value
+
+
+def _run(func, *args, **kwargs):
+    """Call the coroutine function ``func`` and wait for the result.
+
+    Flask versions with support for async views run it themselves, otherwise
+    it runs in a new event loop that is closed afterwards.
+
+    """
+    ensure_sync = getattr(current_app, 'ensure_sync', None)
+
+    if ensure_sync is not None:
+        return ensure_sync(func)(*args, **kwargs)
+
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(func(*args, **kwargs))
+    finally:
+        loop.close()
+
+
+def _jinja_env(app):
+    """Retrieve an overlay of the jinja environment of ``app`` with async
+    mode enabled, created on first use."""
+    env = app.extensions.get('flask_generic_views.jinja_env')
+
+    if env is None:
+        # the overlay needs its own cache, templates compiled for the
+        # synchronous environment can not be rendered asynchronously.
+        try:
+            env = app.jinja_env.overlay(enable_async=True, cache_size=400)
+        except TypeError:
+            import jinja2.asyncsupport  # noqa: F401
+
+            env = app.jinja_env.overlay(cache_size=400)
+            env.is_async = True
+
+        app.extensions['flask_generic_views.jinja_env'] = env
+
+    return env
+
+
+async def _render_template(template_name_or_list, context):
+    """Render a template using jinja's async mode, so awaitables in the
+    context can be awaited by the template.
+
+    :param template_name_or_list: template name or list of names
+    :type template_name_or_list: str or list
+    :param context: context for template
+    :type context: dict
+    :returns: rendered template
+    :rtype: str
+
+    """
+    app = current_app._get_current_object()
+    app.update_template_context(context)
+
+    env = _jinja_env(app)
+    template = env.get_or_select_template(template_name_or_list)
+
+    rv = await template.render_async(context)
+
+    template_rendered.send(app, template=template, context=context)
+
+    return rv
+
+
+class View(core.View):
+    """The base async class-based view.
+
+    Works like :class:`flask_generic_views.core.View` except that
+    :meth:`dispatch_request` is a coroutine.
+
+    .. code-block:: python
+
+        class StatusView(View):
+            async def dispatch_request(self):
+                async with aiohttp.ClientSession() as client:
+                    async with client.get(STATUS_URL) as response:
+                        return await response.text()
+
+        app.add_url_rule('/status', view_func=StatusView.as_view('status'))
+
+    """
+
+    @classmethod
+    def as_view(cls, name, *class_args, **class_kwargs):
+        """Convert the class into a view function that can be used with the
+        routing system, the coroutine returned by :meth:`dispatch_request` is
+        run until complete for each request.
+
+        :param name: endpoint name
+        :type name: str
+        :returns: view function
+        :rtype: collections.Callable
+
+        """
+        def view(*args, **kwargs):
+            self = view.view_class(*class_args, **class_kwargs)
+
+            return _run(self.dispatch_request, *args, **kwargs)
+
+        if cls.decorators:
+            view.__name__ = name
+            view.__module__ = cls.__module__
+
+            for decorator in cls.decorators:
+                view = decorator(view)
+
+        view.view_class = cls
+        view.__name__ = name
+        view.__doc__ = cls.__doc__
+        view.__module__ = cls.__module__
+        view.methods = cls.methods
+
+        if hasattr(cls, 'provide_automatic_options'):
+            view.provide_automatic_options = cls.provide_automatic_options
+
+        return view
+
+    async def dispatch_request(self, *args, **kwargs):
+        """Handle the request, subclasses have to override this method.
+
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        raise NotImplementedError()
+
+
+class MethodView(core.MethodView, View):
+    """Async view class that routes to methods based on HTTP verb, the
+    methods may be coroutines.
+
+    .. code-block:: python
+
+        class GreetingView(MethodView):
+            async def get(self):
+                name = await lookup_name(request.remote_addr)
+
+                return 'Hello {}!'.format(name)
+
+    """
+
+    async def dispatch_request(self, *args, **kwargs):
+        """Call the method named after the HTTP verb of the current request,
+        falling back to ``get`` for ``HEAD`` requests.
+
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        meth = getattr(self, request.method.lower(), None)
+
+        if meth is None and request.method == 'HEAD':
+            meth = getattr(self, 'get', None)
+
+        assert meth is not None, 'Unimplemented method {0!r}'.format(
+            request.method)
+
+        return await _maybe_await(meth(*args, **kwargs))
+
+
+class ContextMixin(core.ContextMixin):
+    """Async handling of view context data, :meth:`get_context_data` is a
+    coroutine and any awaitable values in the context are awaited
+    concurrently.
+
+    .. code-block:: python
+
+        class DashboardMixin(ContextMixin):
+            async def get_context_data(self, **kwargs):
+                if 'weather' not in kwargs:
+                    kwargs['weather'] = fetch_weather()
+
+                if 'news' not in kwargs:
+                    kwargs['news'] = fetch_news()
+
+                return await super().get_context_data(**kwargs)
+
+    The above example will fetch the weather and the news at the same time.
+
+    """
+
+    async def get_context_data(self, **kwargs):
+        """Returns a dictionary representing the view context. Any keyword
+        arguments provided will be included in the returned context, with
+        awaitable values replaced by their results.
+
+        :param kwargs: context
+        :type kwargs: dict
+        :returns: context
+        :rtype: dict
+
+        """
+        kwargs.setdefault('view', self)
+
+        keys = [k for k, v in kwargs.items() if isawaitable(v)]
+
+        if keys:
+            values = await asyncio.gather(*[kwargs[k] for k in keys])
+
+            kwargs.update(zip(keys, values))
+
+        return kwargs
+
+
+class TemplateResponseMixin(core.TemplateResponseMixin):
+    """Creates :class:`~werkzeug.wrappers.Response` instances with a template
+    rendered using jinja's async mode, :meth:`create_response` is a
+    coroutine.
+
+    When :attr:`stream` is ``True`` the template is streamed by the
+    synchronous environment, as the response is sent after the view has
+    returned.
+
+    """
+
+    async def create_response(self, context=None, **kwargs):
+        """Returns a :attr:`response_class` instance containing the rendered
+        template.
+
+        If any keyword arguments are provided, they will be passed to the
+        constructor of the response class.
+
+        :param context: context for template
+        :type context: dict
+        :param kwargs: response keyword arguments
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        kwargs.setdefault('mimetype', self.mimetype)
+
+        template_names = self.get_template_list()
+
+        if self.get_stream():
+            response = core._stream_template(template_names, context)
+        else:
+            response = await _render_template(template_names, context)
+
+        return self.response_class(response, **kwargs)
+
+
+class TemplateView(TemplateResponseMixin, ContextMixin, MethodView):
+    """Renders a given template, with the context containing parameters
+    captured by the URL rule.
+
+    .. code-block:: python
+
+        class AboutView(TemplateView):
+            template_name = 'about.html'
+
+            async def get_context_data(self, **kwargs):
+                kwargs['staff'] = fetch_staff()
+
+                return await super().get_context_data(**kwargs)
+
+    """
+
+    async def get(self, **kwargs):
+        """Handle request and return a template response.
+
+        Any keyword arguments will be passed to the views context.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        context = await self.get_context_data(**kwargs)
+
+        return await self.create_response(context)
+
+
+class RedirectView(core.RedirectView, View):
+    """Redirects to a given URL, :meth:`get_redirect_url` may be a
+    coroutine.
+
+    .. code-block:: python
+
+        class ShortView(RedirectView):
+            endpoint = 'post-detail'
+
+            async def get_redirect_url(self, **kwargs):
+                kwargs['slug'] = await resolve_code(kwargs.pop('code'))
+
+                return super().get_redirect_url(**kwargs)
+
+    """
+
+    async def dispatch_request(self, **kwargs):
+        """Redirect the user to the result of :meth:`get_redirect_url`.
+
+        When the redirect URL is None, a :exc:`~werkzeug.exceptions.Gone`
+        exception will be raised.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        url = await _maybe_await(self.get_redirect_url(**kwargs))
+
+        if url is None:
+            abort(410)
+
+        if self.permanent:
+            return redirect(url, code=301)
+
+        return redirect(url)
+
+
+class FormMixin(core.FormMixin, ContextMixin):
+    """Provides facilities for creating and displaying forms, where
+    :meth:`get_form`, :meth:`get_success_url`, :meth:`form_valid` and
+    :meth:`form_invalid` may be coroutines."""
+
+    async def form_valid(self, form):
+        """Redirects to :meth:`get_success_url`.
+
+        :param form: form instance
+        :type form: flask_wtf.Form
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        return redirect(await _maybe_await(self.get_success_url()))
+
+    async def form_invalid(self, form):
+        """Creates a response using the return value of
+        :meth:`get_context_data()`.
+
+        :param form: form instance
+        :type form: flask_wtf.Form
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        context = await self.get_context_data(form=form)
+
+        return await _maybe_await(self.create_response(context))
+
+    async def get_context_data(self, **kwargs):
+        """Extends the view context with a ``form`` variable containing the
+        return value of :meth:`get_form`.
+
+        :param kwargs: context
+        :type kwargs: dict
+        :returns: context
+        :rtype: dict
+
+        """
+        if 'form' not in kwargs:
+            kwargs['form'] = self.get_form()
+
+        # skip the synchronous implementation, which would call get_form()
+        # even when a form is given.
+        return await super(core.FormMixin, self).get_context_data(**kwargs)
+
+
+class ProcessFormView(MethodView):
+    """Provides basic async HTTP GET and POST processing for forms.
+
+    This class cannot be used directly and should be used with a
+    suitable mixin.
+
+    """
+
+    async def get(self, **kwargs):
+        """Creates a response using the return value of
+        :meth:`get_context_data()`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        context = await self.get_context_data()
+
+        return await _maybe_await(self.create_response(context))
+
+    async def post(self, **kwargs):
+        """Constructs and validates a form.
+
+        When the form is valid :meth:`form_valid` is called, when the form
+        is invalid :meth:`form_invalid` is called.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        form = await _maybe_await(self.get_form())
+
+        if form.validate():
+            return await _maybe_await(self.form_valid(form))
+        else:
+            return await _maybe_await(self.form_invalid(form))
+
+    async def put(self, **kwargs):
+        """Passes all keyword arguments to :meth:`post`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        return await self.post(**kwargs)
+
+
+class BaseFormView(FormMixin, ProcessFormView):
+    """Async view class to process handle forms without response
+    creation."""
+
+
+class FormView(TemplateResponseMixin, BaseFormView):
+    """Async view class to display a :class:`~flask_wtf.Form`. When invalid
+    it shows the form with validation errors, when valid it redirects to a
+    new URL.
+
+    .. code-block:: python
+
+        class ContactView(FormView):
+            form_class = ContactForm
+            success_url = '/thanks'
+            template_name = 'contact.html'
+
+            async def form_valid(self, form):
+                await mailer.send('contact@example.com', form.message.data)
+
+                return await super().form_valid(form)
+
+    """
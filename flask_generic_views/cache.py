@@ -0,0 +1,427 @@
+"""
+    flask_generic_views.cache
+    =========================
+
+    Provides simple process-wide caches used by the generic views to avoid
+    repeating expensive work between requests.
+
+    :copyright: (c) 2015 Daniel Knell
+    :license: BSD, see LICENSE for more information.
+"""
+
+import errno
+import os
+import pickle
+import tempfile
+from collections import OrderedDict, namedtuple
+from hashlib import sha1
+from threading import RLock
+from time import time
+from uuid import uuid4
+from weakref import WeakSet
+
+from flask_generic_views._compat import string_types
+
+CacheInfo = namedtuple('CacheInfo', ('hits', 'misses', 'maxsize', 'currsize'))
+
+
+class LRUCache(object):
+    """A thread-safe mapping with bounded size that discards the least
+    recently used entries first.
+
+    Entries may be given a timeout in seconds, after which they are treated
+    as missing. Lookups are counted so the effectiveness of the cache can be
+    monitored using :meth:`info`.
+
+    .. code-block:: python
+
+        cache = LRUCache(maxsize=2)
+
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('b') is None
+
+    The above example will evict ``b`` as ``a`` was used more recently.
+
+    :param maxsize: maximum number of entries, ``None`` for unbounded
+    :type maxsize: int
+    :param default_timeout: seconds entries are kept, ``None`` for forever
+    :type default_timeout: int
+
+    """
+
+    def __init__(self, maxsize=128, default_timeout=None):
+        self.maxsize = maxsize
+        self.default_timeout = default_timeout
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = RLock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def get(self, key, default=None):
+        """Retrieve the value stored under ``key``, marking it as the most
+        recently used entry.
+
+        :param key: key
+        :type key: collections.Hashable
+        :param default: value to return when the key is missing
+        :type default: object
+        :returns: value
+        :rtype: object
+
+        """
+        with self._lock:
+            try:
+                expires, value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+
+            if expires is not None and expires <= time():
+                self.misses += 1
+                return default
+
+            self._data[key] = (expires, value)
+            self.hits += 1
+
+            return value
+
+    def set(self, key, value, timeout=None):
+        """Store ``value`` under ``key``, evicting the least recently used
+        entry when the cache is full.
+
+        :param key: key
+        :type key: collections.Hashable
+        :param value: value
+        :type value: object
+        :param timeout: seconds to keep the entry, defaults to
+                        :attr:`default_timeout`
+        :type timeout: int
+
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+
+        expires = None if timeout is None else time() + timeout
+
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (expires, value)
+
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove the entry stored under ``key`` when it exists.
+
+        :param key: key
+        :type key: collections.Hashable
+
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove all entries and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Retrieve the cache statistics.
+
+        :returns: hits, misses, maximum size, and current size
+        :rtype: flask_generic_views.cache.CacheInfo
+
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize,
+                             len(self._data))
+
+
+class FileSystemCache(object):
+    """A cache storing each entry as a file in ``directory``, allowing
+    entries to be shared between processes and kept across restarts.
+
+    Entries may be given a timeout in seconds, after which they are treated
+    as missing. Keys must have a stable :func:`repr`, such as strings or
+    tuples of strings, and values must be picklable.
+
+    :param directory: directory to store entries in, created when missing
+    :type directory: str
+    :param default_timeout: seconds entries are kept, ``None`` for forever
+    :type default_timeout: int
+
+    """
+
+    def __init__(self, directory, default_timeout=None):
+        self.directory = directory
+        self.default_timeout = default_timeout
+
+        try:
+            os.makedirs(directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    def _path(self, key):
+        name = sha1(repr(key).encode('utf-8')).hexdigest()
+
+        return os.path.join(self.directory, name)
+
+    def get(self, key, default=None):
+        """Retrieve the value stored under ``key``.
+
+        :param key: key
+        :type key: collections.Hashable
+        :param default: value to return when the key is missing
+        :type default: object
+        :returns: value
+        :rtype: object
+
+        """
+        path = self._path(key)
+
+        try:
+            with open(path, 'rb') as f:
+                expires, value = pickle.load(f)
+        except (IOError, OSError, EOFError, ValueError, pickle.PickleError):
+            return default
+
+        if expires is not None and expires <= time():
+            self.delete(key)
+            return default
+
+        return value
+
+    def set(self, key, value, timeout=None):
+        """Store ``value`` under ``key``, the file is written to a temporary
+        file first so readers never see a partially written entry.
+
+        :param key: key
+        :type key: collections.Hashable
+        :param value: value
+        :type value: object
+        :param timeout: seconds to keep the entry, defaults to
+                        :attr:`default_timeout`
+        :type timeout: int
+
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+
+        expires = None if timeout is None else time() + timeout
+
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((expires, value), f, pickle.HIGHEST_PROTOCOL)
+
+            getattr(os, 'replace', os.rename)(tmp, self._path(key))
+        except Exception:
+            os.remove(tmp)
+            raise
+
+    def delete(self, key):
+        """Remove the entry stored under ``key`` when it exists.
+
+        :param key: key
+        :type key: collections.Hashable
+
+        """
+        try:
+            os.remove(self._path(key))
+        except OSError as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+    def clear(self):
+        """Remove all entries."""
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+
+
+def cache_tag(value):
+    """Retrieve the name of a tag, models and other classes are named after
+    their module and class name, strings are used as is.
+
+    :param value: tag
+    :type value: str or type
+    :returns: tag name
+    :rtype: str
+
+    """
+    if isinstance(value, string_types):
+        return value
+
+    return '{0}.{1}'.format(value.__module__, value.__name__)
+
+
+_tagged_caches = WeakSet()
+
+
+class TaggedCache(object):
+    """Stores entries in a ``backend`` cache along with a list of tags, every
+    entry with a tag can be discarded by invalidating the tag.
+
+    .. code-block:: python
+
+        cache = TaggedCache(LRUCache())
+
+        cache.set('/posts', response, tags=(Post, Author))
+        cache.invalidate(Post)
+
+        assert cache.get('/posts') is None
+
+    Each tag has a version stored in the backend, entries record the versions
+    of their tags when stored and are treated as missing when any have since
+    changed. When the backend is shared between processes, so are
+    invalidations.
+
+    Values computed from data that may change meanwhile should record the
+    versions from before they were computed, so an invalidation in between
+    is not missed.
+
+    .. code-block:: python
+
+        versions = cache.versions((Post,))
+        cache.set('/posts', render_posts(), versions=versions)
+
+    :param backend: cache, defaults to an :class:`LRUCache`
+    :type backend: flask_generic_views.cache.LRUCache
+    :param default_timeout: seconds entries are kept, ``None`` for the
+                            timeout of the backend
+    :type default_timeout: int
+
+    """
+
+    def __init__(self, backend=None, default_timeout=None):
+        self.backend = LRUCache() if backend is None else backend
+        self.default_timeout = default_timeout
+
+        _tagged_caches.add(self)
+
+    def _version(self, tag, create=False):
+        key = ('tag', cache_tag(tag))
+        version = self.backend.get(key)
+
+        if version is None and create:
+            version = uuid4().hex
+            self.backend.set(key, version)
+
+        return version
+
+    def get(self, key, default=None):
+        """Retrieve the value stored under ``key``, when any of its tags have
+        been invalidated since it was stored ``default`` is returned.
+
+        :param key: key
+        :type key: collections.Hashable
+        :param default: value to return when the key is missing
+        :type default: object
+        :returns: value
+        :rtype: object
+
+        """
+        entry = self.backend.get(('entry', key))
+
+        if entry is None:
+            return default
+
+        versions, value = entry
+
+        for tag, version in versions:
+            if self._version(tag) != version:
+                return default
+
+        return value
+
+    def versions(self, tags):
+        """Retrieve the current versions of ``tags``, to be passed to
+        :meth:`set` once the value depending on them has been computed.
+
+        :param tags: models or strings
+        :type tags: list
+        :returns: tag names and versions
+        :rtype: tuple
+
+        """
+        return tuple((cache_tag(t), self._version(t, create=True))
+                     for t in tags)
+
+    def set(self, key, value, tags=(), timeout=None, versions=None):
+        """Store ``value`` under ``key`` tagged with ``tags``.
+
+        :param key: key
+        :type key: collections.Hashable
+        :param value: value
+        :type value: object
+        :param tags: models or strings the value depends on
+        :type tags: list
+        :param timeout: seconds to keep the entry, defaults to
+                        :attr:`default_timeout`
+        :type timeout: int
+        :param versions: tag versions from :meth:`versions` to record
+                         instead of the current versions of ``tags``
+        :type versions: tuple
+
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+
+        if versions is None:
+            versions = self.versions(tags)
+
+        self.backend.set(('entry', key), (versions, value), timeout)
+
+    def delete(self, key):
+        """Remove the entry stored under ``key`` when it exists.
+
+        :param key: key
+        :type key: collections.Hashable
+
+        """
+        self.backend.delete(('entry', key))
+
+    def invalidate(self, *tags):
+        """Discard every entry tagged with any of ``tags``.
+
+        :param tags: models or strings
+        :type tags: list
+
+        """
+        for tag in tags:
+            self.backend.set(('tag', cache_tag(tag)), uuid4().hex)
+
+
+def invalidate_tags(*tags):
+    """Discard every entry tagged with any of ``tags`` from all
+    :class:`TaggedCache` instances.
+
+    :param tags: models or strings
+    :type tags: list
+
+    """
+    for cache in list(_tagged_caches):
+        cache.invalidate(*tags)
+
+
+response_cache = TaggedCache(LRUCache(maxsize=1024))
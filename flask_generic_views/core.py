@@ -9,7 +9,9 @@
     :license: BSD, see LICENSE for more information.
 """
 
-from flask import Response, abort, redirect, render_template, request, url_for
+from flask import (Response, abort, current_app, redirect, render_template,
+                   request, session, stream_with_context, url_for)
+from flask.signals import template_rendered
 from flask.views import MethodView as BaseMethodView
 from flask.views import View as BaseView
 from werkzeug.datastructures import CombinedMultiDict
@@ -17,6 +19,40 @@ from werkzeug.routing import BuildError
 from werkzeug.urls import url_parse
 
 from flask_generic_views._compat import iteritems
+from flask_generic_views.cache import response_cache
+
+
+def _stream_template(template_name_or_list, context):
+    """Render a template as an iterator of strings, sending the
+    :data:`~flask.template_rendered` signal once rendering has finished.
+
+    The template is loaded straight away so a missing template is reported
+    before the response is started, the request context is kept until the
+    iterator is exhausted.
+
+    :param template_name_or_list: template name or list of names
+    :type template_name_or_list: str or list
+    :param context: context for template
+    :type context: dict
+    :returns: rendered template
+    :rtype: collections.Iterator
+
+    """
+    app = current_app._get_current_object()
+    app.update_template_context(context)
+
+    template = app.jinja_env.get_or_select_template(template_name_or_list)
+
+    def generate():
+        stream = template.stream(context)
+        stream.enable_buffering()
+
+        for chunk in stream:
+            yield chunk
+
+        template_rendered.send(app, template=template, context=context)
+
+    return stream_with_context(generate())
 
 
 class View(BaseView):
@@ -126,10 +162,14 @@ class TemplateResponseMixin(object):
 
         app.add_url_rule('/random, view_func=random_view)
 
+    When :attr:`stream` is ``True`` the template is rendered while the
+    response is sent, rather than being rendered into a single string first.
+
     """
     template_name = None
     response_class = Response
     mimetype = None
+    stream = False
 
     def create_response(self, context=None, **kwargs):
         """Returns a :attr:`response_class` instance containing the rendered
@@ -138,6 +178,10 @@ class TemplateResponseMixin(object):
         If any keyword arguments are provided, they will be passed to the
         constructor of the response class.
 
+        When :meth:`get_stream` is ``True`` the response body is an iterator
+        rendering the template in chunks, the response will not have a
+        ``Content-Length`` and is sent using chunked transfer encoding.
+
         :param context: context for template
         :type context: dict
         :param kwargs: response keyword arguments
@@ -150,10 +194,25 @@ class TemplateResponseMixin(object):
 
         template_names = self.get_template_list()
 
-        response = render_template(template_names, **context)
+        if self.get_stream():
+            response = _stream_template(template_names, context)
+        else:
+            response = render_template(template_names, **context)
 
         return self.response_class(response, **kwargs)
 
+    def get_stream(self):
+        """Retrieve wether the template is rendered while the response is
+        sent.
+
+        By default returns :attr:`stream`.
+
+        :returns: stream
+        :rtype: bool
+
+        """
+        return self.stream
+
     def get_template_list(self):
         """Returns a list of template names to use for when rendering the
         template.
@@ -176,6 +235,173 @@ class TemplateResponseMixin(object):
         return [self.template_name]
 
 
+class ResponseCacheMixin(object):
+    """Caches the responses of a view, returning a stored response instead of
+    dispatching the request when one exists.
+
+    .. code-block:: python
+
+        class PostDetailView(ResponseCacheMixin, DetailView):
+            model = Post
+            cache_timeout = 3600
+            cache_tags = (Author,)
+
+    The above example will cache each post page for an hour. Pages are
+    tagged with the model of the view and :attr:`cache_tags`, any change to a
+    post or author through a create, update, or delete view discards the
+    affected pages.
+
+    Only successful ``GET`` and ``HEAD`` requests are cached, responses that
+    are streamed, set cookies, or use the session are never stored.
+
+    """
+    response_cache = response_cache
+    cache_timeout = 300
+    cache_vary_headers = ()
+    cache_tags = ()
+
+    def dispatch_request(self, *args, **kwargs):
+        """Return the cached response for the current request from
+        :meth:`get_response_cache` when it exists, otherwise dispatch the
+        request and store the response when :meth:`is_cacheable`.
+
+        :param args: positional arguments from url rule
+        :type args: list
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return super(ResponseCacheMixin, self)\
+                .dispatch_request(*args, **kwargs)
+
+        cache = self.get_response_cache()
+        key = self.get_cache_key()
+
+        cached = cache.get(key)
+
+        if cached is not None:
+            status, headers, data = cached
+
+            response_class = getattr(self, 'response_class',
+                                     current_app.response_class)
+
+            return response_class(data, status=status, headers=headers)
+
+        response = current_app.make_response(
+            super(ResponseCacheMixin, self).dispatch_request(*args, **kwargs))
+
+        if self.is_cacheable(response):
+            cached = (response.status_code, list(response.headers),
+                      response.get_data())
+
+            cache.set(key, cached, tags=self.get_cache_tags(),
+                      timeout=self.get_cache_timeout())
+
+        return response
+
+    def get_response_cache(self):
+        """Retrieve the :class:`~flask_generic_views.cache.TaggedCache` the
+        responses are stored in.
+
+        By default returns :attr:`response_cache`.
+
+        :returns: cache
+        :rtype: flask_generic_views.cache.TaggedCache
+
+        """
+        return self.response_cache
+
+    def get_cache_key(self):
+        """Retrieve the key the response to the current request is stored
+        under.
+
+        By default the key is made from the view class, the host, path and
+        query-string arguments, the values of the request headers in
+        :attr:`cache_vary_headers`, and :meth:`get_cache_partition`.
+
+        :returns: key
+        :rtype: tuple
+
+        """
+        view = '{0}.{1}'.format(self.__class__.__module__,
+                                self.__class__.__name__)
+
+        return (view, request.host, request.path,
+                tuple(sorted(request.args.items(multi=True))),
+                tuple(request.headers.get(h) for h in self.cache_vary_headers),
+                self.get_cache_partition())
+
+    def get_cache_partition(self):
+        """Retrieve a value that separates cached responses, such as the id
+        of the current user when pages differ for each user.
+
+        By default returns ``None``.
+
+        :returns: partition
+        :rtype: collections.Hashable
+
+        """
+        return None
+
+    def get_cache_tags(self):
+        """Retrieve the models or strings the cached response depends on.
+
+        By default returns :attr:`cache_tags`, along with the model from
+        ``get_model()`` when the view has one.
+
+        :returns: list of tags
+        :rtype: list
+
+        """
+        tags = list(self.cache_tags)
+
+        get_model = getattr(self, 'get_model', None)
+
+        if get_model is not None:
+            model = get_model()
+
+            if model is not None:
+                tags.append(model)
+
+        return tags
+
+    def get_cache_timeout(self):
+        """Retrieve the number of seconds responses are cached for.
+
+        By default returns :attr:`cache_timeout`.
+
+        :returns: timeout
+        :rtype: int
+
+        """
+        return self.cache_timeout
+
+    def is_cacheable(self, response):
+        """Retrieve wether ``response`` can be stored, responses are stored
+        when successful, not streamed, and do not set any cookies.
+
+        Responses are not stored when the view modified or read the
+        :data:`~flask.session`, such as to flash a message or to render a
+        form with a CSRF token, as the session cookie is only added after
+        the view returns. On Flask versions that do not track session reads
+        any non-empty session is treated as read.
+
+        :param response: response
+        :type response: werkzeug.wrappers.Response
+        :returns: cacheable
+        :rtype: bool
+
+        """
+        if session.modified or getattr(session, 'accessed', bool(session)):
+            return False
+
+        return response.status_code == 200 and not response.is_streamed \
+            and 'Set-Cookie' not in response.headers
+
+
 class TemplateView(TemplateResponseMixin, ContextMixin, MethodView):
     """Renders a given template, with the context containing parameters
     captured by the URL rule.
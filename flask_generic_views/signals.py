@@ -0,0 +1,20 @@
+"""
+    flask_generic_views.signals
+    ===========================
+
+    Signals sent by the generic views, allowing applications to instrument
+    how views retrieve their data. Connecting to these signals requires the
+    blinker_ library.
+
+    .. _blinker: https://pythonhosted.org/blinker/
+
+    :copyright: (c) 2015 Daniel Knell
+    :license: BSD, see LICENSE for more information.
+"""
+
+from flask.signals import Namespace
+
+_signals = Namespace()
+
+object_lookup = _signals.signal('object-lookup')
+rows_deleted = _signals.signal('rows-deleted')
@@ -11,25 +11,88 @@
 
 from __future__ import absolute_import
 
-from flask import abort, current_app, redirect, request
-from flask.ext.sqlalchemy import Pagination
+import json
+import random
+import time as _time
+from collections import namedtuple
+from datetime import date, datetime, time
+from decimal import Decimal
+from hashlib import sha1
+from itertools import chain
+from threading import BoundedSemaphore, RLock
+from uuid import UUID
+from weakref import WeakKeyDictionary, WeakSet
+
+from flask import (Response, abort, current_app, g, has_request_context,
+                   redirect, request, stream_with_context)
+from flask import session as flask_session
+from flask.ext.sqlalchemy import Pagination as BasePagination
+from flask.ext.sqlalchemy import SignallingSession
 from flask.ext.wtf import Form
+from flask.sessions import NullSession
 from inflection import underscore
+from itsdangerous import BadData, URLSafeSerializer
+from sqlalchemy import event, orm
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.inspection import inspect
-from sqlalchemy.orm.exc import NoResultFound
+from sqlalchemy.orm.exc import (MultipleResultsFound, NoResultFound,
+                                UnmappedColumnError)
+from sqlalchemy.orm.interfaces import MANYTOONE
+from sqlalchemy.pool import QueuePool, SingletonThreadPool, StaticPool
+from sqlalchemy.sql import and_, func, operators, or_, select, tuple_
+from sqlalchemy.sql.elements import UnaryExpression
+from sqlalchemy.sql.util import find_tables
+from sqlalchemy.types import LargeBinary, Text
+from werkzeug.http import http_date, is_resource_modified
 from werkzeug.local import LocalProxy
+from werkzeug.utils import cached_property
 from wtforms_sqlalchemy.orm import model_form
 
-from flask_generic_views._compat import integer_types
+from flask_generic_views._compat import (fixed_offset, integer_types,
+                                         iteritems, string_types, text_type)
+from flask_generic_views.cache import (CacheInfo, LRUCache, cache_tag,
+                                       invalidate_tags)
 from flask_generic_views.core import (ContextMixin, FormMixin, MethodView,
                                       ProcessFormView, TemplateResponseMixin)
+from flask_generic_views.signals import object_lookup, rows_deleted
 
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # pragma: no cover
+    ThreadPoolExecutor = None
 
-def _touch(obj):
-    """Touches an SQL alchemy object to repopulate __dict__ after a commit."""
-    for k in inspect(obj).attrs.keys():
-        getattr(obj, k, None)
-        break
+try:
+    from sqlalchemy import lambda_stmt
+except ImportError:  # pragma: no cover
+    lambda_stmt = None
+
+
+def _column_values(obj):
+    """Retrieve the loaded column values of an SQLAlchemy object, captured
+    after a flush so they can be restored by :func:`_restore_column_values`
+    once the commit has expired them."""
+    state = inspect(obj)
+
+    return dict((k, state.dict[k]) for k in state.mapper.column_attrs.keys()
+                if k in state.dict)
+
+
+def _expired_columns(obj):
+    """Retrieve the names of the columns of an SQLAlchemy object expired by a
+    flush, those filled by the database through server defaults, triggers or
+    ``onupdate``, leaving out deferred columns."""
+    state = inspect(obj)
+
+    return [prop.key for prop in state.mapper.column_attrs
+            if prop.key in state.expired_attributes and not prop.deferred]
+
+
+def _restore_column_values(obj, values):
+    """Repopulate __dict__ of an SQLAlchemy object after a commit, without
+    the SELECT that accessing an expired attribute would emit."""
+    for key, value in iteritems(values):
+        orm.attributes.set_committed_value(obj, key, value)
 
 
 def _find_session():
@@ -38,727 +101,4196 @@ def _find_session():
 
 session = LocalProxy(_find_session)
 
+form_class_cache = LRUCache(maxsize=256)
 
-class SingleObjectMixin(ContextMixin):
-    """Provides the ability to retrieve an object based on the current HTTP
-    request."""
-    model = None
-    query = None
-    slug_field = 'slug'
-    context_object_name = None
-    slug_view_arg = 'slug'
-    pk_view_arg = 'pk'
-    query_pk_and_slug = False
-
-    def get_model(self):
-        """Retrieve the model used to retrieve the object used by this view.
 
-        By default returns the model associated with :attr:`query` when it's
-        set, otherwise it will return :attr:`model`.
+def _freeze(value):
+    """Convert ``value`` into something hashable for use as a cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in iteritems(value)))
 
-        :returns: model
-        :rtype: flask_sqlalchemy.Model
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
 
-        """
+    return value
 
-        if self.query:
-            return self.query._entities[0].entity_zero.class_
 
-        return self.model
+def get_model_form(model, fields, base_class=Form, **kwargs):
+    """Retrieve a form class for ``model`` containing ``fields``.
 
-    def get_object(self):
-        """Retrieve the object used by the view.
+    Form classes are generated with :func:`wtforms_sqlalchemy.orm.model_form`
+    and stored in :data:`form_class_cache`, so subsequent calls with the same
+    model, fields, base class and options return the same class without
+    reflecting on the model again.
 
-        The :class:`~sqlalchemy.orm.query.Query` object from :meth:`get_query`
-        will be used as a base query for the object.
+    Calling this function while the application is starting will prebuild the
+    form classes used by views.
 
-        When :attr:`pk_view_arg` exists in the current requests
-        :attr:`~flask.Request.view_args` it will be used to filter the query
-        by primary-key.
+    .. code-block:: python
 
-        When :attr:`slug_view_arg` exists in the current requests
-        :attr:`~flask.Request.view_args` and either no primary-key was found
-        or :attr:`query_pk_and_slug` is ``True`` then it will be used to filter
-        the query by :attr:`slug_field`.
+        get_model_form(Post, ('title', 'body'))
 
-        :returns: object
-        :rtype: flask_sqlalchemy.Model
-        :raises werkzeug.exceptions.NotFound: when no result found
+    Any keyword arguments, such as ``field_args`` or ``converter``, will be
+    passed to :func:`~wtforms_sqlalchemy.orm.model_form`.
 
-        """
-        query = self.get_query()
+    :param model: model
+    :type model: flask_sqlalchemy.Model
+    :param fields: names of the model attributes to include
+    :type fields: tuple
+    :param base_class: form class to extend
+    :type base_class: type
+    :param kwargs: model form keyword arguments
+    :type kwargs: dict
+    :returns: form class
+    :rtype: type
 
-        pk = request.view_args.get(self.pk_view_arg)
-        slug = request.view_args.get(self.slug_view_arg)
+    """
+    key = (model, _freeze(fields), base_class, _freeze(kwargs))
 
-        filters = {}
+    form_class = form_class_cache.get(key)
 
-        if pk is None and slug is None:
-            error = ('{0} must be called with either object pk or slug')
+    if form_class is None:
+        form_class = model_form(model, session, base_class, fields, **kwargs)
+        form_class_cache.set(key, form_class)
 
-            raise RuntimeError(error.format(self.__class__.__name__))
+    return form_class
 
-        if pk is not None:
-            model = self.get_model()
-            primary_key = inspect(model).primary_key
 
-            if len(primary_key) > 1:
-                error = ('{0} requires non composite primary key')
+def _passive_relationship(prop):
+    """Wether the database deletes or nullifies the rows related through
+    ``prop`` by itself, as the ORM would have done."""
+    if prop.direction is MANYTOONE:
+        return False
 
-                raise RuntimeError(error.format(self.__class__.__name__))
+    if prop.passive_deletes:
+        return True
 
-            if len(primary_key) == 0:
-                error = ('{0} requires primary key')
+    if prop.secondary is not None or prop.cascade.delete:
+        action = 'CASCADE'
+    else:
+        action = 'SET NULL'
 
-                raise RuntimeError(error.format(self.__class__.__name__))
+    for column, foreign in prop.synchronize_pairs:
+        if not any(fk.column is column and
+                   (fk.ondelete or '').upper() == action
+                   for fk in foreign.foreign_keys):
+            return False
 
-            filters[primary_key[0].key] = pk
+    return bool(prop.synchronize_pairs)
 
-        if slug is not None and (pk is None or self.query_pk_and_slug):
-            slug_field = self.get_slug_field()
 
-            filters[slug_field] = slug
+def _nullified_relationship(prop):
+    """Wether the database nullifies, rather than deletes, the rows related
+    through ``prop`` when it removes them by itself."""
+    if prop.secondary is not None:
+        return False
 
-        try:
-            return query.filter_by(**filters).one()
-        except NoResultFound:
-            abort(404)
+    for column, foreign in prop.synchronize_pairs:
+        for fk in foreign.foreign_keys:
+            if fk.column is column and fk.ondelete:
+                return fk.ondelete.upper() == 'SET NULL'
 
-    def get_query(self):
-        """Retrieve the query used to retrieve the object used by this view.
+    return not prop.cascade.delete
 
-        By default returns :attr:`query` when it's set, otherwise it will
-        return a query for :attr:`model`.
 
-        :returns: query
-        :rtype: sqlalchemy.orm.query.Query
+class ModelMetadata(object):
+    """Information about a model used by the views that does not change
+    between requests.
 
-        """
-        if self.query is None and self.model is None:
-            error = ("{0} requires either a definition of 'query', 'model', "
-                     "or an implementation of 'get_query()'")
+    Names are derived from the model class name, the model ``BlogPost`` would
+    have the :attr:`name` ``blog_post``. Each attribute is computed when it is
+    first accessed.
 
-            raise NotImplementedError(error.format(self.__class__.__name__))
+    :param model: model
+    :type model: flask_sqlalchemy.Model
 
-        if self.query:
-            return self.query
+    """
 
-        return self.model.query
+    def __init__(self, model):
+        self.model = model
+
+    @cached_property
+    def name(self):
+        """The underscored name of the model."""
+        return underscore(self.model.__name__)
+
+    @cached_property
+    def context_object_name(self):
+        """The default context variable name for a single object."""
+        return self.name
+
+    @cached_property
+    def context_list_name(self):
+        """The default context variable name for a list of objects."""
+        return '{0}_list'.format(self.name)
+
+    @cached_property
+    def template_name(self):
+        """The base name used when generating template names."""
+        return self.name
+
+    @cached_property
+    def mapper(self):
+        """The :class:`~sqlalchemy.orm.mapper.Mapper` of the model."""
+        return inspect(self.model)
+
+    @cached_property
+    def primary_key(self):
+        """A :class:`tuple` of the primary-key columns of the model."""
+        return tuple(self.mapper.primary_key)
+
+    @cached_property
+    def columns(self):
+        """A :class:`dict` of the columns of the model, keyed by attribute
+        name."""
+        return dict((prop.key, prop.columns[0])
+                    for prop in self.mapper.column_attrs)
+
+    @cached_property
+    def column_keys(self):
+        """A :class:`tuple` of the names of attributes mapped to columns, in
+        the order they are defined."""
+        return tuple(prop.key for prop in self.mapper.column_attrs)
+
+    @cached_property
+    def large_columns(self):
+        """A :class:`tuple` of the names of attributes mapped to
+        :class:`~sqlalchemy.types.Text` or
+        :class:`~sqlalchemy.types.LargeBinary` columns."""
+        return tuple(key for key, column in sorted(iteritems(self.columns))
+                     if isinstance(column.type, (Text, LargeBinary)))
+
+    @cached_property
+    def delete_relationships(self):
+        """A :class:`tuple` of the names of relationships whose related rows
+        are deleted or nullified when an object is deleted, either by the ORM
+        or by the database."""
+        names = []
+
+        for prop in self.mapper.relationships:
+            if prop.viewonly:
+                continue
+
+            if prop.direction is not MANYTOONE or prop.cascade.delete:
+                names.append(prop.key)
+
+        return tuple(names)
+
+    @cached_property
+    def passive_relationships(self):
+        """A :class:`tuple` of the names of relationships from
+        :attr:`delete_relationships` handled by the database, because they
+        set ``passive_deletes`` or because their foreign keys declare the
+        matching ``ON DELETE CASCADE`` or ``ON DELETE SET NULL`` action."""
+        return tuple(key for key in self.delete_relationships
+                     if _passive_relationship(self.mapper.relationships[key]))
+
+    @cached_property
+    def delete_events(self):
+        """Wether deleting an object has effects handled by the ORM besides
+        its relationships, which is the case for models with a version
+        counter or spread over several tables, and for mappers with
+        ``before_delete`` or ``after_delete`` listeners."""
+        mapper = self.mapper
+
+        if mapper.version_id_col is not None or len(mapper.tables) > 1:
+            return True
+
+        return bool(mapper.dispatch.before_delete or
+                    mapper.dispatch.after_delete)
+
+    @cached_property
+    def delete_cascades(self):
+        """Wether deleting an object has effects handled by the ORM, which
+        requires loading the object rather than deleting its row with a
+        ``DELETE`` statement.
+
+        That is the case when :attr:`delete_relationships` contains
+        relationships not in :attr:`passive_relationships`, or when
+        :attr:`delete_events` is ``True``.
 
-    def get_slug_field(self):
-        """Retrive the name of model field that contains the slug.
+        """
+        return self.delete_events or \
+            set(self.delete_relationships) != set(self.passive_relationships)
 
-        By default it will return :attr:`slug_field`.
+    def slug_column(self, slug_field):
+        """Retrieve the column containing the slug.
 
-        :returns: slug field
-        :rtype: str
+        :param slug_field: name of the model field that contains the slug
+        :type slug_field: str
+        :returns: column, or ``None`` when the field is not a column
+        :rtype: sqlalchemy.schema.Column
 
         """
-        return self.slug_field
-
-    def get_context_object_name(self):
-        """Retrieve the context variable name that :attr:`object` will be
-        stored under.
+        return self.columns.get(slug_field)
 
-        By default it will return :attr:`context_object_name`, falling back
-        to a name based on the model from :attr:`query` or :attr:`model`, the
-        model ``BlogPost`` would have the context object name ``blog_post``.
 
-        :returns: context object name
-        :rtype: str
+class ModelRegistry(object):
+    """Holds a :class:`ModelMetadata` instance for each model, so the
+    metadata is computed once per model rather than once per request.
 
-        """
-        if self.context_object_name:
-            return self.context_object_name
+    .. code-block:: python
 
-        model = self.get_model()
+        model_registry.get(Post).primary_key
 
-        if model:
-            return underscore(model.__name__)
+    The model selected by a view's :attr:`query` is also resolved once per
+    query, see :meth:`get_query_model`.
 
-        return None
+    When models are redefined, such as between tests, stale metadata can be
+    discarded with :meth:`invalidate`.
 
-    def get_context_data(self, **kwargs):
-        """Extends the view context with :attr:`object`.
+    """
 
-        When :attr:`object` is set, an ``object``` variable containing
-        :attr:`object` is added to the context.
+    def __init__(self):
+        self._metadata = {}
+        self._query_models = WeakKeyDictionary()
+        self._lock = RLock()
 
-        A variable named with the result of :meth:`get_context_object_name`
-        containing :attr:`object` will be added to the context.
+    def get(self, model):
+        """Retrieve the metadata for ``model``, computing it on first use.
 
-        :param kwargs: context
-        :type kwargs: dict
-        :returns: context
-        :rtype: dict
+        :param model: model
+        :type model: flask_sqlalchemy.Model
+        :returns: model metadata
+        :rtype: flask_generic_views.sqlalchemy.ModelMetadata
 
         """
-        if hasattr(self, 'object'):
-            kwargs.setdefault('object', self.object)
+        try:
+            return self._metadata[model]
+        except KeyError:
+            with self._lock:
+                return self._metadata.setdefault(model, ModelMetadata(model))
 
-            context_object_name = self.get_context_object_name()
-            if context_object_name:
-                kwargs.setdefault(context_object_name, self.object)
+    def get_query_model(self, query):
+        """Retrieve the model selected first by ``query``, resolving it on
+        first use.
 
-        return super(SingleObjectMixin, self).get_context_data(**kwargs)
+        :param query: sqlalchemy query or select statement
+        :type query: flask_sqlalchemy.BaseQuery
+        :returns: model
+        :rtype: flask_sqlalchemy.Model
 
+        """
+        try:
+            return self._query_models[query]
+        except KeyError:
+            model = query.column_descriptions[0]['entity']
 
-class BaseDetailView(SingleObjectMixin, MethodView):
-    """View class to retrieve an object."""
+            with self._lock:
+                return self._query_models.setdefault(query, model)
 
-    def get(self, **kwargs):
-        """Set :attr:`object` to the result of :meth:`get_object` and
-        create a response using the return value of :meth:`get_context_data()`.
+    def invalidate(self, model=None):
+        """Discard the metadata for ``model``, or for all models when
+        ``model`` is ``None``.
 
-        :param kwargs: keyword arguments from url rule
-        :type kwargs: dict
-        :returns: response
-        :rtype: werkzeug.wrappers.Response
+        :param model: model
+        :type model: flask_sqlalchemy.Model
 
         """
-        self.object = self.get_object()
-        return self.create_response(self.get_context_data())
+        with self._lock:
+            if model is None:
+                self._metadata.clear()
+                self._query_models.clear()
+            else:
+                self._metadata.pop(model, None)
 
+                for query, value in list(self._query_models.items()):
+                    if value is model:
+                        del self._query_models[query]
 
-class SingleObjectTemplateResponseMixin(TemplateResponseMixin):
-    """ Creates :class:`~werkzeug.wrappers.Response` instances with a rendered
-    template based on the given context.
 
-    When no template names are provided, the class will try and generate one
-    based on the model name.
+model_registry = ModelRegistry()
 
-    """
-    template_name_field = None
-    template_name_suffix = '_detail'
 
-    def _format_template_name(self, name):
-        if request.blueprint:
-            prefix = '{0}/'.format(request.blueprint)
-        else:
-            prefix = ''
+def _dump_cursor_value(value):
+    """Convert a column value into a JSON compatible cursor value."""
+    if isinstance(value, datetime):
+        offset = value.utcoffset()
 
-        return '{0}{1}{2}.html'.format(prefix, name, self.template_name_suffix)
+        if offset is not None:
+            offset = offset.days * 86400 + offset.seconds
 
-    def get_template_list(self):
-        """Retrives a list of template names to use for when rendering the
-        template.
+        return ['datetime', [value.year, value.month, value.day, value.hour,
+                             value.minute, value.second, value.microsecond],
+                offset]
 
-        When no
-        :attr:`~flask_generic_views.core.TemplateResponseMixin.template_name`
-        is set then the following will be provided instead:
+    if isinstance(value, date):
+        return ['date', [value.year, value.month, value.day]]
 
-        * the value of the :attr:`template_name_field` field on the model when
-          availible.
+    if isinstance(value, time):
+        return ['time', [value.hour, value.minute, value.second,
+                         value.microsecond]]
 
-        * A template based on :attr:`template_name_suffix`, the model, and the
-          current blueprint. The model ``BlogArticle`` in  blueprint
-          ``blogging`` would generate the template name
-          ``blogging/blog_article_detail.html``, no blueprint would generate
-          ``blog_article_detail.html``
+    if isinstance(value, Decimal):
+        return ['decimal', str(value)]
 
-        :returns: list of template names
-        :rtype: list
+    if isinstance(value, UUID):
+        return ['uuid', value.hex]
 
-        """
-        try:
-            names = super(SingleObjectTemplateResponseMixin, self)\
-                .get_template_list()
-        except NotImplementedError:
-            names = []
-            obj = getattr(self, 'object', None)
+    return value
 
-            if self.template_name_field and obj:
-                name = getattr(obj, self.template_name_field, None)
-                if name:
-                    names.append(name)
 
-            model = self.get_model()
+def _nullable(column):
+    """Retrieve wether the column ordered by in keyset pagination may contain
+    ``NULL`` values."""
+    return getattr(getattr(column, 'expression', column), 'nullable', False)
 
-            if model:
-                name = underscore(model.__name__)
-                names.append(self._format_template_name(name))
 
-            if not names:
-                raise
+def _load_cursor_value(value):
+    """Convert a JSON compatible cursor value back into a column value."""
+    if not isinstance(value, list):
+        return value
 
-        return names
+    if value[0] == 'datetime':
+        result = datetime(*value[1])
 
+        if value[2] is not None:
+            result = result.replace(tzinfo=fixed_offset(value[2]))
 
-class DetailView(SingleObjectTemplateResponseMixin, BaseDetailView):
-    """Renders a given template,, with the context containing an object
-    retrieved from the database.
+        return result
 
-    .. code-block:: python
+    if value[0] == 'date':
+        return date(*value[1])
 
-        class PostDetailView(DetailView):
-            model = Post
+    if value[0] == 'time':
+        return time(*value[1])
 
-            def context_data(self, **kwargs):
-                kwargs.setdefault('now', datetime.now())
+    if value[0] == 'decimal':
+        return Decimal(value[1])
 
-        post_detail = PostDetailView.as_view('post_detail')
+    if value[0] == 'uuid':
+        return UUID(value[1])
 
-        app.add_url_rule('/posts/<pk>', view_func=post_detail)
+    raise ValueError('unknown cursor value {0!r}'.format(value[0]))
 
-    The above example will render the ``post_detail.html`` template from a
-    folder named after the current blueprint, when no blueprint is used it will
-    look in the root template folder. The view context will contain the object
-    as ``object`` and the current date-time as ``now``.
 
-    .. code-block:: python
+def _attribute_key(mapper, column):
+    """Retrieve the name of the model attribute mapped to ``column``."""
+    prop = getattr(column, 'property', None)
 
-        post_detail = DetailView.as_view('post_detail', model=Post)
+    if prop is None:
+        prop = mapper.get_property_by_column(column)
 
-        app.add_url_rule('/post/<pk>', view_func=post_detail)
+    return prop.key
 
-    It can also be used directly in a URL rule to avoid having to create
-    additional classes.
 
-    .. code-block:: jinja
+def _python_value(column, value):
+    """Convert ``value`` to the python type of ``column``.
 
-        {# post_detail.html #}
-        <h1>{{ object.title }}</h1>
-        <p>{{ object.body }}</p>
-        <p>Published: {{ object.published_at }}</p>
-        <p>Date: {{ now }}</p>
+    Booleans, containers, and numbers with a fractional part for integer
+    columns are rejected rather than converted.
+
+    :raises ValueError: when ``value`` can not be converted
 
     """
+    if isinstance(value, (dict, list)):
+        raise ValueError(value)
 
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
 
-class MultipleObjectMixin(ContextMixin):
-    """Provides the ability to retrieve a list of objects based on the current
-    HTTP request.
+    if isinstance(value, bool) and python_type is not bool:
+        raise ValueError(value)
 
-    If :attr:`paginate_by` is specified, the object list will be paginated. You
-    can specify the page number in the URL in one of two ways:
+    if isinstance(value, python_type):
+        return value
 
-    * Pass the page as a view argument in the url rule.
+    try:
+        result = python_type(value)
+    except (TypeError, ValueError, ArithmeticError):
+        raise ValueError(value)
 
-      ::
+    if isinstance(value, (float, Decimal)) and result != value:
+        raise ValueError(value)
 
-          post_list = PostListView.as_view('post_list')
+    return result
 
-          app.add_url_rule('/posts/page/<int:page>', view_func=post_list)
 
-    * Pass the page as a query-string argument in the request url.
+statement_cache = LRUCache(maxsize=512)
 
-      ::
 
-          /posts?page=5
+def _query_key(query):
+    """Retrieve a hashable key identifying the SQL and parameters of
+    ``query``.
 
-    When no page is provided it defaults to 1.
+    When SQLAlchemy can generate a cache key for the statement, the SQL is
+    compiled once per statement structure and kept in
+    :data:`statement_cache`, otherwise it is compiled every time."""
+    statement = query.statement
+    generate = getattr(statement, '_generate_cache_key', None)
+    cache_key = generate() if generate is not None else None
 
-    When :attr:`error_out` is set, a non numeric page number or empty page
-    (other than the first page) will result in a
-    :exc:`~werkzeug.exceptions.NotFound` exception.
+    if cache_key is None:
+        compiled = statement.compile()
+        params = tuple(sorted((k, repr(v))
+                              for k, v in iteritems(compiled.params)))
 
-    """
+        return text_type(compiled), params
 
-    error_out = False
-    query = None
-    model = None
-    per_page = None
-    context_object_name = None
-    pagination_class = Pagination
-    page_arg = 'page'
-    order_by = None
+    sql = statement_cache.get(cache_key.key)
 
-    def get_model(self):
-        """Retrieve the model used to retrieve the object used by this view.
+    if sql is None:
+        sql = text_type(statement.compile())
+        statement_cache.set(cache_key.key, sql)
 
-        By default returns the model associated with :attr:`query` when it's
-        set, otherwise it will return :attr:`model`.
+    params = tuple(repr(p.effective_value) for p in cache_key.bindparams)
 
-        :returns: model
-        :rtype: flask_sqlalchemy.Model
+    return sql, params
 
-        """
-        if self.query:
-            return self.query._entities[0].entity_zero.class_
 
-        return self.model
+def _cursor_serializer():
+    """Retrieve a serializer used to sign keyset pagination cursors."""
+    if not current_app.secret_key:
+        raise RuntimeError('Keyset pagination requires the application '
+                           'secret key to be set')
 
-    def get_page(self, error_out):
-        """Retrieve the current page number.
+    return URLSafeSerializer(current_app.secret_key,
+                             salt='flask-generic-views-cursor')
 
-        The page is first checked for in the view keyword arguments, and then
-        the query-string arguments using the key from :attr:`page_arg`.
 
-        When the value is not a an unsigned integer greater than zero and
-        ``error_out`` is ``True`` then a :exc:`~werkzeug.exceptions.NotFound`
-        exception will be raised. When ``False`` the page will default to 1.
+class Pagination(BasePagination):
+    """Extends :class:`flask_sqlalchemy.Pagination` with :attr:`exact`, which
+    is ``False`` when :attr:`total` is not an exact count, such as a lower
+    bound or a count retrieved from a cache.
 
-        :param error_out: raise error on invalid page number
-        :type error_out: bool
-        :returns: number of items per page
-        :rtype: int
+    .. code-block:: jinja
 
-        """
-        page_arg = self.page_arg
-        page = request.view_args.get(page_arg, request.args.get(page_arg, 1))
+        {{ pagination.total }}{% if not pagination.exact %}+{% endif %} posts
 
-        try:
-            page = int(page)
-        except ValueError:
-            pass
-        finally:
-            if not isinstance(page, integer_types) or page < 1:
-                if error_out:
-                    abort(404)
-                else:
-                    page = 1
+    When the total is not exact, a full page is assumed to have a next page.
 
-        return page
+    """
 
-    def get_query(self):
-        """Retrieve the query used to retrieve the object used by this view.
+    exact = True
 
-        By default returns :attr:`query` when it's set, otherwise it will
-        return a query for :attr:`model`.
+    @property
+    def has_next(self):
+        """``True`` when a next page exists."""
+        if not self.exact and len(self.items) == self.per_page:
+            return True
 
-        :returns: query
-        :rtype: flask_sqlalchemy.BaseQuery
+        return super(Pagination, self).has_next
 
-        """
-        if self.query is None and self.model is None:
-            error = ("{0} requires either a definition of 'query', 'model', "
-                     "or an implementation of 'get_query()'")
 
-            raise NotImplementedError(error.format(self.__class__.__name__))
+row_class_cache = LRUCache(maxsize=256)
 
-        if self.query:
-            query = self.query
-        else:
-            query = self.model.query
 
-        order_by = self.get_order_by()
+def _row_class(names):
+    """Retrieve a named tuple class with a field for each of ``names``, used
+    to keep attribute access to rows after removing extra columns."""
+    row_class = row_class_cache.get(names)
 
-        if order_by:
-            query = query.order_by(*order_by)
+    if row_class is None:
+        row_class = namedtuple('Row', names, rename=True)
+        row_class_cache.set(names, row_class)
 
-        return query
+    return row_class
 
-    def get_order_by(self):
-        """Retrieve a :class:`tuple` of criteria to pass to pass to the query
-        :meth:`~sqlalchemy.orm.query.Query.order_by` method.
 
-        :returns: list of order by criteria
-        :rtype: list
+class CountStrategy(object):
+    """Base class for the strategies used by
+    :class:`MultipleObjectMixin` to retrieve a page and the total number of
+    objects.
 
-        """
-        return self.order_by
+    Subclasses should implement :meth:`count`, or :meth:`paginate` when the
+    page and total can be retrieved together.
 
-    def apply_pagination(self, object_list, per_page, error_out):
-        """Retrieves a 3-item tuple containing (pagination, object_list,
-        is_paginated).
+    """
 
-        The ``pagination`` from :meth:`get_pagination`, The ``object_list``
-        paginated with page from :meth:`get_page` and ``per_page``, and
-        wether there is more than one page will be returned.
+    def paginate(self, query, page, per_page):
+        """Retrieves a 3-item tuple containing (items, total, exact).
 
-        When ``error_out`` is set then a :exc:`~werkzeug.exceptions.NotFound`
-        exception will be raised when the page number is invalid, or refers
-        to an empty page greater than 1.
+        The page is retrieved with ``LIMIT`` and ``OFFSET``, when the first
+        page is not full the total is the number of items on it, otherwise
+        :meth:`count` is used.
 
         :param query: sqlalchemy query
         :type query: flask_sqlalchemy.BaseQuery
+        :param page: page number
+        :type page: int
         :param per_page: items per page
         :type per_page: int
-        :param error_out: error out
-        :type error_out: bool
-        :returns: pagination instance, object list, is paginated
+        :returns: list of objects, total items, wether total is exact
         :rtype: tuple
-        :raises werkzeug.exceptions.NotFound: when page number is invalid
-        """
-        page = self.get_page(error_out)
-
-        items = object_list.limit(per_page).offset((page - 1) * per_page).all()
 
-        if not items and page != 1 and error_out:
-            abort(404)
+        """
+        items = query.limit(per_page).offset((page - 1) * per_page).all()
 
         if page == 1 and len(items) < per_page:
-            total = len(items)
-        else:
-            total = object_list.order_by(None).count()
+            return items, len(items), True
 
-        result = self.get_pagination(
-            object_list, page, per_page, total, items)
+        total, exact = self.count(query)
 
-        return (result, result.items, result.pages > 1)
-
-    def get_per_page(self):
-        """Retrieve the number of items to show per page.
-
-        By default returns :attr:`per_page`.
-
-        :returns: number of items per page
-        :rtype: int
+        return items, total, exact
 
-        """
-        return self.per_page
+    def count(self, query):
+        """Retrieves a 2-item tuple containing (total, exact).
 
-    def get_pagination(self, query, page, per_page, total, items):
-        """
         :param query: sqlalchemy query
         :type query: flask_sqlalchemy.BaseQuery
-        :param page: page number
-        :type page: int
-        :param per_page: items per page
-        :type per_page: int
-        :param total: total items
-        :type total: int
-        :param items: list of objects
-        :type items: list
-        :returns: pagination instance
-        :rtype: flask_sqlalchemy.Pagination
+        :returns: total items, wether total is exact
+        :rtype: tuple
+
         """
-        return self.pagination_class(query, page, per_page, total, items)
+        raise NotImplementedError()
 
-    def get_error_out(self):
-        """Retrive how invalid page numbers or empty pages are handled.
 
-        When ``True`` a :exc:`werkzeug.exceptions.NotFound` will be raised for
-        invalid page numbers or empty pages greater than one.
+class ExactCount(CountStrategy):
+    """Counts the objects with a ``COUNT`` query for every page."""
 
-        When ``False`` invalid page numbers will default to 1 and empty pages
-        will be rendered with an empty ``object_list``.
+    def count(self, query):
+        return query.order_by(None).count(), True
 
-        By default returns :attr:`error_out`.
 
-        :returns: error out
-        :rtype: bool
+class CachedCount(CountStrategy):
+    """Counts the objects with a ``COUNT`` query, storing the result in a
+    cache keyed by the compiled query for ``timeout`` seconds.
 
-        """
-        return self.error_out
+    Totals retrieved from the cache may be up to ``timeout`` seconds old, and
+    are not exact.
 
-    def get_context_object_name(self):
-        """Retrieve the context variable name that :attr:`object` will be
-        stored under.
+    :param timeout: seconds to keep counts
+    :type timeout: int
+    :param maxsize: maximum number of counts to keep
+    :type maxsize: int
 
-        By default it will return :attr:`context_object_name`, falling back
-        to a name based on the model from :attr:`query` or :attr:`model`, the
-        model ``BlogPost`` would have the context object name
-        ``blog_post_list``.
+    """
 
-        :returns: context object name
-        :rtype: str
+    def __init__(self, timeout=60, maxsize=1024):
+        self.cache = LRUCache(maxsize=maxsize, default_timeout=timeout)
 
-        """
-        if self.context_object_name:
-            return self.context_object_name
+    def count(self, query):
+        query = query.order_by(None)
+        key = _query_key(query)
 
-        model = self.get_model()
+        total = self.cache.get(key)
 
-        if model:
-            return '{0}_list'.format(underscore(model.__name__))
+        if total is not None:
+            return total, False
 
-        return None
+        total = query.count()
 
-    def get_context_data(self, **kwargs):
-        """Extends the view context with :attr:`object`.
+        self.cache.set(key, total)
 
-        When the return value of :meth:`get_per_page` is not ``None``, then
-        :attr:`object_list` will be paginated with :meth:`apply_pagination`
-        and the resulting ``pagination``, ``object_list`` and ``is_paginated``
-        will be stored in the view context. Otherwise the result of executing
-        :attr:`object_list` will be stored in ``object_list``, ``pagination``
-        will be ``None``, and ``is_paginated`` will be ``False``.
+        return total, True
 
-        A variable named with the result of :meth:`get_context_object_name`
-        containing ``object_list`` will be added to the context.
 
-        :param kwargs: context
-        :type kwargs: dict
-        :returns: context
-        :rtype: dict
+class WindowCount(CountStrategy):
+    """Retrieves the page and the total with a single query, by adding a
+    ``COUNT(*) OVER ()`` window function column to the page query.
 
-        """
-        query = self.object_list
+    The database must support window functions, when a page past the end is
+    requested a separate ``COUNT`` query is used.
 
-        per_page = self.get_per_page()
-        error_out = self.get_error_out()
+    """
 
-        if per_page:
-            paginated = self.apply_pagination(query, per_page, error_out)
+    def paginate(self, query, page, per_page):
+        names = tuple(d['name'] or '' for d in query.column_descriptions)
 
-            pagination, object_list, is_paginated = paginated
+        rows = query.add_columns(func.count().over()) \
+            .limit(per_page).offset((page - 1) * per_page).all()
+
+        if len(names) == 1:
+            items = [row[0] for row in rows]
         else:
-            pagination, object_list, is_paginated = None, query.all(), False
+            row_class = _row_class(names)
+            items = [row_class(*row[:len(names)]) for row in rows]
 
-        kwargs.setdefault('pagination', pagination)
-        kwargs.setdefault('object_list', object_list)
-        kwargs.setdefault('is_paginated', is_paginated)
+        if rows:
+            return items, rows[0][-1], True
 
-        context_object_name = self.get_context_object_name()
+        if page == 1:
+            return items, 0, True
 
-        if context_object_name is not None:
-            kwargs.setdefault(context_object_name, object_list)
+        return items, query.order_by(None).count(), True
 
-        return super(MultipleObjectMixin, self).get_context_data(**kwargs)
 
+class CappedCount(CountStrategy):
+    """Counts the objects, stopping once ``cap`` objects have been counted.
 
-class BaseListView(MultipleObjectMixin, MethodView):
-    """View class to retrieve a list of objects."""
+    Large tables are counted in bounded time, when there are more than
+    ``cap`` objects the total will be ``cap`` and not exact.
 
-    def get(self, **kwargs):
-        """Set :attr:`object_list` to the result of :meth:`get_query` and
-        create a view from the context.
+    :param cap: maximum number of objects to count
+    :type cap: int
 
-        :param kwargs: keyword arguments from url rule
-        :type kwargs: dict
-        :returns: response
-        :rtype: werkzeug.wrappers.Response
+    """
 
-        """
-        self.object_list = self.get_query()
+    def __init__(self, cap=10000):
+        self.cap = cap
 
-        return self.create_response(self.get_context_data())
+    def count(self, query):
+        total = query.order_by(None).limit(self.cap + 1).count()
 
+        if total > self.cap:
+            return self.cap, False
 
-class MultipleObjectTemplateResponseMixin(TemplateResponseMixin):
-    template_name_suffix = '_list'
+        return total, True
 
-    def _format_template_name(self, name):
-        if request.blueprint:
-            prefix = '{0}/'.format(request.blueprint)
-        else:
-            prefix = ''
 
-        return '{0}{1}{2}.html'.format(prefix, name, self.template_name_suffix)
+def _shares_connection(engine):
+    """Retrieve wether every connection from ``engine`` uses the same
+    database connection, or database, so statements can not run
+    concurrently on separate connections."""
+    if engine is None:
+        return True
 
-    def get_template_list(self):
-        """Retrives a list of template names to use for when rendering the
-        template.
+    if isinstance(engine.pool, (StaticPool, SingletonThreadPool)):
+        return True
 
-        When no
-        :attr:`~flask_generic_views.core.TemplateResponseMixin.template_name`
-        is set then the following will be provided instead:
+    url = engine.url
 
-        * A template based on :attr:`template_name_suffix`, the model, and the
-          current blueprint. The model ``BlogArticle`` in  blueprint
-          ``blogging`` would generate the template name
-          ``blogging/blog_article_list.html``, no blueprint would generate
-          ``blog_article_list.html``
+    return url.get_backend_name() == 'sqlite' and \
+        url.database in (None, '', ':memory:')
 
-        :returns: list of template names
-        :rtype: list
 
-        """
-        try:
-            names = super(MultipleObjectTemplateResponseMixin, self)\
-                .get_template_list()
-        except NotImplementedError:
-            names = []
+def _pool_exhausted(engine, limit=None):
+    """Retrieve wether ``limit`` connections, by default the size of the pool
+    of ``engine``, are checked out, so that checking out another would have
+    to use an overflow connection or wait for one to be returned."""
+    pool = engine.pool
 
-            model = self.get_model()
+    if not isinstance(pool, QueuePool):
+        return False
 
-            if model:
-                name = underscore(model.__name__)
-                names.append(self._format_template_name(name))
+    if limit is None:
+        limit = pool.size()
 
-            if not names:
-                raise
+    if limit <= 0:
+        return False
 
-        return names
+    return pool.checkedout() >= limit
 
 
-class ListView(MultipleObjectTemplateResponseMixin, BaseListView):
-    """Renders a given template,, with the context containing a list of objects
-    retrieved from the database.
+class ConcurrentCount(CountStrategy):
+    """Counts the objects on a second connection from a small thread pool
+    while the page is retrieved, so the time taken is that of the slowest
+    query rather than both.
 
     .. code-block:: python
 
-        class PostListView(DetailView):
+        class PostListView(ListView):
             model = Post
+            per_page = 20
+            count_strategy = ConcurrentCount(max_workers=4)
+
+    The first page is retrieved before counting, so no count is needed when
+    it is not full. The count is retrieved one after the other with the page
+    when the database can not be used from two connections at once, such as
+    an in-memory SQLite database, when ``max_connections`` connections, by
+    default the size of the connection pool, are checked out, when the
+    thread pool has no capacity left, or when the session has changes the
+    second connection would not see.
+
+    :param strategy: strategy used to count, defaults to :class:`ExactCount`
+    :type strategy: flask_generic_views.sqlalchemy.CountStrategy
+    :param max_workers: maximum number of counts run at the same time
+    :type max_workers: int
+    :param max_connections: checked out connections above which counts are
+                            not run concurrently
+    :type max_connections: int
 
-            def context_data(self, **kwargs):
-                kwargs.setdefault('now', datetime.now())
+    """
 
-        post_list = PostDetailView.as_view('post_list')
+    def __init__(self, strategy=None, max_workers=4, max_connections=None):
+        self.strategy = ExactCount() if strategy is None else strategy
+        self.max_workers = max_workers
+        self.max_connections = max_connections
+        self._slots = BoundedSemaphore(max_workers)
+        self._executor = None
+        self._lock = RLock()
 
-        app.add_url_rule('/posts', view_func=post_list)
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers)
 
-    The above example will render the ``post_list.html`` template from a folder
-    named after the current blueprint, when no blueprint is used it will look
-    in the root template folder. The view context will contain the list of
-    objects as ``post_list`` and the current date-time as ``now``.
+            return self._executor
 
-    .. code-block:: python
+    def _count(self, query, bind):
+        try:
+            session = orm.Session(bind=bind)
 
-        post_list = ListView.as_view('post_list', model=Post)
+            try:
+                return self.strategy.count(query.with_session(session))
+            finally:
+                session.close()
+        finally:
+            self._slots.release()
 
-        app.add_url_rule('/posts', view_func=post_list)
+    def submit(self, query):
+        """Start counting the objects of ``query`` on a second connection.
 
-    It can also be used directly in a URL rule to avoid having to create
-    additional classes.
+        The count does not run concurrently when the session of the query
+        has changes, of sessions other than Flask-SQLAlchemy's only unflushed
+        changes are seen.
+
+        :param query: sqlalchemy query
+        :type query: flask_sqlalchemy.BaseQuery
+        :returns: future of the total and wether it is exact, or ``None``
+                  when the count can not run concurrently
+        :rtype: concurrent.futures.Future
+
+        """
+        if ThreadPoolExecutor is None:
+            return None
+
+        session = query.session
+
+        if session.new or session.dirty or session.deleted or \
+                'flask_generic_views.changes' in session.info:
+            return None
+
+        mapper = None
+
+        if query.column_descriptions:
+            entity = query.column_descriptions[0]['entity']
+            mapper = getattr(inspect(entity, raiseerr=False), 'mapper', None)
+
+        bind = session.get_bind(mapper, clause=query.statement)
+
+        if _shares_connection(bind) or \
+                _pool_exhausted(bind, self.max_connections):
+            return None
+
+        if not self._slots.acquire(False):
+            return None
+
+        try:
+            return self._get_executor().submit(self._count, query, bind)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def paginate(self, query, page, per_page):
+        if page == 1:
+            return super(ConcurrentCount, self).paginate(query, page,
+                                                         per_page)
+
+        future = self.submit(query)
+
+        if future is None:
+            return super(ConcurrentCount, self).paginate(query, page,
+                                                         per_page)
+
+        items = query.limit(per_page).offset((page - 1) * per_page).all()
+
+        total, exact = future.result()
+
+        return items, total, exact
+
+    def count(self, query):
+        return self.strategy.count(query)
+
+
+class SimplePagination(object):
+    """The result of pagination without a total, holding the items of the
+    current page and wether a next page exists.
+
+    It provides the same interface as :class:`flask_sqlalchemy.Pagination`
+    for rendering links to the previous and next pages.
+
+    .. code-block:: jinja
+
+        {% if pagination.has_next %}
+          <a href="{{ url_for('post_list', page=pagination.next_num) }}">
+            Next
+          </a>
+        {% endif %}
+
+    :param query: sqlalchemy query
+    :type query: flask_sqlalchemy.BaseQuery
+    :param page: page number
+    :type page: int
+    :param per_page: items per page
+    :type per_page: int
+    :param items: list of objects
+    :type items: list
+    :param has_next: wether a next page exists
+    :type has_next: bool
+
+    """
+
+    total = None
+    pages = None
+
+    def __init__(self, query, page, per_page, items, has_next):
+        self.query = query
+        self.page = page
+        self.per_page = per_page
+        self.items = items
+        self.has_next = has_next
+
+    @property
+    def has_prev(self):
+        """``True`` when a previous page exists."""
+        return self.page > 1
+
+    @property
+    def prev_num(self):
+        """Number of the previous page, or ``None``."""
+        if not self.has_prev:
+            return None
+
+        return self.page - 1
+
+    @property
+    def next_num(self):
+        """Number of the next page, or ``None``."""
+        if not self.has_next:
+            return None
+
+        return self.page + 1
+
+
+class KeysetPagination(object):
+    """The result of keyset pagination, holding the items of the current page
+    and the cursors of the neighbouring pages.
+
+    Cursors are opaque signed strings, to link to a neighbouring page pass the
+    cursor as a query-string argument.
 
     .. code-block:: jinja
 
-        {# post_list.html #}
-        <ul>
-        {% for post in object_list  %}
-          <li>{{ post.title }}</li>
-        {% else %}
-          <li>No posts found.</li>
-        {% endfor %}
-        </ul>
+        {% if pagination.has_next %}
+          <a href="{{ url_for('post_list', cursor=pagination.next_cursor) }}">
+            Next
+          </a>
+        {% endif %}
+
+    :param query: sqlalchemy query
+    :type query: flask_sqlalchemy.BaseQuery
+    :param per_page: items per page
+    :type per_page: int
+    :param items: list of objects
+    :type items: list
+    :param next_cursor: cursor of the next page
+    :type next_cursor: str
+    :param prev_cursor: cursor of the previous page
+    :type prev_cursor: str
+
+    """
+
+    def __init__(self, query, per_page, items, next_cursor, prev_cursor):
+        self.query = query
+        self.per_page = per_page
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        """``True`` when a next page exists."""
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        """``True`` when a previous page exists."""
+        return self.prev_cursor is not None
+
+
+def _loader_option(loader, model, path):
+    """Create a loader option named ``loader`` for ``path``, which is either
+    a relationship attribute or a dotted string of relationship names."""
+    if not isinstance(path, string_types):
+        return getattr(orm, loader)(path)
+
+    option = None
+
+    for name in path.split('.'):
+        attribute = getattr(model, name)
+
+        if option is None:
+            option = getattr(orm, loader)(attribute)
+        else:
+            option = getattr(option, loader)(attribute)
+
+        model = attribute.property.mapper.class_
+
+    return option
+
+
+class LoadOptionsMixin(object):
+    """Provides the ability to declare how related objects are loaded by the
+    query of a view, avoiding a query for each related object accessed while
+    rendering a template.
+
+    .. code-block:: python
+
+        class PostListView(ListView):
+            model = Post
+            joined_load = ('author',)
+            selectin_load = ('comments', 'comments.author')
+
+    The above example will load the author of each post in the same query as
+    the posts, and the comments with their authors in one additional query
+    each.
+
+    Columns that are not needed can also be left out of the query, reducing
+    memory use and the amount of data sent by the database.
+
+    .. code-block:: python
+
+        class PostListView(ListView):
+            model = Post
+            only_columns = ('title', 'created_at')
+
+    The above example will only load the primary-key, ``title`` and
+    ``created_at`` columns, other columns will be loaded when first accessed.
+
+    """
+    joined_load = None
+    selectin_load = None
+    subquery_load = None
+    only_columns = None
+    defer_large_columns = False
+
+    def get_load_options(self):
+        """Retrieve a list of loader options to pass to the query
+        :meth:`~sqlalchemy.orm.query.Query.options` method.
+
+        By default an option is created for each relationship in
+        :attr:`joined_load`, :attr:`selectin_load`, and :attr:`subquery_load`.
+        Relationships may be given as attributes or as strings, nested
+        relationships are separated by a dot.
+
+        When :attr:`only_columns` is set only those columns will be loaded,
+        when :attr:`defer_large_columns` is ``True`` any other
+        :class:`~sqlalchemy.types.Text` or
+        :class:`~sqlalchemy.types.LargeBinary` columns will be deferred.
+
+        :returns: list of loader options
+        :rtype: list
+
+        """
+        loaders = (('joinedload', self.joined_load),
+                   ('selectinload', self.selectin_load),
+                   ('subqueryload', self.subquery_load))
+
+        options = []
+
+        if not any(paths for loader, paths in loaders) and \
+                not self.only_columns and not self.defer_large_columns:
+            return options
+
+        model = self.get_model()
+
+        for loader, paths in loaders:
+            for path in paths or ():
+                options.append(_loader_option(loader, model, path))
+
+        only = [getattr(model, c) if isinstance(c, string_types) else c
+                for c in self.only_columns or ()]
+
+        if only:
+            options.append(orm.load_only(*only))
+
+        if self.defer_large_columns:
+            keys = set(c.key for c in only)
+
+            for key in model_registry.get(model).large_columns:
+                if key not in keys:
+                    options.append(orm.defer(getattr(model, key)))
+
+        return options
+
+    def apply_load_options(self, query):
+        """Apply the options from :meth:`get_load_options` to ``query``.
+
+        :param query: sqlalchemy query
+        :type query: sqlalchemy.orm.query.Query
+        :returns: query
+        :rtype: sqlalchemy.orm.query.Query
+
+        """
+        options = self.get_load_options()
+
+        if options:
+            query = query.options(*options)
+
+        return query
+
+
+def _close_read_sessions(exception=None):
+    sessions = getattr(g, '_flask_generic_views_read_sessions', None)
+
+    while sessions:
+        sessions.popitem()[1].close()
+
+
+def _read_session(bind_key):
+    """Retrieve a session reading from the engine of the Flask-SQLAlchemy
+    bind named ``bind_key``, created once per application context and closed
+    when the context is torn down."""
+    app = current_app._get_current_object()
+
+    if 'flask_generic_views.read_sessions' not in app.extensions:
+        app.teardown_appcontext(_close_read_sessions)
+        app.extensions['flask_generic_views.read_sessions'] = True
+
+    sessions = getattr(g, '_flask_generic_views_read_sessions', None)
+
+    if sessions is None:
+        sessions = g._flask_generic_views_read_sessions = {}
+
+    if bind_key not in sessions:
+        db = app.extensions['sqlalchemy'].db
+        engine = db.get_engine(app, bind=bind_key)
+
+        sessions[bind_key] = orm.Session(bind=engine)
+
+    return sessions[bind_key]
+
+
+def _peek_session(key):
+    """Retrieve ``key`` from the Flask session without marking the session as
+    accessed, which would stop the response from being cached."""
+    current = flask_session._get_current_object()
+
+    if isinstance(current, dict):
+        return dict.get(current, key)
+
+    return current.get(key)
+
+
+class ReadReplicaMixin(object):
+    """Provides the ability to route the queries of read-only requests to a
+    replica database, configured as a Flask-SQLAlchemy bind.
+
+    .. code-block:: python
+
+        app.config['SQLALCHEMY_BINDS'] = {
+            'replica-1': 'postgresql://replica-1/blog',
+            'replica-2': 'postgresql://replica-2/blog',
+        }
+
+        class PostDetailView(DetailView):
+            model = Post
+            read_bind = ('replica-1', 'replica-2')
+
+    The above example will retrieve the post from one of the two replicas for
+    ``GET`` requests. Other requests, such as the ``POST`` of an update or
+    delete view, use the primary database.
+
+    So users see their own changes before they reach the replicas, the
+    requests of a user are routed to the primary database for
+    :attr:`read_your_writes` seconds after any view changed the database on
+    their behalf, such as a create view without a :attr:`read_bind` that
+    redirects to a detail view with one. The time of the change is stored in
+    the Flask :data:`~flask.session` when ``SQLALCHEMY_BINDS`` is
+    configured. It is read without marking the session as accessed, so
+    responses remain cacheable by
+    :class:`~flask_generic_views.core.ResponseCacheMixin`.
+
+    """
+    read_bind = None
+    read_your_writes = 5
+    read_methods = frozenset(['GET', 'HEAD', 'OPTIONS'])
+
+    def get_read_bind(self):
+        """Retrieve the name of the bind the queries of the view are sent to,
+        or ``None`` to use the primary database.
+
+        By default returns :attr:`read_bind`, or a random choice when it's a
+        sequence of names, for requests with a method in
+        :attr:`read_methods` made more than :attr:`read_your_writes` seconds
+        after the last recorded write.
+
+        The result is stored on the view, so every query of a request is sent
+        to the same bind.
+
+        :returns: bind name
+        :rtype: str
+
+        """
+        if hasattr(self, '_read_bind'):
+            return self._read_bind
+
+        read_bind = self.read_bind
+
+        if not read_bind or request.method not in self.read_methods:
+            read_bind = None
+        elif self.read_your_writes:
+            written_at = _peek_session('flask_generic_views.write')
+
+            if written_at is not None and \
+                    _time.time() - written_at < self.read_your_writes:
+                read_bind = None
+
+        if read_bind is not None and not isinstance(read_bind, string_types):
+            read_bind = random.choice(read_bind)
+
+        self._read_bind = read_bind
+
+        return read_bind
+
+    def get_read_session(self):
+        """Retrieve the session used to query the bind from
+        :meth:`get_read_bind`, or ``None`` to use the default session.
+
+        :returns: session
+        :rtype: sqlalchemy.orm.session.Session
+
+        """
+        read_bind = self.get_read_bind()
+
+        if read_bind is None:
+            return None
+
+        return _read_session(read_bind)
+
+    def apply_read_session(self, query):
+        """Bind ``query`` to the session from :meth:`get_read_session` when
+        there is one.
+
+        :param query: sqlalchemy query
+        :type query: sqlalchemy.orm.query.Query
+        :returns: query
+        :rtype: sqlalchemy.orm.query.Query
+
+        """
+        read_session = self.get_read_session()
+
+        if read_session is not None:
+            query = query.with_session(read_session)
+
+        return query
+
+    def record_write(self):
+        """Record that the current user changed the database, routing their
+        requests to the primary database for :attr:`read_your_writes`
+        seconds.
+
+        The write is recorded whether or not the view has a
+        :attr:`read_bind`, as the views reading from replicas may be others.
+        Does nothing when :attr:`read_your_writes` is not set, when the
+        application has no ``SQLALCHEMY_BINDS``, or when sessions are
+        unavailable.
+
+        """
+        if not self.read_your_writes or \
+                not current_app.config.get('SQLALCHEMY_BINDS'):
+            return
+
+        if isinstance(flask_session._get_current_object(), NullSession):
+            return
+
+        flask_session['flask_generic_views.write'] = _time.time()
+
+
+_object_caches = WeakSet()
+
+
+class ObjectCache(object):
+    """Caches the column values of objects retrieved by
+    :meth:`SingleObjectMixin.get_object`, so popular objects can be returned
+    without querying the database.
+
+    .. code-block:: python
+
+        class PostDetailView(DetailView):
+            model = Post
+            object_cache = ObjectCache(maxsize=1000, timeout=60)
+
+    Only the loaded column values of an object are stored, when retrieved
+    they are merged into the session as a persistent object without emitting
+    SQL. Relationships and columns that were not loaded are loaded when
+    first accessed as usual.
+
+    Entries are removed when changes to their object are flushed or committed
+    by the Flask-SQLAlchemy session, changes made by other sessions, with
+    bulk ``UPDATE`` or ``DELETE`` statements or by other processes are only
+    seen once ``timeout`` has passed.
+
+    :param maxsize: maximum number of objects, ``None`` for unbounded
+    :type maxsize: int
+    :param timeout: seconds objects are kept, ``None`` for forever
+    :type timeout: int
+
+    """
+
+    def __init__(self, maxsize=1024, timeout=60):
+        self.backend = LRUCache(maxsize=maxsize, default_timeout=timeout)
+        self.hits = 0
+        self.misses = 0
+        self._lock = RLock()
+
+        _object_caches.add(self)
+
+    @staticmethod
+    def _tag(model):
+        return cache_tag(model_registry.get(model).mapper.base_mapper.class_)
+
+    def get(self, session, model, filters):
+        """Retrieve the object of ``model`` matching ``filters`` merged into
+        ``session``, or ``None`` when it is not cached.
+
+        :param session: session
+        :type session: sqlalchemy.orm.session.Session
+        :param model: model
+        :type model: flask_sqlalchemy.Model
+        :param filters: filters passed to ``filter_by``
+        :type filters: dict
+        :returns: object
+        :rtype: flask_sqlalchemy.Model
+
+        """
+        tag = self._tag(model)
+
+        identity = self.backend.get(('index', tag,
+                                     tuple(sorted(iteritems(filters)))))
+
+        entry = None
+
+        if identity is not None:
+            entry = self.backend.get(('object', tag, identity))
+
+        if entry is not None:
+            cls, keys, values = entry
+            loaded = dict(zip(keys, values))
+
+            metadata = model_registry.get(cls)
+            primary_key = set(_attribute_key(metadata.mapper, c)
+                              for c in metadata.primary_key)
+
+            if not issubclass(cls, model) or \
+                    any(k not in primary_key and loaded.get(k) != v
+                        for k, v in iteritems(filters)):
+                entry = None
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+        obj = metadata.mapper.class_manager.new_instance()
+
+        for key, value in iteritems(loaded):
+            orm.attributes.set_committed_value(obj, key, value)
+
+        orm.make_transient_to_detached(obj)
+
+        return session.merge(obj, load=False)
+
+    def set(self, model, filters, obj):
+        """Store the loaded column values of ``obj``, retrieved from ``model``
+        using ``filters``.
+
+        :param model: model
+        :type model: flask_sqlalchemy.Model
+        :param filters: filters passed to ``filter_by``
+        :type filters: dict
+        :param obj: object
+        :type obj: flask_sqlalchemy.Model
+
+        """
+        state = inspect(obj)
+
+        if state.identity is None or state.modified:
+            return
+
+        tag = self._tag(model)
+
+        cls = type(obj)
+        keys = tuple(k for k in model_registry.get(cls).column_keys
+                     if k in state.dict)
+
+        self.backend.set(('object', tag, state.identity),
+                         (cls, keys, tuple(state.dict[k] for k in keys)))
+        self.backend.set(('index', tag, tuple(sorted(iteritems(filters)))),
+                         state.identity)
+
+    def invalidate(self, model, identity):
+        """Remove the object of ``model`` with the primary-key ``identity``.
+
+        :param model: model
+        :type model: flask_sqlalchemy.Model
+        :param identity: primary-key values
+        :type identity: tuple
+
+        """
+        self.backend.delete(('object', self._tag(model), identity))
+
+    def invalidate_lookup(self, model, filters):
+        """Remove the object of ``model`` stored for ``filters``, used when
+        the object was deleted without being loaded.
+
+        :param model: model
+        :type model: flask_sqlalchemy.Model
+        :param filters: filters passed to ``filter_by``
+        :type filters: dict
+
+        """
+        tag = self._tag(model)
+
+        identity = self.backend.get(('index', tag,
+                                     tuple(sorted(iteritems(filters)))))
+
+        if identity is not None:
+            self.backend.delete(('object', tag, identity))
+
+    def clear(self):
+        """Remove all objects and reset the statistics."""
+        with self._lock:
+            self.backend.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Retrieve the cache statistics.
+
+        :returns: hits, misses, maximum size, and current size
+        :rtype: flask_generic_views.cache.CacheInfo
+
+        """
+        with self._lock:
+            backend = self.backend.info()
+
+            return CacheInfo(self.hits, self.misses, backend.maxsize,
+                             backend.currsize)
+
+
+def _page_format(query):
+    """Retrieve how pages of ``query`` are stored in a page cache, ``'row'``
+    for rows of values, ``'pk'`` for the identities of a single model, or
+    ``None`` when they can not be stored."""
+    descriptions = query.column_descriptions
+    entities = [d for d in descriptions if d['expr'] is d['entity']]
+
+    if not entities:
+        return 'row'
+
+    if len(descriptions) == 1 and isinstance(entities[0]['expr'], type):
+        return 'pk'
+
+    return None
+
+
+def _table_tag(table):
+    """Retrieve the cache tag of ``table``, used to invalidate cached pages
+    when the rows of the table change."""
+    return 'table:{0}'.format(table.fullname)
+
+
+def _invalidate_changes(identities, tables):
+    for cache in list(_object_caches):
+        for model, identity in identities:
+            cache.invalidate(model, identity)
+
+    if tables:
+        invalidate_tags(*[_table_tag(t) for t in tables])
+
+
+def _count_related(model, names, criterion):
+    """Count the rows related through each relationship in ``names`` to the
+    rows of ``model`` matching ``criterion``, returning the counts of rows
+    the database deletes and of rows it nullifies keyed by relationship
+    name."""
+    mapper = model_registry.get(model).mapper
+
+    cascaded = {}
+    nullified = {}
+
+    for name in names:
+        query = session.query(func.count()).select_from(model) \
+            .filter(criterion).join(getattr(model, name))
+
+        if _nullified_relationship(mapper.relationships[name]):
+            nullified[name] = query.scalar()
+        else:
+            cascaded[name] = query.scalar()
+
+    return cascaded, nullified
+
+
+def _delete_rows(model, criterion, passive, by_query):
+    """Delete the rows of ``model`` matching ``criterion``, with a
+    ``DELETE`` statement when ``by_query`` is ``True`` or through the
+    session otherwise.
+
+    The rows are deleted with a query for the model alone, as a ``DELETE``
+    statement can not include the joins of a view query and the session can
+    only delete model instances, so ``criterion`` should only match rows
+    already selected through the view query.
+
+    Returns the number of rows deleted, followed by the numbers of rows
+    related through each relationship in ``passive`` the database deletes
+    and nullifies when deleted by query.
+
+    """
+    query = session.query(model).filter(criterion)
+
+    if not by_query:
+        count = 0
+
+        for obj in query:
+            session.delete(obj)
+            count += 1
+
+        session.flush()
+
+        return count, {}, {}
+
+    cascaded, nullified = _count_related(model, passive, criterion)
+
+    count = query.delete(synchronize_session=False)
+
+    return count, cascaded, nullified
+
+
+def _uses_model_query(view):
+    """Wether ``view`` retrieves its objects with the query for its model
+    built by :class:`SingleObjectMixin` or :class:`MultipleObjectMixin`,
+    rather than a query of its own that may carry criteria, joins or
+    options."""
+    if view.query is not None:
+        return False
+
+    for cls in type(view).__mro__:
+        if 'get_query' in vars(cls):
+            return cls in (SingleObjectMixin, MultipleObjectMixin)
+
+    return False
+
+
+def _pk_query(query, column):
+    """Change ``query`` to select only ``column``, without ordering or eager
+    loading, to find the primary-keys of the rows within its scope."""
+    return query.order_by(None).enable_eagerloads(False).with_entities(column)
+
+
+def _invalidate_lookup(model, filters):
+    """Invalidate cached objects and pages after deleting the object of
+    ``model`` matching ``filters`` with a ``DELETE`` statement, which the
+    session events do not see."""
+    metadata = model_registry.get(model)
+    identities = set()
+
+    if len(metadata.primary_key) == 1:
+        key = _attribute_key(metadata.mapper, metadata.primary_key[0])
+
+        if key in filters:
+            identities.add((model, (filters[key],)))
+
+    for cache in list(_object_caches):
+        cache.invalidate_lookup(model, filters)
+
+    _invalidate_changes(identities, metadata.mapper.tables)
+
+
+# only the sessions of Flask-SQLAlchemy are tracked, other sessions in the
+# process are left alone. Objects are discarded from object caches on flush
+# so the flushing session does not read its own stale objects, cached pages
+# are only discarded once the changes are committed.
+@event.listens_for(SignallingSession, 'after_flush')
+def _after_flush(session, flush_context):
+    identities = set()
+    tables = set()
+
+    for obj in session.new:
+        tables.update(inspect(obj).mapper.tables)
+
+    for obj in chain(session.dirty, session.deleted):
+        state = inspect(obj)
+        tables.update(state.mapper.tables)
+
+        if state.identity is not None:
+            identities.add((type(obj), state.identity))
+
+    _invalidate_changes(identities, ())
+
+    changes = session.info.setdefault('flask_generic_views.changes',
+                                      (set(), set()))
+
+    changes[0].update(identities)
+    changes[1].update(tables)
+
+
+@event.listens_for(SignallingSession, 'after_commit')
+def _after_commit(session):
+    changes = session.info.pop('flask_generic_views.changes', None)
+
+    if changes:
+        _invalidate_changes(*changes)
+
+
+@event.listens_for(SignallingSession, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('flask_generic_views.changes', None)
+
+
+def _lookup_criterion(column, value):
+    """Create a lambda filtering a statement by ``column``, each lambda needs
+    its own closure as SQLAlchemy reads the values of closure variables
+    when the statement is executed."""
+    return lambda s: s.where(column == value)
+
+
+StatementCacheInfo = namedtuple('StatementCacheInfo',
+                                ('hits', 'misses', 'ratio'))
+
+
+class StatementCacheStats(object):
+    """Records how often the SQL of statements executed while handling a
+    request was found in the SQLAlchemy compiled cache, grouped by the class
+    of the view handling the request.
+
+    .. code-block:: python
+
+        statement_cache_stats.enable()
+
+        client.get('/posts/1')
+        client.get('/posts/2')
+
+        statement_cache_stats.info()
+        # {'app.views.PostDetailView': StatementCacheInfo(1, 1, 0.5)}
+
+    The above example will report a miss for the first request, as the
+    statement was compiled, and a hit for the second. Statements executed
+    outside of a request, or by views not created with
+    :meth:`~flask_generic_views.core.View.as_view`, are not recorded.
+
+    Recording is disabled until :meth:`enable` is called. With SQLAlchemy
+    versions before 1.4, which have no compiled cache, every statement is
+    recorded as a miss.
+
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = RLock()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters,
+                              context, executemany):
+        if not has_request_context():
+            return
+
+        view = current_app.view_functions.get(request.endpoint)
+        view_class = getattr(view, 'view_class', None)
+
+        if view_class is None:
+            return
+
+        cache_hit = getattr(context, 'cache_hit', None)
+
+        self.record(view_class, cache_hit is not None and
+                    cache_hit is context.dialect.CACHE_HIT)
+
+    def enable(self):
+        """Start recording statements executed by every engine."""
+        if not event.contains(Engine, 'after_cursor_execute',
+                              self._after_cursor_execute):
+            event.listen(Engine, 'after_cursor_execute',
+                         self._after_cursor_execute)
+
+    def disable(self):
+        """Stop recording statements, keeping the statistics."""
+        if event.contains(Engine, 'after_cursor_execute',
+                          self._after_cursor_execute):
+            event.remove(Engine, 'after_cursor_execute',
+                         self._after_cursor_execute)
+
+    def record(self, view_class, hit):
+        """Record a statement executed by ``view_class``.
+
+        :param view_class: view class or name
+        :type view_class: type or str
+        :param hit: whether the compiled statement was found in the cache
+        :type hit: bool
+
+        """
+        name = cache_tag(view_class)
+
+        with self._lock:
+            hits, misses = self._data.get(name, (0, 0))
+
+            if hit:
+                hits += 1
+            else:
+                misses += 1
+
+            self._data[name] = (hits, misses)
+
+    def clear(self):
+        """Reset the statistics."""
+        with self._lock:
+            self._data.clear()
+
+    def info(self):
+        """Retrieve the statistics of each view class.
+
+        :returns: hits, misses, and the ratio of hits to statements, keyed by
+                  view class name
+        :rtype: dict
+
+        """
+        with self._lock:
+            return dict((name, StatementCacheInfo(hits, misses,
+                                                  hits / float(hits + misses)))
+                        for name, (hits, misses) in iteritems(self._data))
+
+
+statement_cache_stats = StatementCacheStats()
+
+
+class SingleObjectMixin(LoadOptionsMixin, ReadReplicaMixin, ContextMixin):
+    """Provides the ability to retrieve an object based on the current HTTP
+    request."""
+    model = None
+    query = None
+    slug_field = 'slug'
+    context_object_name = None
+    slug_view_arg = 'slug'
+    pk_view_arg = 'pk'
+    query_pk_and_slug = False
+    use_identity_map = False
+    use_lambda_statements = False
+    object_cache = None
+
+    def get_model(self):
+        """Retrieve the model used to retrieve the object used by this view.
+
+        By default returns the model associated with :attr:`query` when it's
+        set, otherwise it will return :attr:`model`.
+
+        :returns: model
+        :rtype: flask_sqlalchemy.Model
+
+        """
+        if self.query:
+            return model_registry.get_query_model(self.query)
+
+        return self.model
+
+    def get_object(self):
+        """Retrieve the object used by the view.
+
+        The :class:`~sqlalchemy.orm.query.Query` object from :meth:`get_query`
+        will be used as a base query for the object.
+
+        The query is filtered using :meth:`get_lookup_filters`, when
+        :attr:`pk_view_arg` exists in the current requests
+        :attr:`~flask.Request.view_args` it will be used to filter the query
+        by primary-key.
+
+        When :attr:`slug_view_arg` exists in the current requests
+        :attr:`~flask.Request.view_args` and either no primary-key was found
+        or :attr:`query_pk_and_slug` is ``True`` then it will be used to filter
+        the query by :attr:`slug_field`.
+
+        When :attr:`use_identity_map` is ``True``, the object is only looked up
+        by primary-key, and the query has no criteria, then
+        :meth:`~sqlalchemy.orm.query.Query.get` will be used, returning an
+        object already present in the session without emitting SQL.
+
+        When :meth:`get_object_cache` is not ``None`` and the query has no
+        criteria, the object is retrieved from the cache when present, and
+        stored in it when not.
+
+        When :attr:`use_lambda_statements` is ``True``, :attr:`query` is not
+        set and :meth:`get_query` is not overridden, the statement from
+        :meth:`get_lookup_statement` is executed in the session of the query
+        instead of filtering the query.
+
+        The :data:`~flask_generic_views.signals.object_lookup` signal is sent
+        with ``lookup`` set to ``'identity'``, ``'cache'`` or ``'query'``
+        depending on how the object was retrieved.
+
+        :returns: object
+        :rtype: flask_sqlalchemy.Model
+        :raises werkzeug.exceptions.NotFound: when no result found
+
+        """
+        query = self.get_query()
+        filters = self.get_lookup_filters()
+
+        pk = request.view_args.get(self.pk_view_arg)
+
+        lookup = 'query'
+
+        if self.use_identity_map and pk is not None and len(filters) == 1 \
+                and query.whereclause is None:
+            try:
+                obj = query.get(list(filters.values())[0])
+            except InvalidRequestError:
+                pass
+            else:
+                lookup = 'identity'
+
+        cache = self.get_object_cache()
+
+        if cache is not None and query.whereclause is not None:
+            cache = None
+
+        if lookup == 'query' and cache is not None:
+            obj = cache.get(query.session, self.get_model(), filters)
+
+            if obj is not None:
+                lookup = 'cache'
+
+        if lookup == 'query':
+            if self.use_lambda_statements and lambda_stmt is not None \
+                    and _uses_model_query(self):
+                statement = self.get_lookup_statement(filters)
+                result = query.session.execute(statement)
+                obj = result.unique().scalars().one_or_none()
+            else:
+                try:
+                    obj = query.filter_by(**filters).one()
+                except NoResultFound:
+                    obj = None
+
+            if obj is not None and cache is not None:
+                cache.set(self.get_model(), filters, obj)
+
+        object_lookup.send(self, lookup=lookup)
+
+        if obj is None:
+            abort(404)
+
+        return obj
+
+    def get_object_cache(self):
+        """Retrieve the :class:`ObjectCache` used to store the object.
+
+        By default returns :attr:`object_cache`.
+
+        :returns: object cache
+        :rtype: flask_generic_views.sqlalchemy.ObjectCache
+
+        """
+        return self.object_cache
+
+    def get_lookup_filters(self):
+        """Retrieve the keyword arguments passed to the query
+        :meth:`~sqlalchemy.orm.query.Query.filter_by` method to find the
+        object, based on the primary-key and slug from the current requests
+        :attr:`~flask.Request.view_args`.
+
+        The primary-key is converted to the python type of the primary-key
+        column, so it matches the identities of objects in the session.
+
+        :returns: filters
+        :rtype: dict
+        :raises RuntimeError: when neither a primary-key or slug is given, or
+                              the model does not have a single primary-key
+                              column
+        :raises werkzeug.exceptions.NotFound: when the primary-key can not be
+                                              converted
+
+        """
+        pk = request.view_args.get(self.pk_view_arg)
+        slug = request.view_args.get(self.slug_view_arg)
+
+        filters = {}
+
+        if pk is None and slug is None:
+            error = ('{0} must be called with either object pk or slug')
+
+            raise RuntimeError(error.format(self.__class__.__name__))
+
+        if pk is not None:
+            model = self.get_model()
+            primary_key = model_registry.get(model).primary_key
+
+            if len(primary_key) > 1:
+                error = ('{0} requires non composite primary key')
+
+                raise RuntimeError(error.format(self.__class__.__name__))
+
+            if len(primary_key) == 0:
+                error = ('{0} requires primary key')
+
+                raise RuntimeError(error.format(self.__class__.__name__))
+
+            try:
+                filters[primary_key[0].key] = _python_value(primary_key[0],
+                                                            pk)
+            except ValueError:
+                abort(404)
+
+        if slug is not None and (pk is None or self.query_pk_and_slug):
+            slug_field = self.get_slug_field()
+
+            filters[slug_field] = slug
+
+        return filters
+
+    def get_lookup_statement(self, filters):
+        """Retrieve a lambda statement selecting the model from
+        :meth:`get_model` matching ``filters``, with the loader options from
+        :meth:`get_load_options` applied.
+
+        The statement is built from lambdas, allowing SQLAlchemy to reuse
+        both the compiled SQL and the statement itself for every request with
+        the same lookup fields, only the values of the filters are extracted
+        each time. Requires SQLAlchemy 1.4 or later.
+
+        :param filters: filters from :meth:`get_lookup_filters`
+        :type filters: dict
+        :returns: statement
+        :rtype: sqlalchemy.sql.lambdas.StatementLambdaElement
+
+        """
+        model = self.get_model()
+        options = tuple(self.get_load_options())
+
+        statement = lambda_stmt(lambda: select(model))
+
+        for key, value in sorted(iteritems(filters)):
+            statement += _lookup_criterion(getattr(model, key), value)
+
+        if options:
+            statement += lambda s: s.options(*options)
+
+        return statement
+
+    def get_query(self):
+        """Retrieve the query used to retrieve the object used by this view.
+
+        By default returns :attr:`query` when it's set, otherwise it will
+        return a query for :attr:`model`, with the loader options from
+        :meth:`get_load_options` applied, bound to the session from
+        :meth:`get_read_session`.
+
+        :returns: query
+        :rtype: sqlalchemy.orm.query.Query
+
+        """
+        if self.query is None and self.model is None:
+            error = ("{0} requires either a definition of 'query', 'model', "
+                     "or an implementation of 'get_query()'")
+
+            raise NotImplementedError(error.format(self.__class__.__name__))
+
+        if self.query:
+            query = self.query
+        else:
+            query = self.model.query
+
+        query = self.apply_load_options(query)
+
+        return self.apply_read_session(query)
+
+    def get_slug_field(self):
+        """Retrive the name of model field that contains the slug.
+
+        By default it will return :attr:`slug_field`.
+
+        :returns: slug field
+        :rtype: str
+
+        """
+        return self.slug_field
+
+    def get_context_object_name(self):
+        """Retrieve the context variable name that :attr:`object` will be
+        stored under.
+
+        By default it will return :attr:`context_object_name`, falling back
+        to a name based on the model from :attr:`query` or :attr:`model`, the
+        model ``BlogPost`` would have the context object name ``blog_post``.
+
+        :returns: context object name
+        :rtype: str
+
+        """
+        if self.context_object_name:
+            return self.context_object_name
+
+        model = self.get_model()
+
+        if model:
+            return model_registry.get(model).context_object_name
+
+        return None
+
+    def get_context_data(self, **kwargs):
+        """Extends the view context with :attr:`object`.
+
+        When :attr:`object` is set, an ``object``` variable containing
+        :attr:`object` is added to the context.
+
+        A variable named with the result of :meth:`get_context_object_name`
+        containing :attr:`object` will be added to the context.
+
+        :param kwargs: context
+        :type kwargs: dict
+        :returns: context
+        :rtype: dict
+
+        """
+        if hasattr(self, 'object'):
+            kwargs.setdefault('object', self.object)
+
+            context_object_name = self.get_context_object_name()
+            if context_object_name:
+                kwargs.setdefault(context_object_name, self.object)
+
+        return super(SingleObjectMixin, self).get_context_data(**kwargs)
+
+
+class BaseDetailView(SingleObjectMixin, MethodView):
+    """View class to retrieve an object."""
+
+    def get(self, **kwargs):
+        """Set :attr:`object` to the result of :meth:`get_object` and
+        create a response using the return value of :meth:`get_context_data()`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object = self.get_object()
+        return self.create_response(self.get_context_data())
+
+
+class SingleObjectTemplateResponseMixin(TemplateResponseMixin):
+    """ Creates :class:`~werkzeug.wrappers.Response` instances with a rendered
+    template based on the given context.
+
+    When no template names are provided, the class will try and generate one
+    based on the model name.
+
+    """
+    template_name_field = None
+    template_name_suffix = '_detail'
+
+    def _format_template_name(self, name):
+        if request.blueprint:
+            prefix = '{0}/'.format(request.blueprint)
+        else:
+            prefix = ''
+
+        return '{0}{1}{2}.html'.format(prefix, name, self.template_name_suffix)
+
+    def get_template_list(self):
+        """Retrives a list of template names to use for when rendering the
+        template.
+
+        When no
+        :attr:`~flask_generic_views.core.TemplateResponseMixin.template_name`
+        is set then the following will be provided instead:
+
+        * the value of the :attr:`template_name_field` field on the model when
+          availible.
+
+        * A template based on :attr:`template_name_suffix`, the model, and the
+          current blueprint. The model ``BlogArticle`` in  blueprint
+          ``blogging`` would generate the template name
+          ``blogging/blog_article_detail.html``, no blueprint would generate
+          ``blog_article_detail.html``
+
+        :returns: list of template names
+        :rtype: list
+
+        """
+        try:
+            names = super(SingleObjectTemplateResponseMixin, self)\
+                .get_template_list()
+        except NotImplementedError:
+            names = []
+            obj = getattr(self, 'object', None)
+
+            if self.template_name_field and obj:
+                name = getattr(obj, self.template_name_field, None)
+                if name:
+                    names.append(name)
+
+            model = self.get_model()
+
+            if model:
+                name = model_registry.get(model).template_name
+                names.append(self._format_template_name(name))
+
+            if not names:
+                raise
+
+        return names
+
+
+class DetailView(SingleObjectTemplateResponseMixin, BaseDetailView):
+    """Renders a given template,, with the context containing an object
+    retrieved from the database.
+
+    .. code-block:: python
+
+        class PostDetailView(DetailView):
+            model = Post
+
+            def context_data(self, **kwargs):
+                kwargs.setdefault('now', datetime.now())
+
+        post_detail = PostDetailView.as_view('post_detail')
+
+        app.add_url_rule('/posts/<pk>', view_func=post_detail)
+
+    The above example will render the ``post_detail.html`` template from a
+    folder named after the current blueprint, when no blueprint is used it will
+    look in the root template folder. The view context will contain the object
+    as ``object`` and the current date-time as ``now``.
+
+    .. code-block:: python
+
+        post_detail = DetailView.as_view('post_detail', model=Post)
+
+        app.add_url_rule('/post/<pk>', view_func=post_detail)
+
+    It can also be used directly in a URL rule to avoid having to create
+    additional classes.
+
+    .. code-block:: jinja
+
+        {# post_detail.html #}
+        <h1>{{ object.title }}</h1>
+        <p>{{ object.body }}</p>
+        <p>Published: {{ object.published_at }}</p>
+        <p>Date: {{ now }}</p>
+
+    """
+
+
+class MultipleObjectMixin(LoadOptionsMixin, ReadReplicaMixin,
+                          ContextMixin):
+    """Provides the ability to retrieve a list of objects based on the current
+    HTTP request.
+
+    If :attr:`paginate_by` is specified, the object list will be paginated. You
+    can specify the page number in the URL in one of two ways:
+
+    * Pass the page as a view argument in the url rule.
+
+      ::
+
+          post_list = PostListView.as_view('post_list')
+
+          app.add_url_rule('/posts/page/<int:page>', view_func=post_list)
+
+    * Pass the page as a query-string argument in the request url.
+
+      ::
+
+          /posts?page=5
+
+    When no page is provided it defaults to 1.
+
+    When :attr:`error_out` is set, a non numeric page number or empty page
+    (other than the first page) will result in a
+    :exc:`~werkzeug.exceptions.NotFound` exception.
+
+    When :attr:`pagination_mode` is ``'simple'`` the number of pages is not
+    counted, only wether a next page exists.
+
+    When :attr:`pagination_mode` is ``'keyset'`` pages are instead found by
+    seeking past the ordering values of the last row of the previous page,
+    which remains fast for deep pages. The position is passed as an opaque
+    cursor in the query-string argument named by :attr:`cursor_arg`. ``NULL``
+    values of nullable columns are ordered after all other values, or before
+    them when descending.
+
+    ::
+
+        /posts?cursor=WyJuIiwgWzQyXV0.8k7...
+
+    When :attr:`row_mode` is ``True`` the object list contains read-only
+    rows with an attribute for each column, skipping the cost of creating
+    model instances and tracking them in the session.
+
+    """
+
+    error_out = False
+    query = None
+    model = None
+    per_page = None
+    context_object_name = None
+    pagination_class = Pagination
+    page_arg = 'page'
+    order_by = None
+    count_strategy = ExactCount()
+    pagination_mode = 'offset'
+    cursor_arg = 'cursor'
+    simple_pagination_class = SimplePagination
+    keyset_pagination_class = KeysetPagination
+    row_mode = False
+    yield_per = None
+    page_cache = None
+
+    def get_model(self):
+        """Retrieve the model used to retrieve the object used by this view.
+
+        By default returns the model associated with :attr:`query` when it's
+        set, otherwise it will return :attr:`model`.
+
+        :returns: model
+        :rtype: flask_sqlalchemy.Model
+
+        """
+        if self.query:
+            return model_registry.get_query_model(self.query)
+
+        return self.model
+
+    def get_page(self, error_out):
+        """Retrieve the current page number.
+
+        The page is first checked for in the view keyword arguments, and then
+        the query-string arguments using the key from :attr:`page_arg`.
+
+        When the value is not a an unsigned integer greater than zero and
+        ``error_out`` is ``True`` then a :exc:`~werkzeug.exceptions.NotFound`
+        exception will be raised. When ``False`` the page will default to 1.
+
+        :param error_out: raise error on invalid page number
+        :type error_out: bool
+        :returns: number of items per page
+        :rtype: int
+
+        """
+        page_arg = self.page_arg
+        page = request.view_args.get(page_arg, request.args.get(page_arg, 1))
+
+        try:
+            page = int(page)
+        except ValueError:
+            pass
+        finally:
+            if not isinstance(page, integer_types) or page < 1:
+                if error_out:
+                    abort(404)
+                else:
+                    page = 1
+
+        return page
+
+    def get_query(self):
+        """Retrieve the query used to retrieve the object used by this view.
+
+        By default returns :attr:`query` when it's set, otherwise it will
+        return a query for :attr:`model`, ordered by :meth:`get_order_by`
+        and with the loader options from :meth:`get_load_options` applied,
+        bound to the session from :meth:`get_read_session`.
+
+        When :meth:`get_row_mode` is ``True`` the query is instead passed to
+        :meth:`apply_row_mode`.
+
+        :returns: query
+        :rtype: flask_sqlalchemy.BaseQuery
+
+        """
+        if self.query is None and self.model is None:
+            error = ("{0} requires either a definition of 'query', 'model', "
+                     "or an implementation of 'get_query()'")
+
+            raise NotImplementedError(error.format(self.__class__.__name__))
+
+        if self.query:
+            query = self.query
+        else:
+            query = self.model.query
+
+        order_by = self.get_order_by()
+
+        if order_by:
+            query = query.order_by(*order_by)
+
+        if self.get_row_mode():
+            query = self.apply_row_mode(query)
+        else:
+            query = self.apply_load_options(query)
+
+        return self.apply_read_session(query)
+
+    def get_row_mode(self):
+        """Retrieve wether the object list contains lightweight rows instead
+        of model instances.
+
+        By default returns :attr:`row_mode`.
+
+        :returns: row mode
+        :rtype: bool
+
+        """
+        return self.row_mode
+
+    def get_row_columns(self):
+        """Retrieve the list of column attributes selected in row mode.
+
+        When :attr:`only_columns` is set those columns are used, preceded by
+        any primary-key columns not already included. Otherwise every column
+        of the model is used, leaving out :class:`~sqlalchemy.types.Text` and
+        :class:`~sqlalchemy.types.LargeBinary` columns when
+        :attr:`defer_large_columns` is ``True``.
+
+        :returns: list of column attributes
+        :rtype: list
+
+        """
+        model = self.get_model()
+        metadata = model_registry.get(model)
+
+        if self.only_columns:
+            keys = [c if isinstance(c, string_types) else c.key
+                    for c in self.only_columns]
+
+            primary_key = [_attribute_key(metadata.mapper, c)
+                           for c in metadata.primary_key]
+
+            keys = [k for k in primary_key if k not in keys] + keys
+        elif self.defer_large_columns:
+            keys = [k for k in metadata.column_keys
+                    if k not in metadata.large_columns]
+        else:
+            keys = metadata.column_keys
+
+        return [getattr(model, key) for key in keys]
+
+    def apply_row_mode(self, query):
+        """Change ``query`` to select the columns from
+        :meth:`get_row_columns` rather than model instances.
+
+        The rows are lightweight named tuples, with an attribute for each
+        column, that are not added to the session. Relationships can not be
+        loaded, so the loader options from :meth:`get_load_options` are not
+        used.
+
+        :param query: sqlalchemy query
+        :type query: flask_sqlalchemy.BaseQuery
+        :returns: query
+        :rtype: flask_sqlalchemy.BaseQuery
+
+        """
+        return query.with_entities(*self.get_row_columns())
+
+    def get_order_by(self):
+        """Retrieve a :class:`tuple` of criteria to pass to pass to the query
+        :meth:`~sqlalchemy.orm.query.Query.order_by` method.
+
+        :returns: list of order by criteria
+        :rtype: list
+
+        """
+        return self.order_by
+
+    def apply_pagination(self, object_list, per_page, error_out):
+        """Retrieves a 3-item tuple containing (pagination, object_list,
+        is_paginated).
+
+        The ``pagination`` from :meth:`get_pagination`, The ``object_list``
+        paginated with page from :meth:`get_page` and ``per_page``, and
+        wether there is more than one page will be returned.
+
+        The page and total are retrieved using :meth:`get_count_strategy`.
+
+        When ``error_out`` is set then a :exc:`~werkzeug.exceptions.NotFound`
+        exception will be raised when the page number is invalid, or refers
+        to an empty page greater than 1.
+
+        :param query: sqlalchemy query
+        :type query: flask_sqlalchemy.BaseQuery
+        :param per_page: items per page
+        :type per_page: int
+        :param error_out: error out
+        :type error_out: bool
+        :returns: pagination instance, object list, is paginated
+        :rtype: tuple
+        :raises werkzeug.exceptions.NotFound: when page number is invalid
+        """
+        mode = self.get_pagination_mode()
+
+        if mode == 'simple':
+            return self.apply_simple_pagination(object_list, per_page,
+                                                error_out)
+
+        if mode == 'keyset':
+            return self.apply_keyset_pagination(object_list, per_page,
+                                                error_out)
+
+        page = self.get_page(error_out)
+
+        cache = self.get_page_cache()
+        cached = key = None
+
+        if cache is not None:
+            key = ('offset', _query_key(object_list), page, per_page)
+            cached = self._load_page(cache, key, object_list)
+
+        if cached is None:
+            if cache is not None:
+                versions = self._page_versions(cache, object_list)
+
+            strategy = self.get_count_strategy()
+
+            items, total, exact = strategy.paginate(object_list, page,
+                                                    per_page)
+
+            if cache is not None:
+                self._store_page(cache, key, object_list, items,
+                                 (total, exact), versions)
+        else:
+            items, (total, exact) = cached
+
+        if not items and page != 1 and error_out:
+            abort(404)
+
+        result = self.get_pagination(object_list, page, per_page, total,
+                                     items)
+        result.exact = exact
+
+        return (result, result.items, result.pages > 1)
+
+    def get_pagination_mode(self):
+        """Retrieve how the object list is paginated, either ``'offset'`` for
+        numbered pages, ``'simple'`` for numbered pages without a total, or
+        ``'keyset'`` for cursor based pages.
+
+        By default returns :attr:`pagination_mode`.
+
+        :returns: pagination mode
+        :rtype: str
+
+        """
+        return self.pagination_mode
+
+    def apply_simple_pagination(self, object_list, per_page, error_out):
+        """Retrieves a 3-item tuple containing (pagination, object_list,
+        is_paginated) without counting the objects.
+
+        One more object than ``per_page`` is retrieved for the page from
+        :meth:`get_page`, when it exists there is a next page. The
+        ``pagination`` is an instance of :attr:`simple_pagination_class`.
+
+        When ``error_out`` is set then a :exc:`~werkzeug.exceptions.NotFound`
+        exception will be raised when the page number is invalid, or refers
+        to an empty page greater than 1.
+
+        :param object_list: sqlalchemy query
+        :type object_list: flask_sqlalchemy.BaseQuery
+        :param per_page: items per page
+        :type per_page: int
+        :param error_out: error out
+        :type error_out: bool
+        :returns: pagination instance, object list, is paginated
+        :rtype: tuple
+        :raises werkzeug.exceptions.NotFound: when page number is invalid
+
+        """
+        page = self.get_page(error_out)
+
+        cache = self.get_page_cache()
+        cached = key = None
+
+        if cache is not None:
+            key = ('simple', _query_key(object_list), page, per_page)
+            cached = self._load_page(cache, key, object_list)
+
+        if cached is None:
+            if cache is not None:
+                versions = self._page_versions(cache, object_list)
+
+            items = object_list.limit(per_page + 1) \
+                .offset((page - 1) * per_page).all()
+
+            has_next = len(items) > per_page
+            items = items[:per_page]
+
+            if cache is not None:
+                self._store_page(cache, key, object_list, items, has_next,
+                                 versions)
+        else:
+            items, has_next = cached
+
+        if not items and page != 1 and error_out:
+            abort(404)
+
+        result = self.simple_pagination_class(object_list, page, per_page,
+                                              items, has_next)
+
+        return (result, result.items, result.has_prev or result.has_next)
+
+    def get_cursor(self, error_out):
+        """Retrieve the current keyset pagination cursor.
+
+        The cursor is read from the query-string argument named by
+        :attr:`cursor_arg`, and is returned as a tuple containing the list of
+        ordering values and wether the page precedes the cursor.
+
+        When the cursor is missing ``None`` is returned, when it is invalid or
+        has been tampered with and ``error_out`` is ``True`` then a
+        :exc:`~werkzeug.exceptions.NotFound` exception will be raised,
+        otherwise ``None`` is returned.
+
+        :param error_out: raise error on invalid cursor
+        :type error_out: bool
+        :returns: values, reverse
+        :rtype: tuple
+        :raises werkzeug.exceptions.NotFound: when cursor is invalid
+
+        """
+        cursor = request.args.get(self.cursor_arg)
+
+        if not cursor:
+            return None
+
+        try:
+            data = _cursor_serializer().loads(cursor)
+            values = [_load_cursor_value(v) for v in data['v']]
+            reverse = bool(data['r'])
+        except (BadData, ValueError, TypeError, KeyError, IndexError):
+            if error_out:
+                abort(404)
+
+            return None
+
+        return values, reverse
+
+    def get_keyset_order_by(self):
+        """Retrieve a list of ``(column, descending)`` tuples used to order
+        and seek through the object list.
+
+        The columns of :meth:`get_order_by` are used, followed by any primary
+        key columns not already included so the ordering is always stable.
+
+        ``NULL`` values of nullable columns are ordered after all other
+        values, or before them when descending.
+
+        :returns: list of columns and directions
+        :rtype: list
+        :raises RuntimeError: when the ordering contains non column criteria
+
+        """
+        mapper = model_registry.get(self.get_model()).mapper
+
+        result = []
+        keys = set()
+
+        for criterion in self.get_order_by() or ():
+            descending = False
+
+            if isinstance(criterion, UnaryExpression) and \
+                    criterion.modifier in (operators.asc_op,
+                                           operators.desc_op):
+                descending = criterion.modifier is operators.desc_op
+                criterion = criterion.element
+
+            try:
+                keys.add(_attribute_key(mapper, criterion))
+            except UnmappedColumnError:
+                error = ('{0} keyset pagination requires ordering by model '
+                         'columns')
+
+                raise RuntimeError(error.format(self.__class__.__name__))
+
+            result.append((criterion, descending))
+
+        for column in mapper.primary_key:
+            if _attribute_key(mapper, column) not in keys:
+                result.append((column, False))
+
+        return result
+
+    def apply_keyset_pagination(self, object_list, per_page, error_out):
+        """Retrieves a 3-item tuple containing (pagination, object_list,
+        is_paginated) using keyset pagination.
+
+        Rows are ordered by :meth:`get_keyset_order_by` and filtered to those
+        following the cursor from :meth:`get_cursor`. One more row than
+        ``per_page`` is fetched to find out if another page exists, so no
+        ``COUNT`` query or ``OFFSET`` is ever required.
+
+        The ``pagination`` is an instance of :attr:`keyset_pagination_class`
+        containing the cursors of the next and previous pages.
+
+        When ``error_out`` is set then a :exc:`~werkzeug.exceptions.NotFound`
+        exception will be raised when the cursor is invalid or the page
+        is empty.
+
+        :param object_list: sqlalchemy query
+        :type object_list: flask_sqlalchemy.BaseQuery
+        :param per_page: items per page
+        :type per_page: int
+        :param error_out: error out
+        :type error_out: bool
+        :returns: pagination instance, object list, is paginated
+        :rtype: tuple
+        :raises werkzeug.exceptions.NotFound: when cursor is invalid
+
+        """
+        columns = self.get_keyset_order_by()
+        cursor = self.get_cursor(error_out)
+
+        if cursor is not None and len(cursor[0]) != len(columns):
+            if error_out:
+                abort(404)
+
+            cursor = None
+
+        values, reverse = cursor or (None, False)
+
+        order_by = []
+
+        for column, descending in columns:
+            if descending != reverse:
+                if _nullable(column):
+                    order_by.append(column.is_(None).desc())
+
+                order_by.append(column.desc())
+            else:
+                if _nullable(column):
+                    order_by.append(column.is_(None).asc())
+
+                order_by.append(column.asc())
+
+        query = object_list.order_by(None).order_by(*order_by)
+
+        if values is not None:
+            clauses = []
+
+            for i, (column, descending) in enumerate(columns):
+                # comparing with None is rendered as IS NULL.
+                criteria = [c == v for (c, d), v in zip(columns[:i], values)]
+
+                # NULL is ordered as if greater than every other value.
+                if descending != reverse:
+                    if values[i] is None:
+                        criterion = column.isnot(None)
+                    else:
+                        criterion = column < values[i]
+                else:
+                    if values[i] is None:
+                        continue
+
+                    criterion = column > values[i]
+
+                    if _nullable(column):
+                        criterion = or_(criterion, column.is_(None))
+
+                criteria.append(criterion)
+
+                clauses.append(and_(*criteria))
+
+            query = query.filter(or_(*clauses))
+
+        items = query.limit(per_page + 1).all()
+
+        more = len(items) > per_page
+        items = items[:per_page]
+
+        if not items and values is not None and error_out:
+            abort(404)
+
+        if reverse:
+            items.reverse()
+
+        next_cursor = prev_cursor = None
+
+        if items:
+            if more or reverse:
+                next_cursor = self._dump_cursor(items[-1], columns, False)
+
+            if (more and reverse) or (values is not None and not reverse):
+                prev_cursor = self._dump_cursor(items[0], columns, True)
+
+        result = self.keyset_pagination_class(object_list, per_page, items,
+                                              next_cursor, prev_cursor)
+
+        return (result, result.items, result.has_next or result.has_prev)
+
+    def _dump_cursor(self, obj, columns, reverse):
+        mapper = model_registry.get(self.get_model()).mapper
+
+        values = [_dump_cursor_value(getattr(obj, _attribute_key(mapper, c)))
+                  for c, descending in columns]
+
+        return _cursor_serializer().dumps({'v': values, 'r': reverse})
+
+    def get_per_page(self):
+        """Retrieve the number of items to show per page.
+
+        By default returns :attr:`per_page`.
+
+        :returns: number of items per page
+        :rtype: int
+
+        """
+        return self.per_page
+
+    def get_yield_per(self):
+        """Retrieve the number of rows fetched at a time when iterating an
+        unpaginated object list.
+
+        By default returns :attr:`yield_per`.
+
+        :returns: rows per batch
+        :rtype: int
+
+        """
+        return self.yield_per
+
+    def get_page_cache(self):
+        """Retrieve the :class:`~flask_generic_views.cache.TaggedCache` pages
+        are stored in.
+
+        Changes committed by other processes are not seen by a cache kept in
+        memory, so a cache with an :class:`~flask_generic_views.cache.LRUCache`
+        backend must have a timeout.
+
+        By default returns :attr:`page_cache`.
+
+        :returns: page cache
+        :rtype: flask_generic_views.cache.TaggedCache
+
+        """
+        return self.page_cache
+
+    def _page_versions(self, cache, query):
+        # captured before the page is retrieved, so a commit in between
+        # invalidates the stored page.
+        if _page_format(query) is None:
+            return None
+
+        tags = [_table_tag(t) for t in find_tables(query.statement,
+                                                   include_joins=True)]
+
+        return cache.versions(tags)
+
+    def _store_page(self, cache, key, query, items, extra, versions):
+        if versions is None:
+            return
+
+        if _page_format(query) == 'row':
+            data = ('row', tuple(d['name'] or ''
+                                 for d in query.column_descriptions),
+                    [tuple(row) for row in items])
+        else:
+            data = ('pk', [inspect(obj).identity for obj in items])
+
+        cache.set(key, (data, extra), versions=versions)
+
+    def _load_page(self, cache, key, query):
+        backend = getattr(cache, 'backend', None)
+
+        if isinstance(backend, LRUCache) and cache.default_timeout is None \
+                and backend.default_timeout is None:
+            error = ("{0} requires a 'page_cache' with a timeout, or with a "
+                     "backend shared between processes")
+
+            raise RuntimeError(error.format(self.__class__.__name__))
+
+        cached = cache.get(key)
+
+        if cached is None:
+            return None
+
+        data, extra = cached
+
+        if data[0] == 'row':
+            row_class = _row_class(data[1])
+
+            return [row_class(*row) for row in data[2]], extra
+
+        identities = data[1]
+
+        if not identities:
+            return [], extra
+
+        mapper = model_registry.get(query.column_descriptions[0]['expr'])\
+            .mapper
+
+        if len(mapper.primary_key) == 1:
+            criterion = mapper.primary_key[0].in_([i[0] for i in identities])
+        else:
+            criterion = tuple_(*mapper.primary_key).in_(identities)
+
+        objects = dict((inspect(obj).identity, obj) for obj in
+                       query.order_by(None).filter(criterion).all())
+
+        if any(i not in objects for i in identities):
+            return None
+
+        return [objects[i] for i in identities], extra
+
+    def get_count_strategy(self):
+        """Retrieve the :class:`CountStrategy` used to retrieve the current
+        page and total number of objects.
+
+        By default returns :attr:`count_strategy`.
+
+        :returns: count strategy
+        :rtype: flask_generic_views.sqlalchemy.CountStrategy
+
+        """
+        return self.count_strategy
+
+    def get_pagination(self, query, page, per_page, total, items):
+        """
+        :param query: sqlalchemy query
+        :type query: flask_sqlalchemy.BaseQuery
+        :param page: page number
+        :type page: int
+        :param per_page: items per page
+        :type per_page: int
+        :param total: total items
+        :type total: int
+        :param items: list of objects
+        :type items: list
+        :returns: pagination instance
+        :rtype: flask_sqlalchemy.Pagination
+        """
+        return self.pagination_class(query, page, per_page, total, items)
+
+    def get_error_out(self):
+        """Retrive how invalid page numbers or empty pages are handled.
+
+        When ``True`` a :exc:`werkzeug.exceptions.NotFound` will be raised for
+        invalid page numbers or empty pages greater than one.
+
+        When ``False`` invalid page numbers will default to 1 and empty pages
+        will be rendered with an empty ``object_list``.
+
+        By default returns :attr:`error_out`.
+
+        :returns: error out
+        :rtype: bool
+
+        """
+        return self.error_out
+
+    def get_context_object_name(self):
+        """Retrieve the context variable name that :attr:`object` will be
+        stored under.
+
+        By default it will return :attr:`context_object_name`, falling back
+        to a name based on the model from :attr:`query` or :attr:`model`, the
+        model ``BlogPost`` would have the context object name
+        ``blog_post_list``.
+
+        :returns: context object name
+        :rtype: str
+
+        """
+        if self.context_object_name:
+            return self.context_object_name
+
+        model = self.get_model()
+
+        if model:
+            return model_registry.get(model).context_list_name
+
+        return None
+
+    def get_context_data(self, **kwargs):
+        """Extends the view context with :attr:`object`.
+
+        When the return value of :meth:`get_per_page` is not ``None``, then
+        :attr:`object_list` will be paginated with :meth:`apply_pagination`
+        and the resulting ``pagination``, ``object_list`` and ``is_paginated``
+        will be stored in the view context. Otherwise the result of executing
+        :attr:`object_list` will be stored in ``object_list``, ``pagination``
+        will be ``None``, and ``is_paginated`` will be ``False``.
+
+        When unpaginated and :meth:`get_yield_per` is not ``None``, the
+        ``object_list`` will instead be a query that fetches rows in batches
+        of that size as it is iterated.
+
+        A variable named with the result of :meth:`get_context_object_name`
+        containing ``object_list`` will be added to the context.
+
+        :param kwargs: context
+        :type kwargs: dict
+        :returns: context
+        :rtype: dict
+
+        """
+        query = self.object_list
+
+        per_page = self.get_per_page()
+        error_out = self.get_error_out()
+
+        if per_page:
+            paginated = self.apply_pagination(query, per_page, error_out)
+
+            pagination, object_list, is_paginated = paginated
+        else:
+            yield_per = self.get_yield_per()
+
+            if yield_per:
+                object_list = query.yield_per(yield_per)
+            else:
+                object_list = query.all()
+
+            pagination, is_paginated = None, False
+
+        kwargs.setdefault('pagination', pagination)
+        kwargs.setdefault('object_list', object_list)
+        kwargs.setdefault('is_paginated', is_paginated)
+
+        context_object_name = self.get_context_object_name()
+
+        if context_object_name is not None:
+            kwargs.setdefault(context_object_name, object_list)
+
+        return super(MultipleObjectMixin, self).get_context_data(**kwargs)
+
+
+class BaseListView(MultipleObjectMixin, MethodView):
+    """View class to retrieve a list of objects."""
+
+    def get(self, **kwargs):
+        """Set :attr:`object_list` to the result of :meth:`get_query` and
+        create a view from the context.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object_list = self.get_query()
+
+        return self.create_response(self.get_context_data())
+
+
+class MultipleObjectTemplateResponseMixin(TemplateResponseMixin):
+    template_name_suffix = '_list'
+
+    def _format_template_name(self, name):
+        if request.blueprint:
+            prefix = '{0}/'.format(request.blueprint)
+        else:
+            prefix = ''
+
+        return '{0}{1}{2}.html'.format(prefix, name, self.template_name_suffix)
+
+    def get_template_list(self):
+        """Retrives a list of template names to use for when rendering the
+        template.
+
+        When no
+        :attr:`~flask_generic_views.core.TemplateResponseMixin.template_name`
+        is set then the following will be provided instead:
+
+        * A template based on :attr:`template_name_suffix`, the model, and the
+          current blueprint. The model ``BlogArticle`` in  blueprint
+          ``blogging`` would generate the template name
+          ``blogging/blog_article_list.html``, no blueprint would generate
+          ``blog_article_list.html``
+
+        :returns: list of template names
+        :rtype: list
+
+        """
+        try:
+            names = super(MultipleObjectTemplateResponseMixin, self)\
+                .get_template_list()
+        except NotImplementedError:
+            names = []
+
+            model = self.get_model()
+
+            if model:
+                name = model_registry.get(model).template_name
+                names.append(self._format_template_name(name))
+
+            if not names:
+                raise
+
+        return names
+
+
+class ListView(MultipleObjectTemplateResponseMixin, BaseListView):
+    """Renders a given template,, with the context containing a list of objects
+    retrieved from the database.
+
+    .. code-block:: python
+
+        class PostListView(DetailView):
+            model = Post
+
+            def context_data(self, **kwargs):
+                kwargs.setdefault('now', datetime.now())
+
+        post_list = PostDetailView.as_view('post_list')
+
+        app.add_url_rule('/posts', view_func=post_list)
+
+    The above example will render the ``post_list.html`` template from a folder
+    named after the current blueprint, when no blueprint is used it will look
+    in the root template folder. The view context will contain the list of
+    objects as ``post_list`` and the current date-time as ``now``.
+
+    .. code-block:: python
+
+        post_list = ListView.as_view('post_list', model=Post)
+
+        app.add_url_rule('/posts', view_func=post_list)
+
+    It can also be used directly in a URL rule to avoid having to create
+    additional classes.
+
+    .. code-block:: jinja
+
+        {# post_list.html #}
+        <ul>
+        {% for post in object_list  %}
+          <li>{{ post.title }}</li>
+        {% else %}
+          <li>No posts found.</li>
+        {% endfor %}
+        </ul>
+
+    Large unpaginated lists can be sent while they are being rendered, with
+    the rows fetched from the database in batches as the template iterates
+    over them, keeping memory use flat however many rows there are.
+
+    .. code-block:: python
+
+        class PostArchiveView(ListView):
+            model = Post
+            stream = True
+            yield_per = 500
+
+    As the template is rendered after the view has returned, errors while
+    rendering can not change the response status. The ``object_list`` is a
+    query when streaming in this way, each loop over it will run the query
+    again.
+
+    """
+
+
+class ConditionalResponseMixin(object):
+    """Answers conditional ``GET`` requests from clients that already hold the
+    current version of a page with a ``304 Not Modified`` response, before the
+    template is rendered.
+
+    .. code-block:: python
+
+        class PostDetailView(ConditionalResponseMixin, DetailView):
+            model = Post
+            updated_at_field = 'updated_at'
+
+        class PostListView(ConditionalResponseMixin, ListView):
+            model = Post
+            updated_at_field = 'updated_at'
+
+    The validators of a single object are the values of its
+    :attr:`updated_at_field` and :attr:`version_field` columns, taken from the
+    object which is then reused by the view.
+
+    The validators of a list are derived from the objects loaded for the
+    current page, once loaded and before rendering: their primary keys, the
+    greatest :attr:`updated_at_field`, the sum of :attr:`version_field`, and
+    the total and neighbouring pages of the pagination. Unpaginated lists
+    iterated with ``yield_per`` are not loaded up front, their validators are
+    retrieved with an aggregate query instead.
+
+    An ``ETag`` header is sent, along with a ``Last-Modified`` header when
+    :attr:`updated_at_field` is set. Naive date-times are treated as UTC.
+
+    """
+    updated_at_field = None
+    version_field = None
+
+    _validator_object = None
+    _validator_list = None
+    _validator_pagination = None
+    _validators = None
+
+    def dispatch_request(self, *args, **kwargs):
+        """Return a ``304 Not Modified`` response when the validators from
+        :meth:`get_validators` match the ``If-None-Match`` or
+        ``If-Modified-Since`` headers of the current request, otherwise
+        dispatch the request and add the validators to the response.
+
+        Lists are dispatched first, the validators being checked by
+        :meth:`create_response` once the page has been loaded.
+
+        :param args: positional arguments from url rule
+        :type args: list
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return super(ConditionalResponseMixin, self)\
+                .dispatch_request(*args, **kwargs)
+
+        if self._loads_list():
+            response = current_app.make_response(
+                super(ConditionalResponseMixin, self)
+                .dispatch_request(*args, **kwargs))
+
+            if self._validators is None:
+                self._validators = self.get_validators()
+
+            etag, last_modified = self._validators
+        else:
+            etag, last_modified = self.get_validators()
+
+            if self._not_modified(etag, last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(
+                    super(ConditionalResponseMixin, self)
+                    .dispatch_request(*args, **kwargs))
+
+        if etag is not None:
+            response.set_etag(etag)
+
+        if last_modified is not None:
+            response.last_modified = _utc(last_modified)
+
+        return response
+
+    def _loads_list(self):
+        """Retrieve wether the view loads a list of objects its validators
+        can be derived from."""
+        return isinstance(self, MultipleObjectMixin) and \
+            bool(self.get_per_page() or not self.get_yield_per())
+
+    def _not_modified(self, etag, last_modified):
+        if etag is None and last_modified is None:
+            return False
+
+        if last_modified is not None:
+            last_modified = http_date(_utc(last_modified))
+
+        return not is_resource_modified(request.environ, etag=etag,
+                                        last_modified=last_modified)
+
+    def create_response(self, *args, **kwargs):
+        """Return a ``304 Not Modified`` response when the validators derived
+        from the loaded list match the headers of the current request,
+        otherwise create the response.
+
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        if self._validator_list is not None:
+            self._validators = self.get_validators()
+
+            if self._not_modified(*self._validators):
+                return current_app.response_class(status=304)
+
+        return super(ConditionalResponseMixin, self)\
+            .create_response(*args, **kwargs)
+
+    def get_object(self):
+        """Return the object loaded by :meth:`get_validators`, when there is
+        one, instead of retrieving it again.
+
+        :returns: object
+        :rtype: object
+
+        """
+        if self._validator_object is not None:
+            return self._validator_object
+
+        return super(ConditionalResponseMixin, self).get_object()
+
+    def get_context_data(self, **kwargs):
+        """Extends the view context, keeping a reference to a loaded
+        ``object_list`` and its ``pagination`` so :meth:`get_validators` can
+        be derived from them.
+
+        :param kwargs: context
+        :type kwargs: dict
+        :returns: context
+        :rtype: dict
+
+        """
+        kwargs = super(ConditionalResponseMixin, self)\
+            .get_context_data(**kwargs)
+
+        if isinstance(self, MultipleObjectMixin) and \
+                isinstance(kwargs.get('object_list'), list):
+            self._validator_list = kwargs['object_list']
+            self._validator_pagination = kwargs.get('pagination')
+
+        return kwargs
+
+    def get_validators(self):
+        """Retrieve a 2-item tuple containing the (etag, last_modified) of the
+        current page, either may be ``None``.
+
+        :returns: etag, last modified
+        :rtype: tuple
+
+        """
+        model = self.get_model()
+
+        updated_at = version = None
+
+        if self.updated_at_field:
+            updated_at = getattr(model, self.updated_at_field)
+
+        if self.version_field:
+            version = getattr(model, self.version_field)
+
+        if updated_at is None and version is None:
+            return None, None
+
+        fields = [(field, aggregate) for field, column, aggregate in
+                  ((self.updated_at_field, updated_at, max),
+                   (self.version_field, version, sum)) if column is not None]
+
+        if isinstance(self, SingleObjectMixin):
+            obj = getattr(self, 'object', None)
+
+            if obj is None:
+                obj = self._validator_object = self.get_object()
+
+            row = [getattr(obj, field) for field, _ in fields]
+        elif self._validator_list is not None:
+            row = []
+
+            for field, aggregate in fields:
+                values = [getattr(obj, field) for obj in self._validator_list]
+                values = [value for value in values if value is not None]
+                row.append(aggregate(values) if values else None)
+
+            mapper = model_registry.get(model).mapper
+            keys = [_attribute_key(mapper, c) for c in mapper.primary_key]
+
+            row.append([tuple(getattr(obj, key, None) for key in keys)
+                        for obj in self._validator_list])
+
+            pagination = self._validator_pagination
+
+            if pagination is not None:
+                row.extend(getattr(pagination, name, None)
+                           for name in ('total', 'has_prev', 'has_next'))
+        else:
+            columns = [func.max(updated_at) if updated_at is not None
+                       else None,
+                       func.sum(version) if version is not None else None,
+                       func.count()]
+
+            row = self.get_query().order_by(None)\
+                .with_entities(*[c for c in columns if c is not None])\
+                .first()
+
+            if row is None:
+                return None, None
+
+        etag = sha1(repr(tuple(row)).encode('utf-8')).hexdigest()
+
+        last_modified = row[0] if updated_at is not None else None
+
+        return etag, last_modified
+
+
+def _utc(value):
+    """Return an aware date-time in UTC, naive date-times are treated as
+    already being in UTC, dates are returned unchanged."""
+    if not isinstance(value, datetime):
+        return value
+
+    if value.tzinfo is None:
+        return value.replace(tzinfo=fixed_offset(0))
+
+    return value.astimezone(fixed_offset(0))
+
+
+def _export_value(value):
+    """Convert a column value to text for an export, dates and times are
+    formatted as ISO 8601 and ``None`` as an empty string."""
+    if value is None:
+        return u''
+
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+
+    return text_type(value)
+
+
+def _csv_line(values):
+    """Format a line of CSV, the :mod:`csv` module is not used as it is unable
+    to write unicode on Python 2."""
+    fields = []
+
+    for value in values:
+        value = _export_value(value)
+
+        if any(c in value for c in u',"\r\n'):
+            value = u'"{0}"'.format(value.replace(u'"', u'""'))
+
+        fields.append(value)
+
+    return u','.join(fields) + u'\r\n'
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date, time, Decimal, UUID)):
+        return _export_value(value)
+
+    raise TypeError('{0!r} is not JSON serializable'.format(value))
+
+
+class ExportView(MultipleObjectMixin, MethodView):
+    """Streams a list of objects retrieved from the database as CSV or newline
+    delimited JSON.
+
+    .. code-block:: python
+
+        class PostExportView(ExportView):
+            model = Post
+            order_by = (Post.id,)
+            fields = ('id', 'title', 'created_at')
+            filename = 'posts.csv'
+
+        post_export = PostExportView.as_view('post_export')
+
+        app.add_url_rule('/posts.csv', view_func=post_export)
+
+    The above example will download every post as a CSV file named
+    ``posts.csv``, with a header line followed by the id, title and creation
+    date of each post.
+
+    .. code-block:: python
+
+        post_export = ExportView.as_view('post_export', model=Post,
+                                         export_format='ndjson')
+
+        app.add_url_rule('/posts.ndjson', view_func=post_export)
+
+    It can also be used directly in a URL rule to avoid having to create
+    additional classes.
+
+    The rows are fetched in batches of :attr:`batch_size` and each batch is
+    sent as soon as it has been serialized, so memory use does not grow with
+    the size of the table.
+
+    """
+    row_mode = True
+    export_format = 'csv'
+    batch_size = 1000
+    fields = None
+    filename = None
+    response_class = Response
+
+    def get(self, **kwargs):
+        """Set :attr:`object_list` to the result of :meth:`get_query` and
+        create a streamed response from it.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object_list = self.get_query()
+
+        return self.create_response(self.object_list)
+
+    def get_row_columns(self):
+        """Retrieve the list of column attributes to export.
+
+        By default returns the attributes named in :attr:`fields` when set,
+        otherwise the columns from
+        :meth:`MultipleObjectMixin.get_row_columns`.
+
+        :returns: list of column attributes
+        :rtype: list
+
+        """
+        if not self.fields:
+            return super(ExportView, self).get_row_columns()
+
+        model = self.get_model()
+
+        return [getattr(model, f) if isinstance(f, string_types) else f
+                for f in self.fields]
+
+    def get_export_format(self):
+        """Retrieve the format of the export, either ``'csv'`` or
+        ``'ndjson'``.
+
+        By default returns :attr:`export_format`.
+
+        :returns: export format
+        :rtype: str
+
+        """
+        return self.export_format
+
+    def get_batch_size(self):
+        """Retrieve the number of rows fetched and sent at a time.
+
+        By default returns :attr:`batch_size`.
+
+        :returns: rows per batch
+        :rtype: int
+
+        """
+        return self.batch_size
+
+    def get_filename(self):
+        """Retrieve the file name the export is downloaded as, when ``None``
+        the export will be displayed by the browser where possible.
+
+        By default returns :attr:`filename`.
+
+        :returns: file name
+        :rtype: str
+
+        """
+        return self.filename
+
+    def iter_batches(self, query):
+        """Iterate over the rows of ``query`` in lists of at most
+        :meth:`get_batch_size` rows, fetching each batch from the database
+        as it is needed.
+
+        :param query: sqlalchemy query
+        :type query: flask_sqlalchemy.BaseQuery
+        :returns: batches of rows
+        :rtype: collections.Iterator
+
+        """
+        batch_size = self.get_batch_size()
+        batch = []
+
+        for row in query.yield_per(batch_size):
+            batch.append(row)
+
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+    def generate_csv(self, query):
+        """Serialize the rows of ``query`` as CSV, with a header line
+        containing the column names.
+
+        :param query: sqlalchemy query
+        :type query: flask_sqlalchemy.BaseQuery
+        :returns: chunks of CSV
+        :rtype: collections.Iterator
+
+        """
+        names = [d['name'] for d in query.column_descriptions]
+
+        yield _csv_line(names)
+
+        for batch in self.iter_batches(query):
+            yield u''.join(_csv_line(row) for row in batch)
+
+    def generate_ndjson(self, query):
+        """Serialize the rows of ``query`` as newline delimited JSON, with an
+        object keyed by column name for each row.
+
+        :param query: sqlalchemy query
+        :type query: flask_sqlalchemy.BaseQuery
+        :returns: chunks of JSON
+        :rtype: collections.Iterator
+
+        """
+        names = [d['name'] for d in query.column_descriptions]
+
+        for batch in self.iter_batches(query):
+            yield u''.join(json.dumps(dict(zip(names, row)),
+                                      default=_json_default) + u'\n'
+                           for row in batch)
+
+    def create_response(self, query, **kwargs):
+        """Returns a :attr:`response_class` instance streaming the rows of
+        ``query`` in the format from :meth:`get_export_format`.
+
+        If any keyword arguments are provided, they will be passed to the
+        constructor of the response class.
+
+        :param query: sqlalchemy query
+        :type query: flask_sqlalchemy.BaseQuery
+        :param kwargs: response keyword arguments
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+        :raises RuntimeError: when the export format is unknown
+
+        """
+        export_format = self.get_export_format()
+
+        if export_format == 'csv':
+            generate, mimetype = self.generate_csv, 'text/csv'
+        elif export_format == 'ndjson':
+            generate, mimetype = self.generate_ndjson, 'application/x-ndjson'
+        else:
+            error = ("{0} has unknown export format '{1}'")
+
+            raise RuntimeError(error.format(self.__class__.__name__,
+                                            export_format))
+
+        kwargs.setdefault('mimetype', mimetype)
+
+        response = self.response_class(
+            stream_with_context(generate(query)), **kwargs)
+
+        filename = self.get_filename()
+
+        if filename:
+            response.headers.set('Content-Disposition', 'attachment',
+                                 filename=filename)
+
+        return response
+
+
+class ModelFormMixin(FormMixin, SingleObjectMixin):
+    fields = None
+    form_base_class = Form
+    form_options = None
+
+    def get_form_class(self):
+        """Retrieve the form class to instantiate.
+
+        When :attr:`form_class` is not set, a form class will be automatically
+        generated using :attr:`model`, :attr:`fields`, :attr:`form_base_class`
+        and :attr:`form_options`, generated classes are reused between
+        requests using :func:`get_model_form`.
+
+        :returns: form class
+        :rtype: type
+
+        """
+        if self.fields is not None and self.form_class:
+            error = ("{0} requires either a definition of 'fields' or "
+                     "'form_class', not both")
+
+            raise RuntimeError(error.format(self.__class__.__name__))
+
+        if self.form_class:
+            return self.form_class
+
+        if self.fields is None:
+            error = ("{0} requires a definition of 'fields' when "
+                     "'form_class' is not defined")
+
+            raise NotImplementedError(error.format(self.__class__.__name__))
+
+        options = self.form_options or {}
+
+        return get_model_form(self.get_model(), self.fields,
+                              self.form_base_class, **options)
+
+    def get_form_kwargs(self):
+        """Extends the form keyword arguments with `obj`
+        containing :attr:`object` when set.
+
+        :returns: keyword arguments
+        :rtype: dict
+
+        """
+        kwargs = super(ModelFormMixin, self).get_form_kwargs()
+
+        if hasattr(self, 'object'):
+            kwargs['obj'] = self.object
+
+        return kwargs
+
+    def get_success_url(self):
+        """Retrive the URL to redirect to when the form is successfully
+        validated.
+
+        By default returns :attr:`success_url` after being interpolated with
+        the object attributes using :meth:`~str.format`. So ``"/posts/{id}"``
+        will be populated with ``self.object.id``
+
+        :returns: URL
+        :rtype: str
+
+        """
+        if self.success_url is None:
+            error = ("{0} requires either a definition of 'success_url' or "
+                     "an implementation of 'get_success_url()'")
+
+            raise NotImplementedError(error.format(self.__class__.__name__))
+
+        return self.success_url.format(**self.object.__dict__)
+
+    def form_valid(self, form):
+        """Creates or updates :attr:`object` from :attr:`model`, persists it to
+        database, and redirects to :meth:`get_success_url`.
+
+        The column values of :attr:`object` are kept after the commit instead
+        of being reloaded. Columns filled by the database are loaded before
+        the commit with a ``SELECT`` of only those columns, which is not
+        needed when the mapper uses ``eager_defaults``.
+
+        Cached responses tagged with the model are invalidated, see
+        :func:`~flask_generic_views.cache.invalidate_tags`, and the write is
+        recorded with :meth:`~ReadReplicaMixin.record_write`.
+
+        :param form: form instance
+        :type form: flask_wtf.Form
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        if not hasattr(self, 'object'):
+            self.object = self.model()
+            session.add(self.object)
+
+        form.populate_obj(self.object)
+
+        session.flush()
+
+        expired = _expired_columns(self.object)
+
+        if expired:
+            session.refresh(self.object, expired)
+
+        values = _column_values(self.object)
+
+        session.commit()
+
+        _restore_column_values(self.object, values)
+
+        invalidate_tags(self.get_model())
+
+        self.record_write()
+
+        return super(ModelFormMixin, self).form_valid(form)
+
+
+class BaseCreateView(ModelFormMixin, ProcessFormView):
+    """View class for creating an object."""
+
+
+class CreateView(SingleObjectTemplateResponseMixin, BaseCreateView):
+    """View class to display a form for creating an object. When invalid it
+    shows the form with validation errors, when valid it saves a new object to
+    the database and redirects to a new URL.
+
+    .. code-block:: python
+
+        class PostCreateView(FormView):
+            model = Post
+            fields = ('title', 'body')
+            success_url = '/posts/{id}'
+
+        post_create = PostCreateView.as_view('post_create')
+
+        app.add_url_rule('/posts/new', view_func=post_create)
+
+    The above example will render the template ``post_form.html`` with an
+    instance of :class:`flask_wtf.Form` in the context variable ``form`` with
+    fields based on :attr:`~ModelFormView.fields` and
+    :attr:`ModelFormView.model`, when the user submits the form with valid data
+    an instance of Post will be saved to the database, and the user redirected
+    to its page, when the form is submitted with  invalid data
+    ``post_form.html`` will be rendered again, and the form will contain any
+    error messages.
+
+    .. code-block:: python
+
+        post_create = CreateView.as_view('post_create', model=Post,
+                                         fields=('title', 'body'),
+                                         success_url = '/posts/{id}')
+
+        app.add_url_rule('/posts/new', view_func=post_create)
+
+    It can also be used directly in a URL rule to avoid having to create
+    additional classes.
+
+    .. code-block:: jinja
+
+        {# post_form.html #}
+        <form action="" method="post">
+          <p>{{ form.title.label }} {{ form.title }}</p>
+          <p>{{ form.title.label }} {{ form.title }}</p>
+          <input type="submit" value="Save">
+        </form>
+
+    """
+    template_name_suffix = '_form'
+
+
+class BaseUpdateView(ModelFormMixin, ProcessFormView):
+    """View class for updating an object."""
+
+    def get(self, **kwargs):
+        """Set :attr:`object` to the result of :meth:`get_object` and
+        create a response using the return value of :meth:`get_context_data()`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object = self.get_object()
+        return super(BaseUpdateView, self).get(**kwargs)
+
+    def post(self, **kwargs):
+        """Set :attr:`object` to the result of :meth:`get_object` and
+        construct and validates a form.
+
+        When the form is valid :meth:`form_valid` is called, when the form
+        is invalid :meth:`form_invalid` is called.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        self.object = self.get_object()
+        return super(BaseUpdateView, self).post(**kwargs)
+
+
+class UpdateView(SingleObjectTemplateResponseMixin, BaseUpdateView):
+    """View class to display a form for updating an object. When invalid it
+    shows the form with validation errors, when valid it saves the updated
+    object to the database and redirects to a new URL.
+
+    .. code-block:: python
+
+        class PostUpdateView(FormView):
+            model = Post
+            fields = ('title', 'body')
+            success_url = '/posts/{id}'
+
+        post_update = PostUpdateView.as_view('post_update')
+
+        app.add_url_rule('/posts/new', view_func=post_update)
+
+    The above example will render the template ``post_form.html`` with an
+    instance of :class:`flask_wtf.Form` in the context variable ``form`` with
+    fields based on :attr:`~ModelFormView.fields` and
+    :attr:`ModelFormView.model`, when the user submits the form with valid data
+    an instance of Post will be updated in the database, and the user
+    redirected to its page, when the form is submitted with  invalid data
+    ``post_form.html`` will be rendered again, and the form will contain any
+    error messages.
+
+    .. code-block:: python
+
+        post_update = UpdateView.as_view('post_update', model=Post,
+                                         fields=('title', 'body'),
+                                         success_url = '/posts/{id}')
+
+        app.add_url_rule('/posts/<pk>/edit', view_func=post_update)
+
+    It can also be used directly in a URL rule to avoid having to create
+    additional classes.
+
+    .. code-block:: jinja
+
+        {# post_form.html #}
+        <form action="" method="post">
+          <p>{{ form.title.label }} {{ form.title }}</p>
+          <p>{{ form.title.label }} {{ form.title }}</p>
+          <input type="submit" value="Save">
+        </form>
+
+    """
+    template_name_suffix = '_form'
+
+
+class DeletionMixin(object):
+    """Handle the DELETE http method.
+
+    When :attr:`delete_by_query` is ``True`` the object is deleted with a
+    single ``DELETE`` statement, without loading it first.
+
+    .. code-block:: python
+
+        class CommentDeleteView(DeleteView):
+            model = Comment
+            delete_by_query = True
+            success_url = '/comments?deleted={pk}'
+
+    When :attr:`passive_deletes` is set, related rows the database deletes
+    or nullifies itself are not loaded either. Setting it to ``True`` uses
+    the relationships from :attr:`ModelMetadata.passive_relationships`,
+    relationships the database handles without declaring it in the model
+    can be listed instead.
+
+    .. code-block:: python
+
+        class AccountDeleteView(DeleteView):
+            model = Account
+            passive_deletes = ('events', 'sessions')
+            success_url = '/accounts'
+
+    The above example will load the account, count its events and sessions,
+    and delete it with a ``DELETE`` statement, leaving the removal of the
+    events and sessions to ``ON DELETE`` clauses in the database. The counts
+    of deleted and nullified rows are stored in :attr:`cascaded_rows` and
+    :attr:`nullified_rows`, and sent with the
+    :data:`~flask_generic_views.signals.rows_deleted` signal.
+
+    The database must enforce the ``ON DELETE`` clauses, with SQLite foreign
+    keys have to be enabled with ``PRAGMA foreign_keys=ON``.
+
+    """
+
+    success_url = None
+    delete_by_query = False
+    passive_deletes = None
+    cascaded_rows = None
+    nullified_rows = None
+
+    def get_pk_column(self):
+        """Retrieve the primary-key attribute of the model from
+        :meth:`get_model`.
+
+        :returns: column attribute
+        :rtype: sqlalchemy.orm.attributes.InstrumentedAttribute
+        :raises RuntimeError: when the model does not have a single
+                              primary-key column
+
+        """
+        metadata = model_registry.get(self.get_model())
+
+        if len(metadata.primary_key) > 1:
+            error = ('{0} requires non composite primary key')
+
+            raise RuntimeError(error.format(self.__class__.__name__))
+
+        if len(metadata.primary_key) == 0:
+            error = ('{0} requires primary key')
+
+            raise RuntimeError(error.format(self.__class__.__name__))
+
+        key = _attribute_key(metadata.mapper, metadata.primary_key[0])
+
+        return getattr(metadata.model, key)
+
+    def get_passive_deletes(self):
+        """Retrieve the names of relationships whose related rows the
+        database deletes or nullifies when the object is deleted.
+
+        By default returns nothing unless :attr:`passive_deletes` is set,
+        in which case the relationships from
+        :attr:`ModelMetadata.passive_relationships` are returned followed by
+        those in :attr:`passive_deletes`.
+
+        :returns: relationship names
+        :rtype: tuple
+
+        """
+        if not self.passive_deletes:
+            return ()
+
+        metadata = model_registry.get(self.get_model())
+
+        names = metadata.passive_relationships
+
+        if self.passive_deletes is True:
+            return names
+
+        for name in self.passive_deletes:
+            if name not in names:
+                names += (name,)
+
+        return names
+
+    def get_delete_by_query(self):
+        """Retrieve wether the object is deleted with a ``DELETE`` statement
+        instead of being loaded and deleted by the session.
+
+        By default returns :attr:`delete_by_query`, unless deleting objects
+        of the model has effects handled by the ORM, see
+        :attr:`ModelMetadata.delete_cascades`, other than those of the
+        relationships from :meth:`get_passive_deletes`.
+
+        :returns: delete by query
+        :rtype: bool
+
+        """
+        if not self.delete_by_query:
+            return False
+
+        return not self._delete_cascades(self.get_passive_deletes())
+
+    def _delete_cascades(self, passive):
+        metadata = model_registry.get(self.get_model())
+
+        return metadata.delete_events or \
+            any(k not in passive for k in metadata.delete_relationships)
+
+    def delete(self, **kwargs):
+        """Set :attr:`object` to the result of :meth:`get_object`,
+        delete the object from the database, and create a response using the
+        return value of :meth:`get_context_data()`.
+
+        When :meth:`get_delete_by_query` is ``True`` the object is instead
+        deleted by :meth:`delete_object_by_query` and :attr:`object` is set to
+        ``None``. When it's ``False`` but the model only has relationships
+        from :meth:`get_passive_deletes`, the object is loaded and then
+        deleted by :meth:`delete_object_by_query`, so related rows are not
+        loaded.
+
+        Cached responses tagged with the model are invalidated, see
+        :func:`~flask_generic_views.cache.invalidate_tags`, and the write is
+        recorded with :meth:`~ReadReplicaMixin.record_write`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        passive = self.get_passive_deletes()
+
+        if self.get_delete_by_query():
+            self.object = None
+            self.delete_object_by_query()
+        elif passive and not self._delete_cascades(passive):
+            self.object = self.get_object()
+            values = _column_values(self.object)
+            self.delete_object_by_query()
+            session.expunge(self.object)
+            _restore_column_values(self.object, values)
+        else:
+            self.object = self.get_object()
+            values = _column_values(self.object)
+            session.delete(self.object)
+            session.commit()
+            _restore_column_values(self.object, values)
+
+        invalidate_tags(self.get_model())
+        self.record_write()
+        return redirect(self.get_success_url())
+
+    def count_passive_deletes(self, filters):
+        """Count the rows related to the object matching ``filters`` through
+        each relationship from :meth:`get_passive_deletes`, which the
+        database deletes or nullifies along with the object.
+
+        :param filters: filters from :meth:`get_lookup_filters`
+        :type filters: dict
+        :returns: numbers of rows deleted and of rows nullified, each keyed
+                  by relationship name
+        :rtype: tuple
+
+        """
+        model = self.get_model()
+        criteria = [getattr(model, k) == v for k, v in iteritems(filters)]
+
+        return _count_related(model, self.get_passive_deletes(),
+                              and_(*criteria))
+
+    def delete_object_by_query(self):
+        """Delete the row matching :meth:`get_lookup_filters` within the
+        query from :meth:`get_query` with a single ``DELETE`` statement.
+
+        When :meth:`get_query` is not the query for the model, which may
+        have joins a ``DELETE`` statement can not include, the primary-key
+        of the row is first selected with that query.
+
+        Rows related through :meth:`get_passive_deletes` are counted first
+        using :meth:`count_passive_deletes`, the counts are stored in
+        :attr:`cascaded_rows` and :attr:`nullified_rows` and the
+        :data:`~flask_generic_views.signals.rows_deleted` signal is sent once
+        the deletion is committed.
+
+        :raises werkzeug.exceptions.NotFound: when no row was deleted
+        :raises sqlalchemy.orm.exc.MultipleResultsFound: when more than one
+                                                         row matched, the
+                                                         deletion is rolled
+                                                         back
+
+        """
+        model = self.get_model()
+        filters = self.get_lookup_filters()
+        criterion = and_(*[getattr(model, k) == v
+                           for k, v in iteritems(filters)])
+
+        if not _uses_model_query(self):
+            column = self.get_pk_column()
+            pks = [pk for pk, in _pk_query(self.get_query(), column)
+                   .filter(criterion).limit(2)]
+            criterion = column.in_(pks)
+
+        cascaded, nullified = self.count_passive_deletes(filters)
+
+        count = session.query(model).filter(criterion) \
+            .delete(synchronize_session=False)
+
+        if count != 1:
+            session.rollback()
+
+            if count == 0:
+                abort(404)
+
+            error = ('{0} matched {1} rows when deleting by query')
+
+            raise MultipleResultsFound(error.format(self.__class__.__name__,
+                                                    count))
+
+        session.commit()
+
+        _invalidate_lookup(model, filters)
+
+        self.cascaded_rows = cascaded
+        self.nullified_rows = nullified
+
+        rows_deleted.send(self, model=model, count=count, cascaded=cascaded,
+                          nullified=nullified)
+
+    def post(self, **kwargs):
+        """Passes all keyword arguments to :meth:`delete`.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+
+        """
+        return self.delete(**kwargs)
+
+    def get_success_url(self):
+        """Retrive the URL to redirect to when the form is successfully
+        validated.
+
+        By default returns :attr:`success_url` after being interpolated with
+        the object attributes using :meth:`~str.format`. So ``"/posts/{id}"``
+        will be populated with ``self.object.id``
+
+        When the object was deleted by query, it's interpolated with the
+        current requests :attr:`~flask.Request.view_args` and the filters
+        from :meth:`get_lookup_filters` instead.
+
+        :returns: URL
+        :rtype: str
+
+        """
+        if self.success_url is None:
+            error = ("{0} requires either a definition of 'success_url' or "
+                     "an implementation of 'get_success_url()'")
+
+            raise NotImplementedError(error.format(self.__class__.__name__))
+
+        if self.object is None:
+            values = dict(request.view_args, **self.get_lookup_filters())
+        else:
+            values = self.object.__dict__
+
+        return self.success_url.format(**values)
+
+
+class BaseDeleteView(DeletionMixin, BaseDetailView):
+    """View class for deleting an object."""
+
+    methods = ['GET', 'POST', 'DELETE']
+
+
+class DeleteView(SingleObjectTemplateResponseMixin, BaseDeleteView):
+    """Displays a confirmation page and deletes an existing object. The object
+    will ve deleted on POST or DELETE requests, for GET requests a conformation
+    page will be shown which should contain a form to POST to the same URL.
+
+    ::
+
+        class PostDeleteView(DeleteView):
+            model = Post
+            success_url = "/posts"
+
+        post_delete = PostDeleteView.as_view('post_delete')
+
+        app.add_url_rule('/posts/<id>', view_func=post_delete)
+
+    The above will render ``post_delete.html`` when accessed by GET request,
+    for a POST or DELETE request an instance will be deleted from the database
+    and the user redirected to ``/posts``.
+
+    ::
+
+        post_delete = DeleteView.as_view('post_delete', model=Post,
+                                         success_url = '/posts')
+
+        app.add_url_rule('/posts/<id>/delete', view_func=post_delete)
+
+    It can also be used directly in a URL rule to avoid having to create
+    additional classes.
+
+    .. code-block:: jinja
+
+        {# post_form.html #}
+        <form action="" method="post">
+          <p>Are you sure you want to delete "{{ object }}"?</p>
+          <input type="submit" value="Delete">
+        </form>
+
+    """
+    template_name_suffix = '_delete'
+
+
+class BulkDeletionMixin(DeletionMixin):
+    """Handle the deletion of many objects, identified by the primary-keys
+    submitted with the request.
+
+    The primary-keys are read from the form field named by :attr:`pk_arg`,
+    or from a JSON body containing either a list or an object with a list
+    under the :attr:`pk_arg` key.
+
+    ::
+
+        pk=1&pk=2&pk=5
+
+    ::
+
+        {"pk": [1, 2, 5]}
+
+    Only objects within the query from :meth:`get_query` are deleted, when
+    any primary-key does not match an object the deletion is rolled back and
+    a :exc:`~werkzeug.exceptions.NotFound` exception raised.
+
+    """
+
+    pk_arg = 'pk'
+    chunk_size = 500
+    deleted_count = None
+
+    def get_pks(self):
+        """Retrieve the primary-keys of the objects to delete from the
+        current request, converted to the python type of the primary-key
+        column and without duplicates.
+
+        :returns: primary-keys
+        :rtype: list
+        :raises werkzeug.exceptions.BadRequest: when no primary-keys are given
+                                                or any is invalid
+
+        """
+        data = request.get_json(silent=True)
+
+        if isinstance(data, dict):
+            data = data.get(self.pk_arg)
+
+        if data is None:
+            data = request.form.getlist(self.pk_arg)
+
+        if not isinstance(data, list) or not data:
+            abort(400)
+
+        column = self.get_pk_column()
+
+        pks = []
+
+        for value in data:
+            try:
+                value = _python_value(column, value)
+            except ValueError:
+                abort(400)
+
+            if value not in pks:
+                pks.append(value)
+
+        return pks
+
+    def get_chunk_size(self):
+        """Retrieve the number of primary-keys included in each ``DELETE``
+        statement.
+
+        By default returns :attr:`chunk_size`.
+
+        :returns: chunk size
+        :rtype: int
+
+        """
+        return self.chunk_size
+
+    def delete(self, **kwargs):
+        """Delete the objects matching the primary-keys from :meth:`get_pks`
+        and redirect to :meth:`get_success_url`.
+
+        The objects are deleted with ``DELETE ... WHERE pk IN (...)``
+        statements of at most :meth:`get_chunk_size` primary-keys, all in one
+        transaction. When :meth:`get_query` is not the query for the model,
+        the primary-keys within it are selected before each statement. When
+        deleting objects of the model has effects handled by the ORM, see
+        :meth:`~DeletionMixin.get_delete_by_query`, each chunk of objects is
+        instead loaded and deleted by the session.
+
+        :attr:`deleted_count` is set to the number of objects deleted, and
+        the :data:`~flask_generic_views.signals.rows_deleted` signal is sent
+        when they were deleted with ``DELETE`` statements.
+
+        :param kwargs: keyword arguments from url rule
+        :type kwargs: dict
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
+        :raises werkzeug.exceptions.NotFound: when any primary-key did not
+                                              match an object
+
+        """
+        model = self.get_model()
+        column = self.get_pk_column()
+        pks = self.get_pks()
+        chunk_size = self.get_chunk_size()
 
-    """
+        passive = self.get_passive_deletes()
+        by_query = not self._delete_cascades(passive)
 
+        query = self.get_query()
+        scoped = not _uses_model_query(self)
 
-class ModelFormMixin(FormMixin, SingleObjectMixin):
-    fields = None
+        count = 0
+        cascaded = {}
+        nullified = {}
 
-    def get_form_class(self):
-        """Retrieve the form class to instantiate.
+        for i in range(0, len(pks), chunk_size):
+            chunk = pks[i:i + chunk_size]
 
-        When :attr:`form_class` is not set, a form class will be automatically
-        generated using :attr:`model` and :attr:`fields`.
+            if scoped:
+                chunk = [pk for pk, in _pk_query(query, column)
+                         .filter(column.in_(chunk))]
 
-        :returns: form class
-        :rtype: type
+            deleted, counts, nulls = _delete_rows(model, column.in_(chunk),
+                                                  passive, by_query)
 
-        """
-        if self.fields is not None and self.form_class:
-            error = ("{0} requires either a definition of 'fields' or "
-                     "'form_class', not both")
+            count += deleted
 
-            raise RuntimeError(error.format(self.__class__.__name__))
+            for name, n in iteritems(counts):
+                cascaded[name] = cascaded.get(name, 0) + n
 
-        if self.form_class:
-            return self.form_class
+            for name, n in iteritems(nulls):
+                nullified[name] = nullified.get(name, 0) + n
 
-        if self.fields is None:
-            error = ("{0} requires a definition of 'fields' when "
-                     "'form_class' is not defined")
+        if count != len(pks):
+            session.rollback()
+            abort(404)
 
-            raise NotImplementedError(error.format(self.__class__.__name__))
+        session.commit()
 
-        return model_form(self.get_model(), session, Form, self.fields)
+        if by_query:
+            _invalidate_changes(set((model, (pk,)) for pk in pks),
+                                model_registry.get(model).mapper.tables)
 
-    def get_form_kwargs(self):
-        """Extends the form keyword arguments with `obj`
-        containing :attr:`object` when set.
+        invalidate_tags(model)
+        self.record_write()
 
-        :returns: keyword arguments
-        :rtype: dict
+        self.deleted_count = count
 
-        """
-        kwargs = super(ModelFormMixin, self).get_form_kwargs()
+        if by_query:
+            self.cascaded_rows = cascaded
+            self.nullified_rows = nullified
 
-        if hasattr(self, 'object'):
-            kwargs['obj'] = self.object
+            rows_deleted.send(self, model=model, count=count,
+                              cascaded=cascaded, nullified=nullified)
 
-        return kwargs
+        return redirect(self.get_success_url())
 
     def get_success_url(self):
-        """Retrive the URL to redirect to when the form is successfully
-        validated.
+        """Retrive the URL to redirect to when the objects were deleted.
 
         By default returns :attr:`success_url` after being interpolated with
-        the object attributes using :meth:`~str.format`. So ``"/posts/{id}"``
-        will be populated with ``self.object.id``
+        the number of objects deleted using :meth:`~str.format`. So
+        ``"/posts?deleted={count}"`` will be populated with
+        :attr:`deleted_count`.
 
         :returns: URL
         :rtype: str
@@ -770,190 +4302,207 @@ class ModelFormMixin(FormMixin, SingleObjectMixin):
 
             raise NotImplementedError(error.format(self.__class__.__name__))
 
-        return self.success_url.format(**self.object.__dict__)
+        return self.success_url.format(count=self.deleted_count)
 
-    def form_valid(self, form):
-        """Creates or updates :attr:`object` from :attr:`model`, persists it to
-        database, and redirects to :meth:`get_success_url`.
 
-        :param form: form instance
-        :type form: flask_wtf.Form
-        :returns: response
-        :rtype: werkzeug.wrappers.Response
+class BulkDeleteView(BulkDeletionMixin, MultipleObjectMixin, MethodView):
+    """Deletes many objects at once. The objects are deleted on POST or
+    DELETE requests with the primary-keys given in the form data or JSON
+    body, limited to the objects of :meth:`get_query`.
 
-        """
-        if not hasattr(self, 'object'):
-            self.object = self.model()
-            session.add(self.object)
+    ::
 
-        form.populate_obj(self.object)
+        class PostBulkDeleteView(BulkDeleteView):
+            model = Post
+            success_url = '/posts?deleted={count}'
 
-        session.commit()
+            def get_query(self):
+                query = super(PostBulkDeleteView, self).get_query()
 
-        _touch(self.object)
+                return query.filter_by(author=current_user)
 
-        return super(ModelFormMixin, self).form_valid(form)
+        post_bulk_delete = PostBulkDeleteView.as_view('post_bulk_delete')
 
+        app.add_url_rule('/posts/delete', view_func=post_bulk_delete)
 
-class BaseCreateView(ModelFormMixin, ProcessFormView):
-    """View class for creating an object."""
+    The above will delete the posts of the current user listed in the
+    request, and redirect to ``/posts?deleted=3`` after deleting three
+    posts.
 
+    .. code-block:: jinja
 
-class CreateView(SingleObjectTemplateResponseMixin, BaseCreateView):
-    """View class to display a form for creating an object. When invalid it
-    shows the form with validation errors, when valid it saves a new object to
-    the database and redirects to a new URL.
+        {# post_list.html #}
+        <form action="{{ url_for('post_bulk_delete') }}" method="post">
+          {% for post in post_list %}
+            <input type="checkbox" name="pk" value="{{ post.id }}">
+            {{ post.title }}
+          {% endfor %}
+          <input type="submit" value="Delete selected">
+        </form>
 
-    .. code-block:: python
+    """
 
-        class PostCreateView(FormView):
-            model = Post
-            fields = ('title', 'body')
-            success_url = '/posts/{id}'
+    methods = ['DELETE', 'POST']
 
-        post_create = PostCreateView.as_view('post_create')
 
-        app.add_url_rule('/posts/new', view_func=post_create)
+PurgeProgress = namedtuple('PurgeProgress',
+                           ('deleted', 'chunks', 'chunk_size', 'seconds'))
 
-    The above example will render the template ``post_form.html`` with an
-    instance of :class:`flask_wtf.Form` in the context variable ``form`` with
-    fields based on :attr:`~ModelFormView.fields` and
-    :attr:`ModelFormView.model`, when the user submits the form with valid data
-    an instance of Post will be saved to the database, and the user redirected
-    to its page, when the form is submitted with  invalid data
-    ``post_form.html`` will be rendered again, and the form will contain any
-    error messages.
 
-    .. code-block:: python
+class PurgeMixin(DeletionMixin):
+    """Handle the deletion of every object of :meth:`get_query`, such as
+    rows older than a number of days, in chunks committed one after another.
 
-        post_create = CreateView.as_view('post_create', model=Post,
-                                         fields=('title', 'body'),
-                                         success_url = '/posts/{id}')
+    Each chunk selects the primary-keys of at most a chunk size of matching
+    rows, deletes them with a query for the model alone and commits, so
+    locks are only held for the duration of a chunk and the query may have
+    joins. The chunk size starts at :attr:`chunk_size` and is adjusted
+    after each chunk so a chunk takes about :attr:`lock_time` seconds.
 
-        app.add_url_rule('/posts/new', view_func=post_create)
+    As every chunk is committed, an interrupted purge leaves the rows
+    deleted so far deleted and the remaining rows intact, running it again
+    continues with the remaining rows.
 
-    It can also be used directly in a URL rule to avoid having to create
-    additional classes.
+    """
 
-    .. code-block:: jinja
+    chunk_size = 1000
+    min_chunk_size = 10
+    max_chunk_size = 10000
+    lock_time = 0.5
+    chunk_pause = 0
+    time_limit = None
+    deleted_count = None
+    purge_complete = None
 
-        {# post_form.html #}
-        <form action="" method="post">
-          <p>{{ form.title.label }} {{ form.title }}</p>
-          <p>{{ form.title.label }} {{ form.title }}</p>
-          <input type="submit" value="Save">
-        </form>
+    def get_chunk_size(self):
+        """Retrieve the number of rows deleted by the first chunk.
 
-    """
-    template_name_suffix = '_form'
+        By default returns :attr:`chunk_size`.
 
+        :returns: chunk size
+        :rtype: int
 
-class BaseUpdateView(ModelFormMixin, ProcessFormView):
-    """View class for updating an object."""
+        """
+        return self.chunk_size
 
-    def get(self, **kwargs):
-        """Set :attr:`object` to the result of :meth:`get_object` and
-        create a response using the return value of :meth:`get_context_data()`.
+    def get_next_chunk_size(self, chunk_size, seconds):
+        """Retrieve the number of rows deleted by the next chunk, after a
+        chunk of ``chunk_size`` rows took ``seconds`` seconds.
 
-        :param kwargs: keyword arguments from url rule
-        :type kwargs: dict
-        :returns: response
-        :rtype: werkzeug.wrappers.Response
+        By default the chunk size is scaled by the ratio between
+        :attr:`lock_time` and ``seconds``, growing at most twofold, and kept
+        between :attr:`min_chunk_size` and :attr:`max_chunk_size`.
+
+        :param chunk_size: size of the previous chunk
+        :type chunk_size: int
+        :param seconds: seconds taken by the previous chunk
+        :type seconds: float
+        :returns: chunk size
+        :rtype: int
 
         """
-        self.object = self.get_object()
-        return super(BaseUpdateView, self).get(**kwargs)
+        if seconds > 0:
+            factor = min(2.0, self.lock_time / seconds)
+        else:
+            factor = 2.0
 
-    def post(self, **kwargs):
-        """Set :attr:`object` to the result of :meth:`get_object` and
-        construct and validates a form.
+        chunk_size = int(chunk_size * factor)
 
-        When the form is valid :meth:`form_valid` is called, when the form
-        is invalid :meth:`form_invalid` is called.
+        return max(self.min_chunk_size, min(self.max_chunk_size, chunk_size))
 
-        :param kwargs: keyword arguments from url rule
-        :type kwargs: dict
-        :returns: response
-        :rtype: werkzeug.wrappers.Response
+    def iter_purge(self):
+        """Delete the objects of :meth:`get_query` chunk by chunk, yielding
+        a :class:`PurgeProgress` after each chunk is committed.
+
+        Stops when no objects remain, setting :attr:`purge_complete` to
+        ``True``, or once :attr:`time_limit` seconds have passed, setting it
+        to ``False``. :attr:`deleted_count` holds the number of objects
+        deleted so far.
+
+        The :data:`~flask_generic_views.signals.rows_deleted` signal is sent
+        for each chunk deleted with a ``DELETE`` statement. When a chunk
+        fails it is rolled back, leaving the previous chunks deleted.
+
+        :returns: progress iterator
+        :rtype: collections.Iterator
 
         """
-        self.object = self.get_object()
-        return super(BaseUpdateView, self).post(**kwargs)
+        model = self.get_model()
+        column = self.get_pk_column()
+        tables = model_registry.get(model).mapper.tables
 
+        passive = self.get_passive_deletes()
+        by_query = not self._delete_cascades(passive)
 
-class UpdateView(SingleObjectTemplateResponseMixin, BaseUpdateView):
-    """View class to display a form for updating an object. When invalid it
-    shows the form with validation errors, when valid it saves the updated
-    object to the database and redirects to a new URL.
+        query = _pk_query(self.get_query(), column).order_by(column)
+        chunk_size = self.get_chunk_size()
 
-    .. code-block:: python
+        self.deleted_count = 0
+        self.purge_complete = False
 
-        class PostUpdateView(FormView):
-            model = Post
-            fields = ('title', 'body')
-            success_url = '/posts/{id}'
+        started = _time.time()
+        chunks = 0
 
-        post_update = PostUpdateView.as_view('post_update')
+        while self.time_limit is None or \
+                _time.time() - started < self.time_limit:
+            start = _time.time()
 
-        app.add_url_rule('/posts/new', view_func=post_update)
+            try:
+                pks = [pk for pk, in query.limit(chunk_size)]
 
-    The above example will render the template ``post_form.html`` with an
-    instance of :class:`flask_wtf.Form` in the context variable ``form`` with
-    fields based on :attr:`~ModelFormView.fields` and
-    :attr:`ModelFormView.model`, when the user submits the form with valid data
-    an instance of Post will be updated in the database, and the user
-    redirected to its page, when the form is submitted with  invalid data
-    ``post_form.html`` will be rendered again, and the form will contain any
-    error messages.
+                if not pks:
+                    session.rollback()
+                    self.purge_complete = True
+                    break
 
-    .. code-block:: python
+                count, cascaded, nullified = _delete_rows(
+                    model, column.in_(pks), passive, by_query)
 
-        post_update = UpdateView.as_view('post_update', model=Post,
-                                         fields=('title', 'body'),
-                                         success_url = '/posts/{id}')
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
 
-        app.add_url_rule('/posts/<pk>/edit', view_func=post_update)
+            seconds = _time.time() - start
 
-    It can also be used directly in a URL rule to avoid having to create
-    additional classes.
+            if by_query:
+                _invalidate_changes(set((model, (pk,)) for pk in pks),
+                                    tables)
 
-    .. code-block:: jinja
+                rows_deleted.send(self, model=model, count=count,
+                                  cascaded=cascaded, nullified=nullified)
 
-        {# post_form.html #}
-        <form action="" method="post">
-          <p>{{ form.title.label }} {{ form.title }}</p>
-          <p>{{ form.title.label }} {{ form.title }}</p>
-          <input type="submit" value="Save">
-        </form>
+            invalidate_tags(model)
 
-    """
-    template_name_suffix = '_form'
+            self.deleted_count += count
+            chunks += 1
 
+            yield PurgeProgress(self.deleted_count, chunks, len(pks), seconds)
 
-class DeletionMixin(object):
-    """Handle the DELETE http method."""
+            chunk_size = self.get_next_chunk_size(len(pks), seconds)
 
-    success_url = None
+            if self.chunk_pause:
+                _time.sleep(self.chunk_pause)
 
-    def delete(self, **kwargs):
-        """Set :attr:`object` to the result of :meth:`get_object`,
-        delete the object from the database, and create a response using the
-        return value of :meth:`get_context_data()`.
+    def purge(self):
+        """Delete every object of :meth:`get_query` using
+        :meth:`iter_purge`, for use outside of a request such as in a
+        command.
 
-        :param kwargs: keyword arguments from url rule
-        :type kwargs: dict
-        :returns: response
-        :rtype: werkzeug.wrappers.Response
+        :returns: number of objects deleted
+        :rtype: int
 
         """
-        self.object = self.get_object()
-        session.delete(self.object)
-        session.commit()
-        _touch(self.object)
-        return redirect(self.get_success_url())
+        for progress in self.iter_purge():
+            pass
 
-    def post(self, **kwargs):
-        """Passes all keyword arguments to :meth:`delete`.
+        return self.deleted_count
+
+    def delete(self, **kwargs):
+        """Create a response streaming the progress of :meth:`iter_purge`.
+
+        The write is recorded with :meth:`~ReadReplicaMixin.record_write`
+        before the purge starts.
 
         :param kwargs: keyword arguments from url rule
         :type kwargs: dict
@@ -961,78 +4510,73 @@ class DeletionMixin(object):
         :rtype: werkzeug.wrappers.Response
 
         """
-        return self.delete(**kwargs)
-
-    def get_success_url(self):
-        """Retrive the URL to redirect to when the form is successfully
-        validated.
-
-        By default returns :attr:`success_url` after being interpolated with
-        the object attributes using :meth:`~str.format`. So ``"/posts/{id}"``
-        will be populated with ``self.object.id``
-
-        :returns: URL
-        :rtype: str
-
-        """
-        if self.success_url is None:
-            error = ("{0} requires either a definition of 'success_url' or "
-                     "an implementation of 'get_success_url()'")
-
-            raise NotImplementedError(error.format(self.__class__.__name__))
+        self.record_write()
 
-        return self.success_url.format(**self.object.__dict__)
-        if self.success_url is None:
-            error = ("{0} requires either a definition of 'success_url' or "
-                     "an implementation of 'get_success_url()'")
+        return self.create_response(self.iter_purge())
 
-            raise NotImplementedError(error.format(self.__class__.__name__))
+    def create_response(self, progress):
+        """Returns a :attr:`response_class` instance streaming a line of
+        JSON for each item of ``progress``, followed by a line with the
+        total number of objects deleted and wether the purge completed.
 
-        return self.success_url.format(**self.object.__dict__)
+        ::
 
+            {"deleted": 1000, "chunks": 1, "chunk_size": 1000, "seconds": 0.2}
+            {"deleted": 1200, "chunks": 2, "chunk_size": 200, "seconds": 0.05}
+            {"deleted": 1200, "complete": true}
 
-class BaseDeleteView(DeletionMixin, BaseDetailView):
-    """View class for deleting an object."""
+        :param progress: progress iterator
+        :type progress: collections.Iterator
+        :returns: response
+        :rtype: werkzeug.wrappers.Response
 
-    methods = ['GET', 'POST', 'DELETE']
+        """
+        def generate(progress):
+            for item in progress:
+                yield json.dumps(item._asdict()) + '\n'
 
+            yield json.dumps({'deleted': self.deleted_count,
+                              'complete': self.purge_complete}) + '\n'
 
-class DeleteView(SingleObjectTemplateResponseMixin, BaseDeleteView):
-    """Displays a confirmation page and deletes an existing object. The object
-    will ve deleted on POST or DELETE requests, for GET requests a conformation
-    page will be shown which should contain a form to POST to the same URL.
+        return self.response_class(stream_with_context(generate(progress)),
+                                   mimetype='application/x-ndjson')
 
-    ::
 
-        class PostDeleteView(DeleteView):
-            model = Post
-            success_url = "/posts"
+class PurgeView(PurgeMixin, MultipleObjectMixin, MethodView):
+    """Deletes every object of :meth:`get_query` in chunks on POST or DELETE
+    requests, streaming the progress as newline delimited JSON.
 
-        post_delete = PostDeleteView.as_view('post_delete')
+    .. code-block:: python
 
-        app.add_url_rule('/posts/<id>', view_func=post_delete)
+        class SessionPurgeView(PurgeView):
+            model = UserSession
+            lock_time = 0.2
+            time_limit = 60
 
-    The above will render ``post_delete.html`` when accessed by GET request,
-    for a POST or DELETE request an instance will be deleted from the database
-    and the user redirected to ``/posts``.
+            def get_query(self):
+                cutoff = datetime.utcnow() - timedelta(days=30)
+                query = super(SessionPurgeView, self).get_query()
 
-    ::
+                return query.filter(UserSession.created_at < cutoff)
 
-        post_delete = DeleteView.as_view('post_delete', model=Post,
-                                         success_url = '/posts')
+        app.add_url_rule('/sessions/purge',
+                         view_func=SessionPurgeView.as_view('session_purge'))
 
-        app.add_url_rule('/posts/<id>/delete', view_func=post_delete)
+    The above will delete sessions older than 30 days in chunks that hold
+    their locks for about 0.2 seconds, stopping after a minute. When the
+    last line reports the purge as incomplete, requesting it again
+    continues where it stopped.
 
-    It can also be used directly in a URL rule to avoid having to create
-    additional classes.
+    The purge can also be run from a command, within an application
+    context.
 
-    .. code-block:: jinja
+    .. code-block:: python
 
-        {# post_form.html #}
-        <form action="" method="post">
-          <p>Are you sure you want to delete "{{ object }}"?</p>
-          <input type="submit" value="Delete">
-        </form>
+        @app.cli.command()
+        def purge_sessions():
+            click.echo(SessionPurgeView(time_limit=None).purge())
 
     """
-    template_name_suffix = '_delete'
+
+    methods = ['DELETE', 'POST']
+    response_class = Response
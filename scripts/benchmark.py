@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for the generic views.
+
+    $ python scripts/benchmark.py            # run all benchmarks
+    $ python scripts/benchmark.py metadata   # run a single benchmark
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import timeit
+
+from flask import Flask, request
+from inflection import underscore
+from sqlalchemy import Column, Integer, String, Text, create_engine
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from flask_generic_views.sqlalchemy import (  # noqa: E402
+    ConcurrentCount, ExactCount, ExportView, MultipleObjectMixin,
+    SingleObjectMixin, _query_key, model_registry)
+
+BENCHMARKS = []
+
+Session = scoped_session(sessionmaker())
+
+Base = declarative_base()
+Base.query = Session.query_property()
+
+
+class BlogPost(Base):
+    __tablename__ = 'blog_post'
+
+    id = Column(Integer, primary_key=True)
+    slug = Column(String(80), unique=True)
+    title = Column(String(80))
+    body = Column(Text)
+
+
+def benchmark(fn):
+    BENCHMARKS.append(fn)
+    return fn
+
+
+def report(name, seconds, number):
+    print('  {0:<30} {1:>10.2f} us'.format(name, seconds / number * 1e6))
+
+
+def report_memory(name, size):
+    print('  {0:<30} {1:>10.2f} KiB'.format(name, size / 1024.0))
+
+
+def report_throughput(name, requests, seconds):
+    print('  {0:<30} {1:>10.2f} req/s'.format(name, requests / seconds))
+
+
+def peak_memory(fn):
+    tracemalloc.start()
+
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def populate(rows, url='sqlite://', body=20):
+    Session.remove()
+    Session.configure(bind=create_engine(url))
+    Base.metadata.drop_all(Session.get_bind())
+    Base.metadata.create_all(Session.get_bind())
+
+    for start in range(0, rows, 10000):
+        Session.execute(BlogPost.__table__.insert(), [
+            {'slug': 'post-{0}'.format(i), 'title': 'Post {0}'.format(i),
+             'body': 'Lorem ipsum dolor sit amet. ' * body}
+            for i in range(start, min(start + 10000, rows))])
+
+    Session.commit()
+
+
+@benchmark
+def metadata(number):
+    """Per-request model metadata lookups, as performed by a DetailView."""
+
+    def uncached():
+        inspect(BlogPost).primary_key
+        underscore(BlogPost.__name__)
+        underscore(BlogPost.__name__)
+
+    def cached():
+        metadata = model_registry.get(BlogPost)
+        metadata.primary_key
+        metadata.context_object_name
+        metadata.template_name
+
+    report('uncached', timeit.timeit(uncached, number=number), number)
+    report('registry', timeit.timeit(cached, number=number), number)
+
+
+@benchmark
+def rows(number):
+    """Retrieving a page of a ListView as entities and as rows."""
+    populate(10000)
+
+    class View(MultipleObjectMixin):
+        model = BlogPost
+        order_by = (BlogPost.id,)
+
+        def get_page(self, error_out):
+            return 1
+
+    number = max(1, number // 1000)
+
+    for per_page in (1000, 10000):
+        for row_mode in (False, True):
+            view = View()
+            view.row_mode = row_mode
+
+            def page():
+                view.apply_pagination(view.get_query(), per_page, False)
+                Session.remove()
+
+            name = '{0} {1}'.format(per_page, 'rows' if row_mode else
+                                    'entities')
+
+            report(name, timeit.timeit(page, number=number), number)
+
+            if tracemalloc:
+                report_memory(name, peak_memory(page))
+
+
+@benchmark
+def export(number):
+    """Streaming a whole table from an ExportView as CSV and NDJSON."""
+    app = Flask(__name__)
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    class View(ExportView):
+        model = BlogPost
+        fields = ('id', 'slug', 'title', 'body')
+
+    try:
+        for rows in (100000, 1000000):
+            populate(rows, 'sqlite:///' + path, body=2)
+
+            for export_format in ('csv', 'ndjson'):
+                view = View()
+                view.export_format = export_format
+
+                def consume():
+                    with app.test_request_context():
+                        response = view.get()
+
+                    size = 0
+
+                    for chunk in response.iter_encoded():
+                        size += len(chunk)
+
+                    Session.remove()
+
+                    return size
+
+                name = '{0} {1}'.format(rows, export_format)
+
+                start = timeit.default_timer()
+                consume()
+                report(name, timeit.default_timer() - start, 1)
+
+                if tracemalloc:
+                    report_memory(name, peak_memory(consume))
+    finally:
+        Session.remove()
+        os.remove(path)
+
+
+@benchmark
+def statements(number):
+    """Building the statements of a DetailView and a paginated ListView."""
+    app = Flask(__name__)
+
+    populate(100)
+
+    class View(SingleObjectMixin):
+        model = BlogPost
+
+    number = max(1, number // 10)
+
+    with app.test_request_context('/'):
+        request.view_args = {'pk': 1}
+
+        for use_lambda_statements in (False, True):
+            view = View()
+            view.use_lambda_statements = use_lambda_statements
+
+            name = 'detail {0}'.format('lambda' if use_lambda_statements else
+                                       'query')
+
+            report(name, timeit.timeit(view.get_object, number=number),
+                   number)
+
+    query = BlogPost.query.filter(BlogPost.title != 'Post 1') \
+        .order_by(BlogPost.id).limit(10).offset(20)
+
+    def compiled():
+        query.statement.compile()
+
+    def cache_key():
+        _query_key(query)
+
+    report('page key compiled', timeit.timeit(compiled, number=number),
+           number)
+    report('page key cached', timeit.timeit(cache_key, number=number),
+           number)
+
+    Session.remove()
+
+
+@benchmark
+def count(number):
+    """Retrieving a filtered page and its count, sequentially and
+    concurrently."""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    class View(MultipleObjectMixin):
+        model = BlogPost
+        order_by = (BlogPost.id,)
+
+        def get_page(self, error_out):
+            return 50
+
+    number = max(1, number // 1000)
+
+    try:
+        populate(200000, 'sqlite:///' + path, body=2)
+
+        for strategy in (ExactCount(), ConcurrentCount()):
+            view = View()
+            view.count_strategy = strategy
+            view.query = BlogPost.query.filter(BlogPost.body.like('%ipsum%'))
+
+            def page():
+                view.apply_pagination(view.get_query(), 20, False)
+                Session.remove()
+
+            name = type(strategy).__name__
+
+            report(name, timeit.timeit(page, number=number), number)
+    finally:
+        Session.remove()
+        os.remove(path)
+
+
+@benchmark
+def async_views(number):
+    """Throughput of sync and AsyncSession ListViews under concurrent load."""
+    from jinja2 import DictLoader
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from flask_generic_views import async_sqlalchemy, sqlalchemy
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    app = Flask(__name__)
+    app.jinja_loader = DictLoader({
+        'blog_post_list.html': '{% for post in blog_post_list %}'
+                               '{{ post.title }}{% endfor %}'
+                               '{{ pagination.total }}'})
+
+    engine = create_async_engine('sqlite+aiosqlite:///' + path,
+                                 poolclass=NullPool)
+    async_session = sessionmaker(engine, class_=AsyncSession,
+                                 expire_on_commit=False)
+
+    options = {'model': BlogPost, 'order_by': (BlogPost.id,),
+               'per_page': 20}
+
+    app.add_url_rule('/sync', view_func=sqlalchemy.ListView.as_view(
+        'sync', **options))
+    app.add_url_rule('/async', view_func=async_sqlalchemy.ListView.as_view(
+        'async', session_factory=async_session, **options))
+
+    number = max(1, number // 100)
+
+    def load(url, concurrency):
+        def worker():
+            client = app.test_client()
+
+            for i in range(number):
+                client.get('{0}?page={1}'.format(url, i % 50 + 1))
+                Session.remove()
+
+        threads = [threading.Thread(target=worker)
+                   for i in range(concurrency)]
+
+        start = timeit.default_timer()
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        return timeit.default_timer() - start
+
+    try:
+        populate(1000, 'sqlite:///' + path)
+
+        for concurrency in (1, 8):
+            for url in ('/sync', '/async'):
+                seconds = load(url, concurrency)
+                name = '{0} x{1}'.format(url[1:], concurrency)
+
+                report_throughput(name, number * concurrency, seconds)
+    finally:
+        Session.remove()
+        os.remove(path)
+
+
+def main():
+    names = [fn.__name__ for fn in BENCHMARKS]
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help='one of: {0}'.format(', '.join(names)))
+    parser.add_argument('-n', '--number', type=int, default=10000)
+
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in names:
+            parser.error('unknown benchmark: {0}'.format(name))
+
+    for fn in BENCHMARKS:
+        if not args.benchmarks or fn.__name__ in args.benchmarks:
+            print('{0}: {1}'.format(fn.__name__, fn.__doc__))
+            fn(args.number)
+
+
+if __name__ == '__main__':
+    main()
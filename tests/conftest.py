@@ -1,4 +1,7 @@
 import os
+import sys
+from collections import namedtuple
+from datetime import datetime
 
 import pytest
 from flask import Flask
@@ -8,11 +11,74 @@ settings.register_profile('slow', settings(max_examples=200))
 settings.register_profile('fast', settings(max_examples=20))
 settings.load_profile(os.getenv(u'HYPOTHESIS_PROFILE', 'fast'))
 
+collect_ignore = []
+
+if sys.version_info < (3, 6):
+    collect_ignore.extend(['test_asyncio.py', 'test_async_sqlalchemy.py'])
+
+Models = namedtuple('Models', ('Author', 'Post', 'Comment'))
+
 
 @pytest.fixture(autouse=True)
 def flask(request):
     app = Flask(__name__)
+    app.secret_key = 'secret'
     ctx = app.test_request_context('/')
     ctx.push()
 
     request.addfinalizer(ctx.pop)
+
+    return app
+
+
+@pytest.fixture(autouse=True)
+def registry(request):
+    # sqlalchemy is an optional extra, only reset the registry once imported.
+    module = sys.modules.get('flask_generic_views.sqlalchemy')
+
+    if module is not None:
+        request.addfinalizer(module.model_registry.invalidate)
+
+
+@pytest.fixture
+def db(request, flask):
+    SQLAlchemy = pytest.importorskip('flask_sqlalchemy').SQLAlchemy
+
+    flask.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    flask.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    db = SQLAlchemy(flask)
+
+    request.addfinalizer(db.session.remove)
+
+    return db
+
+
+@pytest.fixture
+def models(db):
+    class Author(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(80))
+
+    class Post(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        slug = db.Column(db.String(80))
+        title = db.Column(db.String(80))
+        body = db.Column(db.Text)
+        created_at = db.Column(db.DateTime, default=datetime.utcnow)
+        author_id = db.Column(db.Integer, db.ForeignKey(Author.id))
+
+        author = db.relationship(Author, backref='posts')
+
+    class Comment(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        body = db.Column(db.Text)
+        post_id = db.Column(db.Integer, db.ForeignKey(Post.id))
+        version = db.Column(db.Integer, default=1)
+
+        post = db.relationship(Post, backref='comments')
+
+    db.create_all()
+    db.configure_mappers()
+
+    return Models(Author, Post, Comment)
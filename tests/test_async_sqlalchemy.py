@@ -0,0 +1,342 @@
+import asyncio
+
+import pytest
+from jinja2 import DictLoader
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+
+from flask_generic_views import async_sqlalchemy, cache, sqlalchemy
+
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@pytest.fixture
+def Session(request, models, tmpdir):
+    engine = create_async_engine(
+        'sqlite+aiosqlite:///{0}'.format(tmpdir.join('test.db')),
+        poolclass=NullPool)
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(models.Post.metadata.create_all)
+
+        async with AsyncSession(engine) as session:
+            author = models.Author(name=u'John')
+
+            session.add_all([
+                models.Post(slug=u'post-{0}'.format(i),
+                            title=u'Post {0}'.format(i), author=author)
+                for i in range(5)])
+
+            await session.commit()
+
+    run(setup())
+
+    request.addfinalizer(lambda: run(engine.dispose()))
+
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def titles(Session, Post):
+    async with Session() as session:
+        result = await session.execute(select(Post.title).order_by(Post.id))
+
+        return result.scalars().all()
+
+
+class TestAsyncSessionMixin(object):
+
+    def test_get_session_factory(self):
+        instance = async_sqlalchemy.AsyncSessionMixin()
+
+        with pytest.raises(NotImplementedError) as excinfo:
+            instance.get_session_factory()
+
+        error = ("AsyncSessionMixin requires either a definition of "
+                 "'session_factory' or an implementation of "
+                 "'get_session_factory()'")
+
+        assert excinfo.value.args[0] == error
+
+        instance.session_factory = Mock()
+
+        assert instance.get_session_factory() == instance.session_factory
+
+    def test_get_session(self):
+        instance = async_sqlalchemy.AsyncSessionMixin()
+        instance.session_factory = Mock(side_effect=lambda: Mock())
+
+        session = instance.get_session()
+
+        assert instance.get_session() is session
+        assert instance.create_session() is not session
+        assert instance.session_factory.call_count == 2
+
+    def test_dispatch_request(self, flask, Session, models):
+        closed = []
+
+        def session_factory():
+            session = Session()
+            session.close = Mock(side_effect=session.close)
+            closed.append(session.close)
+
+            return session
+
+        flask.jinja_loader = DictLoader({'post_detail.html': ''})
+
+        view_func = async_sqlalchemy.DetailView.as_view(
+            'post_detail', model=models.Post, session_factory=session_factory)
+
+        flask.add_url_rule('/posts/<int:pk>', view_func=view_func)
+
+        client = flask.test_client()
+
+        assert client.get('/posts/1').status_code == 200
+        assert client.get('/posts/10').status_code == 404
+
+        assert len(closed) == 2
+        assert all(close.called for close in closed)
+
+
+class TestDetailView(object):
+
+    def test_get(self, flask, Session, models):
+        flask.jinja_loader = DictLoader({
+            'post_detail.html': '{{ post.title }} by {{ post.author.name }}'})
+
+        view_func = async_sqlalchemy.DetailView.as_view(
+            'post_detail', model=models.Post, session_factory=Session,
+            joined_load=('author',))
+
+        flask.add_url_rule('/posts/<int:pk>', view_func=view_func)
+        flask.add_url_rule('/posts/<slug>', view_func=view_func)
+
+        client = flask.test_client()
+
+        response = client.get('/posts/2')
+
+        assert response.get_data(as_text=True) == 'Post 1 by John'
+
+        response = client.get('/posts/post-3')
+
+        assert response.get_data(as_text=True) == 'Post 3 by John'
+
+        assert client.get('/posts/missing').status_code == 404
+
+    def test_get_query(self, models):
+        Post = models.Post
+
+        instance = async_sqlalchemy.SingleObjectMixin()
+
+        with pytest.raises(NotImplementedError):
+            instance.get_query()
+
+        instance.query = select(Post).where(Post.title != u'Post 1')
+
+        assert instance.get_model() is Post
+        assert instance.get_query() is instance.query
+
+
+class TestListView(object):
+
+    @pytest.fixture
+    def view(self, flask, Session, models):
+        flask.jinja_loader = DictLoader({
+            'post_list.html': '{% for post in post_list %}{{ post.title }};'
+                              '{% endfor %}{{ pagination.total }}'})
+
+        def add_view(**kwargs):
+            view_func = async_sqlalchemy.ListView.as_view(
+                'post_list', model=models.Post, session_factory=Session,
+                order_by=(models.Post.id,), **kwargs)
+
+            flask.add_url_rule('/posts', view_func=view_func)
+
+        return add_view
+
+    @pytest.mark.parametrize('concurrent', [False, True])
+    def test_get(self, flask, view, concurrent):
+        view(per_page=2, error_out=True, concurrent_count=concurrent)
+
+        client = flask.test_client()
+
+        with patch.object(async_sqlalchemy.ListView, 'create_session',
+                          autospec=True,
+                          side_effect=async_sqlalchemy.ListView
+                          .create_session) as m:
+            response = client.get('/posts?page=2')
+
+        assert response.get_data(as_text=True) == 'Post 2;Post 3;5'
+        assert m.call_count == (2 if concurrent else 1)
+
+        assert client.get('/posts?page=4').status_code == 404
+
+    def test_get_unpaginated(self, flask, view):
+        view()
+
+        response = flask.test_client().get('/posts')
+
+        assert response.get_data(as_text=True) == \
+            'Post 0;Post 1;Post 2;Post 3;Post 4;'
+
+    @pytest.mark.parametrize('name,value', [
+        ('pagination_mode', 'keyset'),
+        ('count_strategy', sqlalchemy.CappedCount()),
+        ('row_mode', True),
+        ('yield_per', 100),
+        ('page_cache', cache.TaggedCache(default_timeout=60))])
+    def test_get_unsupported(self, flask, view, name, value):
+        view(per_page=2, **{name: value})
+
+        flask.testing = True
+
+        with pytest.raises(RuntimeError) as excinfo:
+            flask.test_client().get('/posts')
+
+        error = "ListView does not support '{0}'".format(name)
+
+        assert excinfo.value.args[0] == error
+
+    def test_count(self, Session, models):
+        Post = models.Post
+
+        instance = async_sqlalchemy.MultipleObjectMixin()
+
+        async def count():
+            async with Session() as session:
+                statement = select(Post).where(Post.id > 2).order_by(Post.id)
+
+                return await instance.count(statement, session)
+
+        assert run(count()) == 3
+
+
+class TestFormViews(object):
+
+    @pytest.fixture(autouse=True)
+    def setup(self, flask):
+        flask.config['WTF_CSRF_ENABLED'] = False
+        flask.jinja_loader = DictLoader({
+            'post_form.html': '{{ form.errors|length }} {{ form.title.data }}',
+            'post_delete.html': 'Delete {{ post.title }}?'})
+
+    def test_create(self, flask, Session, models):
+        view_func = async_sqlalchemy.CreateView.as_view(
+            'post_create', model=models.Post, session_factory=Session,
+            fields=('title',), success_url='/posts/{id}')
+
+        flask.add_url_rule('/posts/new', view_func=view_func)
+
+        client = flask.test_client()
+
+        assert client.get('/posts/new').get_data(as_text=True) == '0 None'
+
+        with patch.object(async_sqlalchemy, 'invalidate_tags') as m:
+            response = client.post('/posts/new', data={'title': 'Post 5'})
+
+        assert response.status_code == 302
+        assert response.location.endswith('/posts/6')
+
+        m.assert_called_once_with(models.Post)
+
+        assert run(titles(Session, models.Post))[-1] == u'Post 5'
+
+    def test_create_relationship(self, flask, Session, models):
+        view_func = async_sqlalchemy.CreateView.as_view(
+            'post_create', model=models.Post, session_factory=Session,
+            fields=('title', 'author'), success_url='/posts/{id}')
+
+        flask.add_url_rule('/posts/new', view_func=view_func)
+
+        flask.testing = True
+
+        with pytest.raises(RuntimeError) as excinfo:
+            flask.test_client().get('/posts/new')
+
+        error = ("CreateView does not support relationship fields 'author', "
+                 "use a 'form_class' instead")
+
+        assert excinfo.value.args[0] == error
+
+    def test_update(self, flask, Session, models):
+        view_func = async_sqlalchemy.UpdateView.as_view(
+            'post_update', model=models.Post, session_factory=Session,
+            fields=('title',), success_url='/posts/{slug}')
+
+        flask.add_url_rule('/posts/<int:pk>/edit', view_func=view_func)
+
+        client = flask.test_client()
+
+        assert client.get('/posts/2/edit').get_data(as_text=True) == \
+            '0 Post 1'
+
+        response = client.post('/posts/2/edit', data={'title': 'Updated'})
+
+        assert response.status_code == 302
+        assert response.location.endswith('/posts/post-1')
+
+        assert run(titles(Session, models.Post))[1] == u'Updated'
+
+        assert client.post('/posts/9/edit').status_code == 404
+
+    def test_delete(self, flask, Session, models):
+        view_func = async_sqlalchemy.DeleteView.as_view(
+            'post_delete', model=models.Post, session_factory=Session,
+            success_url='/posts?deleted={slug}')
+
+        flask.add_url_rule('/posts/<int:pk>/delete', view_func=view_func)
+
+        client = flask.test_client()
+
+        response = client.get('/posts/2/delete')
+
+        assert response.get_data(as_text=True) == 'Delete Post 1?'
+
+        with patch.object(async_sqlalchemy, 'invalidate_tags') as m:
+            response = client.post('/posts/2/delete')
+
+        assert response.status_code == 302
+        assert response.location.endswith('/posts?deleted=post-1')
+
+        m.assert_called_once_with(models.Post)
+
+        assert run(titles(Session, models.Post)) == \
+            [u'Post 0', u'Post 2', u'Post 3', u'Post 4']
+
+        async def count():
+            async with Session() as session:
+                return await session.scalar(select(func.count(models.Post.id)))
+
+        assert run(count()) == 4
+
+    @pytest.mark.parametrize('name', ['delete_by_query', 'passive_deletes'])
+    def test_delete_unsupported(self, flask, Session, models, name):
+        view_func = async_sqlalchemy.DeleteView.as_view(
+            'post_delete', model=models.Post, session_factory=Session,
+            success_url='/posts', **{name: True})
+
+        flask.add_url_rule('/posts/<int:pk>/delete', view_func=view_func)
+
+        flask.testing = True
+
+        with pytest.raises(RuntimeError) as excinfo:
+            flask.test_client().post('/posts/2/delete')
+
+        error = "DeleteView does not support '{0}'".format(name)
+
+        assert excinfo.value.args[0] == error
+        assert len(run(titles(Session, models.Post))) == 5
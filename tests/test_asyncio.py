@@ -0,0 +1,301 @@
+import asyncio
+
+import pytest
+from flask import request, template_rendered
+from jinja2 import DictLoader
+from werkzeug.exceptions import HTTPException
+from wtforms import Form, StringField
+from wtforms.validators import InputRequired
+
+from flask_generic_views import asyncio as views
+from flask_generic_views import core
+
+try:
+    from unittest.mock import Mock, patch
+except ImportError:
+    from mock import Mock, patch
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def result(value):
+    await asyncio.sleep(0)
+
+    return value
+
+
+class TestRun(object):
+
+    def test_run(self):
+        assert views._run(result, 1) == 1
+
+    def test_run_ensure_sync(self, flask):
+        flask.ensure_sync = ensure_sync = Mock()
+
+        assert views._run(result, 1) == ensure_sync.return_value.return_value
+
+        ensure_sync.assert_called_once_with(result)
+        ensure_sync.return_value.assert_called_once_with(1)
+
+
+class TestView(object):
+
+    def test_as_view(self, flask):
+        def decorator(fn):
+            def wrapper(*args, **kwargs):
+                return fn(*args, **kwargs) + '!'
+
+            return wrapper
+
+        class View(views.View):
+            decorators = [decorator]
+
+            async def dispatch_request(self, name):
+                return await result('{0} {1}'.format(self.greeting, name))
+
+        view_func = View.as_view('greeting', greeting='Hello')
+
+        assert view_func.view_class is View
+        assert view_func.__name__ == 'greeting'
+
+        flask.add_url_rule('/<name>', view_func=view_func)
+
+        response = flask.test_client().get('/World')
+
+        assert response.get_data(as_text=True) == 'Hello World!'
+
+    def test_dispatch_request(self):
+        with pytest.raises(NotImplementedError):
+            run(views.View().dispatch_request())
+
+
+class TestMethodView(object):
+
+    def test_dispatch_request(self, flask):
+        class View(views.MethodView):
+            async def get(self):
+                return await result('get')
+
+            def post(self):
+                return 'post'
+
+        flask.add_url_rule('/', view_func=View.as_view('view'))
+
+        client = flask.test_client()
+
+        assert View.methods == ['GET', 'POST']
+        assert client.get('/').get_data(as_text=True) == 'get'
+        assert client.post('/').get_data(as_text=True) == 'post'
+        assert client.head('/').status_code == 200
+
+
+class TestContextMixin(object):
+
+    def test_get_context_data(self):
+        instance = views.ContextMixin()
+
+        context = run(instance.get_context_data(foo='bar', baz=result(1)))
+
+        assert context == {'view': instance, 'foo': 'bar', 'baz': 1}
+
+    def test_get_context_data_concurrent(self):
+        instance = views.ContextMixin()
+
+        async def provider(wait, notify):
+            notify.set()
+            await wait.wait()
+
+            return True
+
+        async def get_context_data():
+            first, second = asyncio.Event(), asyncio.Event()
+
+            return await asyncio.wait_for(instance.get_context_data(
+                first=provider(first, second),
+                second=provider(second, first)), 1)
+
+        context = run(get_context_data())
+
+        assert context['first'] and context['second']
+
+
+class TestTemplateResponseMixin(object):
+
+    def test_create_response(self, flask):
+        flask.jinja_loader = DictLoader({
+            'page.html': '{{ request.path }} {{ name }} {{ fetch() }}'})
+
+        instance = views.TemplateResponseMixin()
+        instance.template_name = 'page.html'
+        instance.mimetype = 'text/plain'
+
+        rendered = []
+
+        def record(sender, template, context):
+            rendered.append(template.name)
+
+        with flask.test_request_context('/page'), \
+                template_rendered.connected_to(record, flask):
+            response = run(instance.create_response({
+                'name': 'foo', 'fetch': lambda: result('bar')}))
+
+        assert response.mimetype == 'text/plain'
+        assert response.get_data(as_text=True) == '/page foo bar'
+        assert rendered == ['page.html']
+
+        assert run(instance.create_response({
+            'name': 'baz', 'fetch': lambda: result('qux')})) \
+            .get_data(as_text=True) == '/ baz qux'
+
+    def test_create_response_stream(self):
+        instance = views.TemplateResponseMixin()
+        instance.get_template_list = template_names = Mock()
+        instance.stream = True
+        instance.response_class = response_class = Mock()
+
+        with patch.object(core, '_stream_template') as m:
+            response = run(instance.create_response({'foo': 'bar'}))
+
+            assert response == response_class.return_value
+
+            m.assert_called_once_with(template_names.return_value,
+                                      {'foo': 'bar'})
+
+
+class TestTemplateView(object):
+
+    def test_get(self, flask):
+        flask.jinja_loader = DictLoader({
+            'about.html': '{{ staff|join(", ") }}'})
+
+        class AboutView(views.TemplateView):
+            template_name = 'about.html'
+
+            async def get_context_data(self, **kwargs):
+                kwargs['staff'] = result(('John Smith', 'Jane Doe'))
+
+                return await super(AboutView, self).get_context_data(**kwargs)
+
+        flask.add_url_rule('/about', view_func=AboutView.as_view('about'))
+
+        response = flask.test_client().get('/about')
+
+        assert response.get_data(as_text=True) == 'John Smith, Jane Doe'
+
+
+class TestRedirectView(object):
+
+    @pytest.mark.parametrize('permanent', [False, True])
+    def test_dispatch_request(self, permanent):
+        instance = views.RedirectView()
+        instance.permanent = permanent
+        instance.get_redirect_url = Mock(return_value=result('/foo'))
+
+        response = run(instance.dispatch_request(bar='baz'))
+
+        assert response.status_code == (301 if permanent else 302)
+        assert response.location.endswith('/foo')
+
+        instance.get_redirect_url.assert_called_once_with(bar='baz')
+
+    def test_dispatch_request_gone(self):
+        instance = views.RedirectView()
+
+        with pytest.raises(HTTPException) as excinfo:
+            run(instance.dispatch_request())
+
+        assert excinfo.value.code == 410
+
+
+class ContactForm(Form):
+    name = StringField('Name', [InputRequired()])
+
+
+class TestFormView(object):
+
+    @pytest.fixture
+    def view(self, flask):
+        flask.jinja_loader = DictLoader({
+            'contact.html': '{{ form.name.data }} {{ form.errors|length }}'})
+
+        sent = []
+
+        class ContactView(views.FormView):
+            form_class = ContactForm
+            template_name = 'contact.html'
+
+            async def get_form(self):
+                return self.get_form_class()(**self.get_form_kwargs())
+
+            async def get_success_url(self):
+                return await result('/thanks')
+
+            async def form_valid(self, form):
+                sent.append(form.name.data)
+
+                return await super(ContactView, self).form_valid(form)
+
+        flask.add_url_rule('/', view_func=ContactView.as_view('contact'))
+
+        return sent
+
+    def test_get(self, flask, view):
+        response = flask.test_client().get('/')
+
+        assert response.get_data(as_text=True) == 'None 0'
+
+    @pytest.mark.parametrize('method', ['post', 'put'])
+    def test_post(self, flask, view, method):
+        client = flask.test_client()
+
+        response = getattr(client, method)('/', data={'name': 'foo'})
+
+        assert response.status_code == 302
+        assert response.location.endswith('/thanks')
+        assert view == ['foo']
+
+        response = getattr(client, method)('/', data={'name': ''})
+
+        assert response.status_code == 200
+        assert response.get_data(as_text=True) == ' 1'
+        assert view == ['foo']
+
+    def test_get_context_data(self):
+        instance = views.FormMixin()
+        instance.get_form = Mock()
+
+        form = Mock()
+
+        assert run(instance.get_context_data(form=form))['form'] is form
+        assert not instance.get_form.called
+
+        instance.get_form.return_value = result(form)
+
+        assert run(instance.get_context_data())['form'] is form
+
+
+class TestRender(object):
+
+    def test_request_context(self, flask):
+        flask.jinja_loader = DictLoader({'path.html': '{{ request.path }}'})
+
+        class View(views.View):
+            async def dispatch_request(self):
+                paths = await asyncio.gather(
+                    views._render_template('path.html', {}),
+                    result(request.path))
+
+                return ' '.join(paths)
+
+        flask.add_url_rule('/path', view_func=View.as_view('path'))
+
+        response = flask.test_client().get('/path')
+
+        assert response.get_data(as_text=True) == '/path /path'
@@ -0,0 +1,258 @@
+import pytest
+from hypothesis import strategies as st
+from hypothesis import example, given
+
+from flask_generic_views import cache
+
+try:
+    from unittest.mock import patch
+except ImportError:
+    from mock import patch
+
+
+class TestLRUCache(object):
+
+    @given(st.lists(st.integers()), st.integers(1, 10))
+    @example([1, 2, 3], 2)
+    @example([1, 1, 1], 1)
+    def test_set(self, keys, maxsize):
+        instance = cache.LRUCache(maxsize=maxsize)
+
+        for key in keys:
+            instance.set(key, str(key))
+
+        expected = []
+
+        for key in reversed(keys):
+            if key not in expected:
+                expected.insert(0, key)
+
+        expected = expected[-maxsize:]
+
+        assert len(instance) == len(expected)
+
+        for key in expected:
+            assert key in instance
+            assert instance.get(key) == str(key)
+
+    def test_get(self):
+        instance = cache.LRUCache(maxsize=2)
+        instance.set('a', 1)
+        instance.set('b', 2)
+
+        assert instance.get('a') == 1
+
+        instance.set('c', 3)
+
+        assert instance.get('b') is None
+        assert instance.get('b', 4) == 4
+        assert instance.get('a') == 1
+        assert instance.get('c') == 3
+
+    def test_timeout(self):
+        instance = cache.LRUCache(default_timeout=10)
+
+        with patch.object(cache, 'time', return_value=100):
+            instance.set('a', 1)
+            instance.set('b', 2, timeout=30)
+            instance.set('c', 3, timeout=0)
+
+        with patch.object(cache, 'time', return_value=109):
+            assert instance.get('a') == 1
+            assert instance.get('c') is None
+
+        with patch.object(cache, 'time', return_value=110):
+            assert instance.get('a') is None
+            assert instance.get('b') == 2
+
+        assert instance.info().misses == 2
+
+    def test_unbounded(self):
+        instance = cache.LRUCache(maxsize=None)
+
+        for key in range(1000):
+            instance.set(key, key)
+
+        assert len(instance) == 1000
+
+    def test_delete(self):
+        instance = cache.LRUCache()
+        instance.set('a', 1)
+
+        instance.delete('a')
+        instance.delete('b')
+
+        assert 'a' not in instance
+
+    def test_info(self):
+        instance = cache.LRUCache(maxsize=10)
+        instance.set('a', 1)
+
+        instance.get('a')
+        instance.get('a')
+        instance.get('b')
+
+        assert instance.info() == cache.CacheInfo(2, 1, 10, 1)
+
+        instance.clear()
+
+        assert instance.info() == cache.CacheInfo(0, 0, 10, 0)
+
+
+class TestFileSystemCache(object):
+
+    def test_set(self, tmpdir):
+        instance = cache.FileSystemCache(str(tmpdir.join('cache')))
+
+        instance.set('a', {'b': [1, 2]})
+        instance.set(('c', 1), 'd')
+
+        assert instance.get('a') == {'b': [1, 2]}
+        assert instance.get(('c', 1)) == 'd'
+        assert instance.get('e') is None
+        assert instance.get('e', 1) == 1
+
+        other = cache.FileSystemCache(str(tmpdir.join('cache')))
+
+        assert other.get('a') == {'b': [1, 2]}
+
+    def test_timeout(self, tmpdir):
+        instance = cache.FileSystemCache(str(tmpdir), default_timeout=10)
+
+        with patch.object(cache, 'time', return_value=100):
+            instance.set('a', 1)
+            instance.set('b', 2, timeout=30)
+
+        with patch.object(cache, 'time', return_value=110):
+            assert instance.get('a') is None
+            assert instance.get('b') == 2
+
+        assert len(tmpdir.listdir()) == 1
+
+    def test_corrupt(self, tmpdir):
+        instance = cache.FileSystemCache(str(tmpdir))
+        instance.set('a', 1)
+
+        tmpdir.listdir()[0].write('corrupt')
+
+        assert instance.get('a') is None
+
+    def test_delete(self, tmpdir):
+        instance = cache.FileSystemCache(str(tmpdir))
+        instance.set('a', 1)
+        instance.set('b', 2)
+
+        instance.delete('a')
+        instance.delete('c')
+
+        assert instance.get('a') is None
+        assert instance.get('b') == 2
+
+        instance.clear()
+
+        assert instance.get('b') is None
+        assert tmpdir.listdir() == []
+
+
+class Model(object):
+    pass
+
+
+class TestCacheTag(object):
+
+    def test_cache_tag(self):
+        assert cache.cache_tag('post') == 'post'
+        assert cache.cache_tag(Model) == 'tests.test_cache.Model'
+
+
+class TestTaggedCache(object):
+
+    @pytest.fixture(params=['lru', 'filesystem'])
+    def backend(self, request, tmpdir):
+        if request.param == 'lru':
+            return cache.LRUCache()
+
+        return cache.FileSystemCache(str(tmpdir))
+
+    def test_set(self, backend):
+        instance = cache.TaggedCache(backend)
+
+        instance.set('a', 1, tags=(Model,))
+        instance.set('b', 2, tags=('comment',))
+        instance.set('c', 3, tags=(Model, 'comment'))
+        instance.set('d', 4)
+
+        assert instance.get('a') == 1
+        assert instance.get('e', 5) == 5
+
+        instance.invalidate('comment')
+
+        assert instance.get('a') == 1
+        assert instance.get('b') is None
+        assert instance.get('c') is None
+        assert instance.get('d') == 4
+
+        instance.set('b', 6, tags=('comment',))
+
+        assert instance.get('b') == 6
+
+        instance.delete('b')
+
+        assert instance.get('b') is None
+
+    def test_set_versions(self, backend):
+        instance = cache.TaggedCache(backend)
+
+        versions = instance.versions((Model, 'comment'))
+
+        instance.set('a', 1, versions=versions)
+
+        assert instance.get('a') == 1
+
+        versions = instance.versions((Model,))
+
+        instance.invalidate(Model)
+        instance.set('a', 2, tags=(Model,), versions=versions)
+
+        assert instance.get('a') is None
+
+    def test_shared_backend(self, backend):
+        instance = cache.TaggedCache(backend)
+        other = cache.TaggedCache(backend)
+
+        instance.set('a', 1, tags=(Model,))
+
+        other.invalidate(Model)
+
+        assert instance.get('a') is None
+
+    def test_evicted_tag(self):
+        instance = cache.TaggedCache(cache.LRUCache(maxsize=2))
+
+        instance.set('a', 1, tags=('post',))
+        instance.backend.delete(('tag', 'post'))
+
+        assert instance.get('a') is None
+
+    def test_timeout(self):
+        instance = cache.TaggedCache(default_timeout=10)
+
+        with patch.object(cache, 'time', return_value=100):
+            instance.set('a', 1)
+            instance.set('b', 2, timeout=30)
+
+        with patch.object(cache, 'time', return_value=110):
+            assert instance.get('a') is None
+            assert instance.get('b') == 2
+
+    def test_invalidate_tags(self):
+        instance = cache.TaggedCache()
+        other = cache.TaggedCache()
+
+        instance.set('a', 1, tags=(Model,))
+        other.set('a', 1, tags=(Model,))
+
+        cache.invalidate_tags(Model)
+
+        assert instance.get('a') is None
+        assert other.get('a') is None
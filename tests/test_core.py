@@ -1,12 +1,15 @@
 import pytest
+from flask import (Response, make_response, request, session,
+                   template_rendered)
 from hypothesis import strategies as st
 from hypothesis import example, given
+from jinja2 import DictLoader, TemplateNotFound
 from werkzeug.datastructures import CombinedMultiDict, ImmutableMultiDict
 from werkzeug.exceptions import HTTPException
 from werkzeug.routing import BuildError
 from werkzeug.urls import url_encode, url_parse
 
-from flask_generic_views import core
+from flask_generic_views import cache, core
 from flask_generic_views._compat import iteritems, iterkeys
 from tests.utils import ASCII, SLUG, nondigit
 
@@ -86,6 +89,201 @@ class TestTemplateResponseMixin(object):
         response_class.assert_called_once_with(m.return_value,
                                                **response_kwargs)
 
+    def test_create_response_stream(self):
+        instance = core.TemplateResponseMixin()
+        instance.get_template_list = template_names = Mock()
+        instance.stream = True
+        instance.response_class = response_class = Mock()
+
+        context = {'foo': 'bar'}
+
+        with patch.object(core, '_stream_template') as m:
+            response = instance.create_response(context)
+
+            assert response == response_class.return_value
+
+            m.assert_called_once_with(template_names.return_value, context)
+
+        response_class.assert_called_once_with(m.return_value, mimetype=None)
+
+    def test_get_stream(self):
+        instance = core.TemplateResponseMixin()
+        instance.stream = Mock()
+
+        assert instance.get_stream() == instance.stream
+
+
+class TestStreamTemplate(object):
+
+    def test_stream_template(self, flask):
+        flask.jinja_loader = DictLoader({
+            'list.html': '{% for i in items %}{{ request.path }}{{ i }};'
+                         '{% endfor %}'})
+
+        rendered = []
+
+        def record(sender, template, context):
+            rendered.append(template.name)
+
+        template_rendered.connect(record, flask)
+
+        try:
+            with flask.test_request_context('/items'):
+                result = core._stream_template(['missing.html', 'list.html'],
+                                               {'items': iter(range(3))})
+
+            assert rendered == []
+            assert ''.join(result) == '/items0;/items1;/items2;'
+            assert rendered == ['list.html']
+        finally:
+            template_rendered.disconnect(record, flask)
+
+    def test_stream_template_missing(self, flask):
+        flask.jinja_loader = DictLoader({})
+
+        with pytest.raises(TemplateNotFound):
+            core._stream_template('missing.html', {})
+
+
+class TestResponseCacheMixin(object):
+
+    @pytest.fixture
+    def view(self, flask):
+        class CachedView(core.ResponseCacheMixin, core.MethodView):
+            response_cache = cache.TaggedCache()
+            cache_vary_headers = ('Accept-Language',)
+            calls = []
+
+            def get(self, **kwargs):
+                self.calls.append(request.url)
+
+                response = make_response(u'page {0}'.format(len(self.calls)))
+
+                if 'cookie' in request.args:
+                    response.set_cookie('foo', 'bar')
+
+                if 'missing' in request.args:
+                    response.status_code = 404
+
+                if 'flash' in request.args:
+                    session['message'] = 'hello'
+
+                if 'read' in request.args:
+                    session.get('message')
+
+                return response
+
+            def post(self, **kwargs):
+                self.calls.append(request.url)
+
+                return u'posted'
+
+        flask.add_url_rule('/<name>', view_func=CachedView.as_view('cached'))
+
+        return CachedView
+
+    def test_dispatch_request(self, flask, view):
+        client = flask.test_client()
+
+        assert client.get('/a').data == b'page 1'
+        assert client.get('/a').data == b'page 1'
+        assert client.get('/b').data == b'page 2'
+        assert client.get('/a?x=1&y=2').data == b'page 3'
+        assert client.get('/a?y=2&x=1').data == b'page 3'
+        assert client.get('/a', headers={'Accept-Language': 'fr'}).data \
+            == b'page 4'
+
+        assert client.post('/a').data == b'posted'
+        assert client.post('/a').data == b'posted'
+
+        assert len(view.calls) == 6
+
+        view.response_cache.invalidate('other')
+
+        assert client.get('/a').data == b'page 1'
+
+    @pytest.mark.parametrize('query', ['cookie', 'missing', 'flash'])
+    def test_dispatch_request_not_cacheable(self, flask, view, query):
+        client = flask.test_client()
+
+        client.get('/a?' + query)
+        client.get('/a?' + query)
+
+        assert len(view.calls) == 2
+
+    def test_dispatch_request_session(self, flask, view):
+        client = flask.test_client()
+
+        client.get('/a?flash')
+
+        assert client.get('/a?read').data == b'page 2'
+        assert client.get('/a?read').data == b'page 3'
+
+        assert flask.test_client().get('/a').data == b'page 4'
+        assert flask.test_client().get('/a').data == b'page 4'
+
+    def test_dispatch_request_response_class(self, flask, view):
+        class CachedResponse(Response):
+            pass
+
+        view.response_class = CachedResponse
+
+        client = flask.test_client()
+
+        assert client.get('/a').data == b'page 1'
+
+        with flask.test_request_context('/a'):
+            response = view.as_view('cached')(name='a')
+
+        assert isinstance(response, CachedResponse)
+        assert response.data == b'page 1'
+
+    def test_get_cache_partition(self, flask, view):
+        view.get_cache_partition = lambda self: request.headers.get('X-User')
+
+        client = flask.test_client()
+
+        assert client.get('/a', headers={'X-User': '1'}).data == b'page 1'
+        assert client.get('/a', headers={'X-User': '2'}).data == b'page 2'
+        assert client.get('/a', headers={'X-User': '1'}).data == b'page 1'
+
+    def test_get_cache_tags(self):
+        instance = core.ResponseCacheMixin()
+        instance.cache_tags = ('author',)
+
+        assert instance.get_cache_tags() == ['author']
+
+        instance.get_model = Mock(return_value=None)
+
+        assert instance.get_cache_tags() == ['author']
+
+        instance.get_model.return_value = model = Mock()
+
+        assert instance.get_cache_tags() == ['author', model]
+
+    def test_invalidate_tags(self, flask, view):
+        view.cache_tags = ('post',)
+
+        client = flask.test_client()
+
+        assert client.get('/a').data == b'page 1'
+
+        cache.invalidate_tags('post')
+
+        assert client.get('/a').data == b'page 2'
+
+    def test_get_response_cache(self):
+        instance = core.ResponseCacheMixin()
+        instance.response_cache = Mock()
+
+        assert instance.get_response_cache() == instance.response_cache
+
+    def test_get_cache_timeout(self):
+        instance = core.ResponseCacheMixin()
+        instance.cache_timeout = Mock()
+
+        assert instance.get_cache_timeout() == instance.cache_timeout
+
 
 class TestTemplateView(object):
 
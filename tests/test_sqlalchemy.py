@@ -1,28 +1,37 @@
+import json
+from datetime import date, datetime, timedelta
 from math import ceil
+from threading import current_thread
 
 import pytest
+from flask import current_app, request
 from flask.ext.wtf import Form
 from hypothesis import strategies as st
 from hypothesis import example, given
 from inflection import camelize, underscore
-from sqlalchemy.orm.exc import NoResultFound
+from jinja2 import DictLoader
+from sqlalchemy import create_engine, event, func, inspect, orm
+from sqlalchemy.orm.exc import MultipleResultsFound, NoResultFound
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
 from sqlalchemy.schema import Column
 from werkzeug.exceptions import HTTPException
+from werkzeug.urls import url_encode
 
-from flask_generic_views import core, sqlalchemy
-from flask_generic_views._compat import integer_types, iteritems, iterkeys
-from tests.utils import ASCII, DIGITS, SLUG, nondigit
+from flask_generic_views import cache, core, signals, sqlalchemy
+from flask_generic_views._compat import (fixed_offset, integer_types,
+                                         iteritems, iterkeys)
+from tests.utils import ASCII, DIGITS, SLUG, QueryCounter, nondigit
 
 try:
-    from unittest.mock import Mock, call, patch
+    from unittest.mock import Mock, PropertyMock, call, patch
 except ImportError:
-    from mock import Mock, call, patch
+    from mock import Mock, PropertyMock, call, patch
 
 
 def mock_query(success=True):
     query = Mock()
 
-    query._entities = [Mock(name='mock._entities[0]')]
+    query.column_descriptions = [{'entity': Mock(name='entity')}]
 
     if not success:
         query.filter_by.return_value.one.side_effect = NoResultFound
@@ -30,18 +39,63 @@ def mock_query(success=True):
     return query
 
 
-class TestTouch(object):
+class TestColumnValues(object):
 
-    def test_touch(self):
-        obj = Mock()
+    def test_column_values(self, db, models):
+        Post = models.Post
 
-        with patch.object(sqlalchemy, 'getattr', create=True) as m1:
-            with patch.object(sqlalchemy, 'inspect') as m2:
-                m2.return_value.attrs.keys.return_value = keys = [Mock()]
+        post = Post(title=u'foo', author=models.Author(name=u'bar'))
 
-                sqlalchemy._touch(obj)
+        db.session.add(post)
+        db.session.flush()
 
-        m1.assert_called_once_with(obj, keys[0], None)
+        values = sqlalchemy._column_values(post)
+
+        assert values['id'] == post.id
+        assert values['title'] == u'foo'
+        assert values['author_id'] == post.author.id
+        assert 'author' not in values
+
+        db.session.commit()
+
+        assert 'title' not in post.__dict__
+
+        sqlalchemy._restore_column_values(post, values)
+
+        with QueryCounter(db.engine) as queries:
+            assert post.__dict__['title'] == u'foo'
+            assert post.title == u'foo'
+
+        assert len(queries) == 0
+        assert not db.session.dirty
+
+    def test_expired_columns(self, db, models):
+        class Revision(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            title = db.Column(db.String(80))
+            status = db.Column(db.String(80), server_default='draft')
+            version = db.Column(db.Integer, server_default='1',
+                                onupdate=db.text('version + 1'))
+            body = db.deferred(db.Column(db.Text))
+
+        db.create_all()
+
+        revision = Revision(title=u'a')
+
+        db.session.add(revision)
+        db.session.flush()
+
+        assert sqlalchemy._expired_columns(revision) == ['status', 'version']
+
+        db.session.commit()
+        db.session.expire_all()
+
+        revision = Revision.query.first()
+        revision.title = u'b'
+
+        db.session.flush()
+
+        assert sqlalchemy._expired_columns(revision) == ['version']
 
 
 class TestSession(object):
@@ -55,581 +109,2972 @@ class TestSession(object):
             assert sqlalchemy._find_session() == extension.db.session
 
 
-class TestSingleObjectMixin(object):
+class TestGetModelForm(object):
 
-    @given(st.booleans(), st.booleans())
-    def test_get_model(self, query, model):
-        instance = sqlalchemy.SingleObjectMixin()
-        if query:
-            instance.query = mock_query()
+    @given(st.lists(st.text(SLUG).filter(bool)),
+           st.dictionaries(st.text(SLUG).filter(bool), st.text()))
+    @example(['foo', 'bar'], {})
+    @example(['foo'], {'foo': 'bar'})
+    def test_get_model_form(self, fields, field_args):
+        model = Mock()
 
-        if model:
-            instance.model = Mock()
+        with patch.object(sqlalchemy, 'model_form') as m:
+            with patch.object(sqlalchemy, 'form_class_cache',
+                              sqlalchemy.LRUCache()) as cache:
+                result = sqlalchemy.get_model_form(model, fields,
+                                                   field_args=field_args)
 
-        cls = instance.get_model()
+                assert result == m.return_value
 
-        if query:
-            assert cls == instance.query._entities[0].entity_zero.class_
-        elif model:
-            assert cls == instance.model
-        else:
-            assert cls is None
+                m.assert_called_once_with(model, sqlalchemy.session, Form,
+                                          fields, field_args=field_args)
 
-    @given(st.text(), st.lists(st.text(ASCII).filter(bool), unique=True),
-           st.integers(), st.booleans())
-    @example('pk', ['pk'], 1, True)
-    @example('pk', [], 1, True)
-    @example('pk', ['id_1', 'id_2'], 1, True)
-    @example('pk', ['pk'], 1, False)
-    def test_get_object_pk(self, pk_view_arg, fields, pk, success):
-        instance = sqlalchemy.SingleObjectMixin()
-        instance.pk_view_arg = pk_view_arg
-        instance.query = query = mock_query(success)
-        instance.get_model = Mock()
+                assert sqlalchemy.get_model_form(
+                    model, list(fields), field_args=dict(field_args)) == result
 
-        return_value = query.filter_by.return_value.one.return_value
+                assert m.call_count == 1
+                assert cache.info().hits == 1
+                assert cache.info().misses == 1
 
-        primary_key = [Column(key=name) for name in fields]
+                sqlalchemy.get_model_form(model, fields, Mock())
 
-        with patch.object(sqlalchemy, 'inspect') as m1:
-            with patch.object(sqlalchemy, 'request') as m2:
-                m1.return_value.primary_key = primary_key
-                m2.view_args = {pk_view_arg: pk}
+                assert m.call_count == 2
 
-                if len(fields) == 1:
-                    if not success:
-                        with pytest.raises(HTTPException) as excinfo:
-                            instance.get_object()
+    def test_freeze(self):
+        value = {'b': [1, {'c': set([2])}], 'a': (3,)}
 
-                        assert excinfo.value.code == 404
-                    else:
-                        assert instance.get_object() == return_value
+        assert sqlalchemy._freeze(value) == (('a', (3,)),
+                                             ('b', (1, (('c', (2,)),))))
 
-                    query.filter_by.assert_called_once_with(**{fields[0]: pk})
-                else:
-                    with pytest.raises(RuntimeError) as excinfo:
-                        instance.get_object()
 
-                    if len(fields) > 1:
-                        error = ('SingleObjectMixin requires non composite '
-                                 'primary key')
-                    else:
-                        error = ('SingleObjectMixin requires primary key')
+class TestModelMetadata(object):
 
-                    assert excinfo.value.args[0] == error
+    @given(st.text(SLUG).filter(bool).map(camelize).map(str))
+    @example('BlogPost')
+    def test_names(self, class_name):
+        model = type(class_name, (object,), {})
 
-            m1.assert_called_once_with(instance.get_model.return_value)
-            instance.get_model.assert_called_once_with()
+        instance = sqlalchemy.ModelMetadata(model)
 
-    @given(st.text(ASCII), st.text(ASCII), st.text(ASCII), st.booleans())
-    def test_get_object_slug(self, slug_view_arg, slug_field, slug, success):
-        instance = sqlalchemy.SingleObjectMixin()
-        instance.query = query = mock_query(success)
-        instance.slug_view_arg = slug_view_arg
+        assert instance.model == model
+        assert instance.name == underscore(class_name)
+        assert instance.context_object_name == underscore(class_name)
+        assert instance.context_list_name == '{0}_list'.format(
+            underscore(class_name))
+        assert instance.template_name == underscore(class_name)
 
-        instance.get_slug_field = Mock(return_value=slug_field)
+    def test_mapper(self):
+        model = Mock(__name__='Post')
 
-        return_value = query.filter_by.return_value.one.return_value
+        instance = sqlalchemy.ModelMetadata(model)
 
-        with patch.object(sqlalchemy, 'request') as m:
-            m.view_args = {slug_view_arg: slug}
+        with patch.object(sqlalchemy, 'inspect') as m:
+            m.return_value.primary_key = primary_key = [Column(name='id')]
+            m.return_value.column_attrs = [
+                Mock(key='id', columns=[primary_key[0]]),
+                Mock(key='slug', columns=[Column(name='slug')])]
 
-            if not success:
-                with pytest.raises(HTTPException) as excinfo:
-                    instance.get_object()
+            assert instance.mapper == m.return_value
+            assert instance.primary_key == tuple(primary_key)
+            assert instance.slug_column('slug').name == 'slug'
+            assert instance.slug_column('title') is None
 
-                assert excinfo.value.code == 404
-            else:
-                assert instance.get_object() == return_value
+        m.assert_called_once_with(model)
 
-        query.filter_by.assert_called_once_with(**{slug_field: slug})
+    def test_large_columns(self, models):
+        instance = sqlalchemy.ModelMetadata(models.Post)
 
-    @given(st.integers(), st.text(ASCII),
-           st.lists(st.text(ASCII).filter(bool), 2, 2, 2, unique=True),
+        assert instance.large_columns == ('body',)
+
+    def test_delete_cascades(self, db, models):
+        class Tag(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            comment_id = db.Column(db.Integer, db.ForeignKey(
+                models.Comment.id, ondelete='CASCADE'))
+
+            comment = db.relationship(models.Comment, backref=db.backref(
+                'tags', passive_deletes=True))
+
+        class Revision(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            version = db.Column(db.Integer, nullable=False)
+
+            __mapper_args__ = {'version_id_col': version}
+
+        db.configure_mappers()
+
+        def cascades(model):
+            return sqlalchemy.ModelMetadata(model).delete_cascades
+
+        assert cascades(models.Author)
+        assert cascades(models.Post)
+        assert not cascades(models.Comment)
+        assert not cascades(Tag)
+        assert cascades(Revision)
+
+        metadata = sqlalchemy.ModelMetadata(models.Comment)
+
+        assert metadata.delete_relationships == ('tags',)
+        assert metadata.passive_relationships == ('tags',)
+
+        listener = Mock()
+
+        event.listen(Tag, 'before_delete', listener)
+
+        try:
+            assert cascades(Tag)
+        finally:
+            event.remove(Tag, 'before_delete', listener)
+
+
+class TestPassiveRelationship(object):
+
+    @pytest.fixture
+    def Account(self, db):
+        class Account(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+
+        return Account
+
+    @pytest.mark.parametrize('ondelete,cascade,expected', [
+        ('CASCADE', 'all, delete-orphan', True),
+        ('cascade', 'all, delete-orphan', True),
+        ('SET NULL', 'save-update', True),
+        ('SET NULL', 'all, delete-orphan', False),
+        ('CASCADE', 'save-update', False),
+        (None, 'all, delete-orphan', False),
+    ])
+    def test_one_to_many(self, db, Account, ondelete, cascade, expected):
+        class Event(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            account_id = db.Column(db.Integer, db.ForeignKey(
+                Account.id, ondelete=ondelete))
+
+            account = db.relationship(Account, backref=db.backref(
+                'events', cascade=cascade))
+
+        db.configure_mappers()
+
+        metadata = sqlalchemy.ModelMetadata(Account)
+
+        assert metadata.delete_relationships == ('events',)
+        assert metadata.passive_relationships == \
+            (('events',) if expected else ())
+        assert metadata.delete_cascades is not expected
+
+        assert not sqlalchemy.ModelMetadata(Event).passive_relationships
+
+    @pytest.mark.parametrize('ondelete,expected', [
+        ('CASCADE', True),
+        (None, False),
+    ])
+    def test_many_to_many(self, db, Account, ondelete, expected):
+        members = db.Table(
+            'members',
+            db.Column('account_id', db.Integer,
+                      db.ForeignKey(Account.id, ondelete=ondelete)),
+            db.Column('group_id', db.Integer, db.ForeignKey('group.id')))
+
+        class Group(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+
+            accounts = db.relationship(Account, secondary=members,
+                                       backref='groups')
+
+        db.configure_mappers()
+
+        metadata = sqlalchemy.ModelMetadata(Account)
+
+        assert metadata.passive_relationships == \
+            (('groups',) if expected else ())
+
+        assert not sqlalchemy._nullified_relationship(
+            metadata.mapper.relationships['groups'])
+
+    @pytest.mark.parametrize('ondelete,cascade,expected', [
+        ('CASCADE', 'all, delete-orphan', False),
+        ('SET NULL', 'save-update', True),
+        ('SET NULL', 'all, delete-orphan', True),
+        (None, 'save-update', True),
+        (None, 'all, delete-orphan', False),
+    ])
+    def test_nullified_relationship(self, db, Account, ondelete, cascade,
+                                    expected):
+        class Event(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            account_id = db.Column(db.Integer, db.ForeignKey(
+                Account.id, ondelete=ondelete))
+
+            account = db.relationship(Account, backref=db.backref(
+                'events', cascade=cascade))
+
+        db.configure_mappers()
+
+        prop = sqlalchemy.inspect(Account).relationships['events']
+
+        assert sqlalchemy._nullified_relationship(prop) is expected
+
+
+class TestModelRegistry(object):
+
+    def test_get(self):
+        instance = sqlalchemy.ModelRegistry()
+        model = type('BlogPost', (object,), {})
+
+        result = instance.get(model)
+
+        assert isinstance(result, sqlalchemy.ModelMetadata)
+        assert result.model == model
+        assert instance.get(model) is result
+
+    def test_invalidate(self):
+        instance = sqlalchemy.ModelRegistry()
+        model1 = type('BlogPost', (object,), {})
+        model2 = type('BlogComment', (object,), {})
+
+        result1 = instance.get(model1)
+        result2 = instance.get(model2)
+
+        instance.invalidate(model1)
+
+        assert instance.get(model1) is not result1
+        assert instance.get(model2) is result2
+
+        instance.invalidate()
+
+        assert instance.get(model2) is not result2
+
+    def test_get_query_model(self, models):
+        instance = sqlalchemy.ModelRegistry()
+        query = models.Post.query.join(models.Author)
+
+        assert instance.get_query_model(query) is models.Post
+
+        with patch.object(type(query), 'column_descriptions',
+                          new_callable=PropertyMock) as m:
+            assert instance.get_query_model(query) is models.Post
+
+        assert not m.called
+
+        instance.invalidate(models.Author)
+
+        assert instance.get_query_model(query) is models.Post
+
+        instance.invalidate(models.Post)
+
+        assert not instance._query_models
+
+
+class TestLoadOptionsMixin(object):
+
+    def test_get_load_options(self, models):
+        instance = sqlalchemy.LoadOptionsMixin()
+        instance.get_model = Mock(return_value=models.Post)
+
+        assert instance.get_load_options() == []
+
+        instance.joined_load = ('author',)
+        instance.selectin_load = (models.Post.comments, 'comments.post')
+
+        options = instance.get_load_options()
+
+        assert len(options) == 3
+        assert str(models.Post.query.options(*options)).count('JOIN') == 1
+
+        instance.joined_load = None
+        instance.selectin_load = None
+        instance.subquery_load = ('author.posts',)
+
+        options = instance.get_load_options()
+
+        assert len(options) == 1
+        assert 'JOIN' not in str(models.Post.query.options(*options))
+
+    @given(st.sampled_from([None, ('title',), ('title', 'body')]),
            st.booleans())
-    @example(1, 'foobar', ['id', 'slug'], True)
-    @example(1, 'foobar', ['id', 'slug'], False)
-    def test_get_object(self, pk, slug, fields, query_pk_and_slug):
-        instance = sqlalchemy.SingleObjectMixin()
-        instance.slug_field = fields[0]
-        instance.query_pk_and_slug = query_pk_and_slug
+    def test_get_load_options_columns(self, models, only_columns, defer):
+        Post = models.Post
 
-        query = mock_query()
+        instance = sqlalchemy.LoadOptionsMixin()
+        instance.get_model = Mock(return_value=Post)
+        instance.only_columns = only_columns
+        instance.defer_large_columns = defer
 
-        instance.query = query
+        sql = str(Post.query.options(*instance.get_load_options()))
 
-        rv = query.filter_by.return_value.one.return_value
+        if only_columns:
+            loaded = ('id',) + only_columns
+        else:
+            loaded = ('id', 'slug', 'title', 'body', 'created_at',
+                      'author_id')
 
-        with patch.object(sqlalchemy, 'inspect') as m1:
-            with patch.object(sqlalchemy, 'request') as m2:
-                m1.return_value.primary_key = [Column(name=fields[1])]
-                m2.view_args = {instance.pk_view_arg: pk,
-                                instance.slug_view_arg: slug}
+        if defer and 'body' not in (only_columns or ()):
+            loaded = tuple(c for c in loaded if c != 'body')
 
-                assert instance.get_object() == rv
+        for column in ('id', 'slug', 'title', 'body', 'created_at',
+                       'author_id'):
+            assert ('post.{0} AS'.format(column) in sql) == \
+                (column in loaded)
 
-        if query_pk_and_slug:
-            query.filter_by.assert_called_once_with(**{fields[0]: slug,
-                                                       fields[1]: pk})
+    @given(st.integers(0, 3))
+    def test_apply_load_options(self, count):
+        instance = sqlalchemy.LoadOptionsMixin()
+        options = [Mock() for i in range(count)]
+        instance.get_load_options = Mock(return_value=options)
+
+        query = Mock()
+
+        if count:
+            assert instance.apply_load_options(query) == \
+                query.options.return_value
+
+            query.options.assert_called_once_with(*options)
         else:
-            query.filter_by.assert_called_once_with(**{fields[1]: pk})
+            assert instance.apply_load_options(query) == query
 
-    def test_get_object_neither(self):
-        instance = sqlalchemy.SingleObjectMixin()
-        instance.query = mock_query()
+    @given(st.booleans())
+    def test_query_count(self, db, models, eager):
+        Author, Post, Comment = models
 
-        with patch.object(sqlalchemy, 'request') as m:
-            m.view_args = {}
+        if Post.query.count() == 0:
+            for i in range(10):
+                author = Author(name=str(i))
+                post = Post(title=str(i), author=author)
+                post.comments = [Comment(body=str(j)) for j in range(3)]
+                sqlalchemy.session.add(post)
 
-            with pytest.raises(RuntimeError) as excinfo:
-                instance.get_object()
+            sqlalchemy.session.commit()
 
-        error = ('SingleObjectMixin must be called with either object pk or '
-                 'slug')
+        sqlalchemy.session.expunge_all()
 
-        assert excinfo.value.args[0] == error
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
 
-    @given(st.booleans(), st.booleans())
-    def test_get_query(self, model, query):
-        instance = sqlalchemy.SingleObjectMixin()
-        if model:
-            instance.model = Mock()
+        if eager:
+            instance.joined_load = ('author',)
+            instance.subquery_load = ('comments',)
 
-        if query:
-            instance.query = Mock()
+        instance.object_list = instance.get_query()
 
-        if not model and not query:
-            with pytest.raises(NotImplementedError) as excinfo:
-                instance.get_query()
+        with QueryCounter(db.engine) as queries:
+            context = instance.get_context_data()
 
-            error = ('SingleObjectMixin requires either a definition of '
-                     "'query', 'model', or an implementation of 'get_query()'")
+            for post in context['post_list']:
+                post.author.name
+                [comment.body for comment in post.comments]
 
-            assert excinfo.value.args[0] == error
+        assert len(context['post_list']) == 10
 
-        elif query:
-            assert instance.get_query() == instance.query
+        if eager:
+            assert len(queries) == 2
         else:
-            assert instance.get_query() == instance.model.query
+            assert len(queries) == 21
 
-    @given(st.text())
-    @example('slug')
-    def test_get_slug_field(self, slug):
-        instance = sqlalchemy.SingleObjectMixin()
-        instance.slug_field = slug
 
-        assert instance.get_slug_field() == slug
+class TestReadReplicaMixin(object):
 
-    @given(st.booleans(), st.text(SLUG).map(camelize).map(str))
-    def test_get_context_object_name(self, name, class_name):
-        instance = sqlalchemy.SingleObjectMixin()
-        instance.get_model = Mock(return_value=None)
+    @pytest.fixture
+    def replica(self, flask, db, models, tmpdir):
+        Post = models.Post
 
-        if name:
-            instance.context_object_name = Mock()
+        flask.config['WTF_CSRF_ENABLED'] = False
+        flask.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///{0}'.format(
+            tmpdir.join('primary.db'))
+        flask.config['SQLALCHEMY_BINDS'] = {
+            'replica': 'sqlite:///{0}'.format(tmpdir.join('replica.db'))}
 
-        if class_name:
-            instance.get_model.return_value = type(class_name, (object,), {})
+        flask.jinja_loader = DictLoader({
+            'post_detail.html': '{{ post.title }}',
+            'post_list.html': '{% for post in post_list %}{{ post.title }};'
+                              '{% endfor %}',
+            'post_form.html': '{{ form.title.data }}',
+            'post_delete.html': 'Delete {{ post.title }}?'})
 
-        result = instance.get_context_object_name()
+        db.create_all()
 
-        if name:
-            assert result == instance.context_object_name
-        elif class_name:
-            assert result == underscore(class_name)
-        else:
-            assert result is None
+        engine = db.get_engine(flask, bind='replica')
 
-    @given(st.booleans(), st.text(), st.dictionaries(st.text(), st.text()))
-    @example(True, 'foo', {'foo': 'bar'})
-    @example(True, 'bar', {'object': 'baz'})
-    @example(True, 'baz', {'object': 'bar', 'baz': 'foo'})
-    @example(True, 'foo', {})
-    @example(True, '', {})
-    @example(True, '', {'object': 'foo bar'})
-    @example(False, '', {})
-    def test_get_context_data(self, obj, context_object_name, kwargs):
-        instance = sqlalchemy.SingleObjectMixin()
+        db.Model.metadata.create_all(engine)
 
-        context = kwargs.copy()
+        db.session.add(Post(title=u'primary'))
+        db.session.commit()
 
-        if obj:
-            instance.object = Mock()
-            context.setdefault('object', instance.object)
+        session = orm.Session(bind=engine)
+        session.add(Post(title=u'replica'))
+        session.commit()
+        session.close()
 
-            if context_object_name:
-                context.setdefault(context_object_name, instance.object)
+        return engine
 
-        with patch.object(core.ContextMixin, 'get_context_data') as m1:
-            with patch.object(instance, 'get_context_object_name') as m2:
-                m2.return_value = context_object_name or None
+    def titles(self, engine, Post):
+        session = orm.Session(bind=engine)
 
-                result = instance.get_context_data(**kwargs)
+        try:
+            return [p.title for p in session.query(Post).order_by(Post.id)]
+        finally:
+            session.close()
 
-                m1.assert_called_once_with(**context)
+    @pytest.mark.parametrize('read_bind,expected', [
+        (None, 'primary'),
+        ('replica', 'replica'),
+        (('replica', 'replica'), 'replica'),
+    ])
+    def test_detail(self, flask, models, replica, read_bind, expected):
+        view_func = sqlalchemy.DetailView.as_view(
+            'post_detail', model=models.Post, read_bind=read_bind)
 
-                assert result == m1.return_value
+        flask.add_url_rule('/posts/<int:pk>', view_func=view_func)
 
+        response = flask.test_client().get('/posts/1')
 
-class TestBaseDetailView(object):
+        assert response.get_data(as_text=True) == expected
 
-    def test_get(self):
-        instance = sqlalchemy.BaseDetailView()
-        instance.get_object = get_object = Mock()
-        instance.get_context_data = get_context_data = Mock()
-        instance.create_response = render = Mock()
+    def test_list(self, flask, models, replica):
+        view_func = sqlalchemy.ListView.as_view(
+            'post_list', model=models.Post, read_bind='replica')
 
-        assert instance.get() == render.return_value
-        assert instance.object == get_object.return_value
+        flask.add_url_rule('/posts', view_func=view_func)
 
-        render.assert_called_once_with(get_context_data.return_value)
+        response = flask.test_client().get('/posts')
 
-        get_context_data.assert_called_once_with()
+        assert response.get_data(as_text=True) == 'replica;'
 
+    def test_update(self, flask, db, models, replica):
+        Post = models.Post
 
-class TestSingleObjectTemplateResponseMixin(object):
+        flask.add_url_rule('/posts/<int:pk>', view_func=(
+            sqlalchemy.DetailView.as_view(
+                'post_detail', model=Post, read_bind='replica')))
+        flask.add_url_rule('/posts/<int:pk>/edit', view_func=(
+            sqlalchemy.UpdateView.as_view(
+                'post_update', model=Post, read_bind='replica',
+                fields=('title',), success_url='/posts/{id}')))
 
-    @given(st.text(ASCII), st.text(ASCII), st.text(ASCII))
+        client = flask.test_client()
+
+        response = client.get('/posts/1/edit')
+
+        assert response.get_data(as_text=True) == 'replica'
+
+        response = client.post('/posts/1/edit', data={'title': 'updated'})
+
+        assert response.status_code == 302
+
+        assert self.titles(db.engine, Post) == ['updated']
+        assert self.titles(replica, Post) == ['replica']
+
+        response = client.get('/posts/1')
+
+        assert response.get_data(as_text=True) == 'updated'
+
+        with client.session_transaction() as session:
+            session['flask_generic_views.write'] -= 10
+
+        response = client.get('/posts/1')
+
+        assert response.get_data(as_text=True) == 'replica'
+
+    def test_delete(self, flask, db, models, replica):
+        Post = models.Post
+
+        flask.add_url_rule('/posts/<int:pk>/delete', view_func=(
+            sqlalchemy.DeleteView.as_view(
+                'post_delete', model=Post, read_bind='replica',
+                success_url='/posts')))
+
+        client = flask.test_client()
+
+        response = client.get('/posts/1/delete')
+
+        assert response.get_data(as_text=True) == 'Delete replica?'
+
+        response = client.post('/posts/1/delete')
+
+        assert response.status_code == 302
+
+        assert self.titles(db.engine, Post) == []
+        assert self.titles(replica, Post) == ['replica']
+
+        assert client.get('/posts/1/delete').status_code == 404
+
+    @pytest.mark.parametrize('method,written_at,expected', [
+        ('GET', None, 'replica'),
+        ('HEAD', None, 'replica'),
+        ('POST', None, None),
+        ('GET', 90, 'replica'),
+        ('GET', 97, None),
+    ])
+    def test_get_read_bind(self, flask, method, written_at, expected):
+        instance = sqlalchemy.ReadReplicaMixin()
+        instance.read_bind = ('replica', 'other')
+
+        with flask.test_request_context('/', method=method), \
+                patch.object(sqlalchemy.random, 'choice') as m1, \
+                patch.object(sqlalchemy._time, 'time', return_value=100):
+            m1.return_value = 'replica'
+
+            if written_at is not None:
+                sqlalchemy.flask_session['flask_generic_views.write'] = \
+                    written_at
+
+            assert instance.get_read_bind() == expected
+            assert instance.get_read_bind() == expected
+
+            if expected is not None:
+                m1.assert_called_once_with(instance.read_bind)
+
+    def test_get_read_bind_session_accessed(self, flask):
+        class Session(dict):
+            accessed = modified = False
+
+            def get(self, key, default=None):
+                self.accessed = True
+
+                return super(Session, self).get(key, default)
+
+        instance = sqlalchemy.ReadReplicaMixin()
+        instance.read_bind = 'replica'
+
+        with flask.test_request_context('/') as ctx, \
+                patch.object(sqlalchemy._time, 'time', return_value=100):
+            ctx.session = Session({'flask_generic_views.write': 98})
+
+            assert instance.get_read_bind() is None
+            assert not ctx.session.accessed
+            assert core.ResponseCacheMixin().is_cacheable(
+                flask.response_class())
+
+    def test_get_read_bind_unset(self):
+        instance = sqlalchemy.ReadReplicaMixin()
+
+        assert instance.get_read_bind() is None
+        assert instance.get_read_session() is None
+
+        query = Mock()
+
+        assert instance.apply_read_session(query) is query
+
+    def test_record_write(self, flask):
+        instance = sqlalchemy.ReadReplicaMixin()
+
+        instance.record_write()
+
+        assert 'flask_generic_views.write' not in sqlalchemy.flask_session
+
+        flask.config['SQLALCHEMY_BINDS'] = {'replica': 'sqlite://'}
+
+        with patch.object(sqlalchemy._time, 'time', return_value=100):
+            instance.record_write()
+
+        assert sqlalchemy.flask_session['flask_generic_views.write'] == 100
+
+    def test_record_write_no_secret_key(self, flask):
+        flask.config['SQLALCHEMY_BINDS'] = {'replica': 'sqlite://'}
+        flask.secret_key = None
+
+        with flask.test_request_context('/'):
+            sqlalchemy.ReadReplicaMixin().record_write()
+
+            assert 'flask_generic_views.write' not in \
+                sqlalchemy.flask_session
+
+    def test_read_your_writes_other_view(self, flask, db, models, replica):
+        Post = models.Post
+
+        flask.add_url_rule('/posts/new', view_func=(
+            sqlalchemy.CreateView.as_view(
+                'post_create', model=Post, fields=('title',),
+                success_url='/posts/{id}')))
+        flask.add_url_rule('/posts/<int:pk>', view_func=(
+            sqlalchemy.DetailView.as_view(
+                'post_detail', model=Post, read_bind='replica')))
+
+        client = flask.test_client()
+
+        response = client.post('/posts/new', data={'title': 'new'})
+
+        assert response.location.endswith('/posts/2')
+
+        assert client.get('/posts/2').get_data(as_text=True) == 'new'
+
+    def test_read_session(self, flask, replica):
+        with flask.app_context():
+            session = sqlalchemy._read_session('replica')
+
+            assert session is sqlalchemy._read_session('replica')
+            assert session.get_bind() is replica
+
+            session.close = Mock()
+
+        session.close.assert_called_once_with()
+
+
+class TestObjectCache(object):
+
+    def test_get(self, db, models):
+        Author, Post = models.Author, models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a', title=u'a',
+                                    author=Author(name=u'b')))
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.ObjectCache()
+
+        post = Post.query.filter_by(slug=u'a').one()
+
+        instance.set(Post, {'slug': u'a'}, post)
+
+        sqlalchemy.session.remove()
+
+        with QueryCounter(db.engine) as queries:
+            post = instance.get(sqlalchemy.session(), Post, {'slug': u'a'})
+
+            assert post.title == u'a'
+            assert post.slug == u'a'
+            assert inspect(post).persistent
+
+        assert len(queries) == 0
+
+        assert post.author.name == u'b'
+        assert post in sqlalchemy.session
+        assert instance.get(sqlalchemy.session, Post, {'slug': u'b'}) is None
+        assert instance.get(sqlalchemy.session, Author, {'slug': u'a'}) \
+            is None
+
+        assert instance.info() == cache.CacheInfo(1, 2, 1024, 2)
+
+    def test_get_mismatch(self, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a'))
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.ObjectCache()
+        instance.set(Post, {'slug': u'b'}, Post.query.one())
+
+        assert instance.get(sqlalchemy.session, Post, {'slug': u'b'}) is None
+
+    def test_set_deferred(self, db, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a', body=u'b'))
+        sqlalchemy.session.commit()
+        sqlalchemy.session.remove()
+
+        instance = sqlalchemy.ObjectCache()
+
+        post = Post.query.options(orm.defer(Post.body)).one()
+        instance.set(Post, {'id': post.id}, post)
+
+        sqlalchemy.session.remove()
+
+        post = instance.get(sqlalchemy.session, Post, {'id': post.id})
+
+        with QueryCounter(db.engine) as queries:
+            assert post.body == u'b'
+
+        assert len(queries) == 1
+
+    @pytest.mark.parametrize('change', ['update', 'delete', 'rollback'])
+    def test_invalidate(self, models, change):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a', title=u'a'))
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.ObjectCache()
+
+        post = Post.query.one()
+        instance.set(Post, {'id': 1}, post)
+
+        if change == 'delete':
+            sqlalchemy.session.delete(post)
+        else:
+            post.title = u'b'
+
+        if change == 'rollback':
+            sqlalchemy.session.flush()
+            sqlalchemy.session.rollback()
+        else:
+            sqlalchemy.session.commit()
+
+        assert instance.get(sqlalchemy.session, Post, {'id': 1}) is None
+        assert 'flask_generic_views.changes' not in sqlalchemy.session.info
+
+    def test_invalidate_lookup(self, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a'))
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.ObjectCache()
+        instance.set(Post, {'slug': u'a'}, Post.query.one())
+
+        instance.invalidate_lookup(Post, {'slug': u'b'})
+
+        assert instance.get(sqlalchemy.session, Post, {'slug': u'a'}) \
+            is not None
+
+        instance.invalidate_lookup(Post, {'slug': u'a'})
+
+        assert instance.get(sqlalchemy.session, Post, {'slug': u'a'}) is None
+
+    def test_timeout(self, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a'))
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.ObjectCache(timeout=10)
+
+        with patch.object(cache, 'time', return_value=100):
+            instance.set(Post, {'id': 1}, Post.query.one())
+
+        with patch.object(cache, 'time', return_value=105):
+            assert instance.get(sqlalchemy.session, Post, {'id': 1}) \
+                is not None
+
+        with patch.object(cache, 'time', return_value=110):
+            assert instance.get(sqlalchemy.session, Post, {'id': 1}) is None
+
+    def test_clear(self, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a'))
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.ObjectCache(maxsize=10)
+        instance.set(Post, {'id': 1}, Post.query.one())
+        instance.get(sqlalchemy.session, Post, {'id': 1})
+
+        instance.clear()
+
+        assert instance.info() == cache.CacheInfo(0, 0, 10, 0)
+
+
+class TestSingleObjectMixin(object):
+
+    @given(st.booleans(), st.booleans())
+    def test_get_model(self, query, model):
+        instance = sqlalchemy.SingleObjectMixin()
+        if query:
+            instance.query = mock_query()
+
+        if model:
+            instance.model = Mock()
+
+        cls = instance.get_model()
+
+        if query:
+            assert cls == instance.query.column_descriptions[0]['entity']
+        elif model:
+            assert cls == instance.model
+        else:
+            assert cls is None
+
+    @given(st.text(), st.lists(st.text(ASCII).filter(bool), unique=True),
+           st.integers(), st.booleans())
+    @example('pk', ['pk'], 1, True)
+    @example('pk', [], 1, True)
+    @example('pk', ['id_1', 'id_2'], 1, True)
+    @example('pk', ['pk'], 1, False)
+    def test_get_object_pk(self, pk_view_arg, fields, pk, success):
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.pk_view_arg = pk_view_arg
+        instance.query = query = mock_query(success)
+        instance.get_model = Mock()
+
+        return_value = query.filter_by.return_value.one.return_value
+
+        primary_key = [Column(key=name) for name in fields]
+
+        with patch.object(sqlalchemy, 'inspect') as m1:
+            with patch.object(sqlalchemy, 'request') as m2:
+                m1.return_value.primary_key = primary_key
+                m2.view_args = {pk_view_arg: pk}
+
+                if len(fields) == 1:
+                    if not success:
+                        with pytest.raises(HTTPException) as excinfo:
+                            instance.get_object()
+
+                        assert excinfo.value.code == 404
+                    else:
+                        assert instance.get_object() == return_value
+
+                    query.filter_by.assert_called_once_with(**{fields[0]: pk})
+                else:
+                    with pytest.raises(RuntimeError) as excinfo:
+                        instance.get_object()
+
+                    if len(fields) > 1:
+                        error = ('SingleObjectMixin requires non composite '
+                                 'primary key')
+                    else:
+                        error = ('SingleObjectMixin requires primary key')
+
+                    assert excinfo.value.args[0] == error
+
+            m1.assert_called_once_with(instance.get_model.return_value)
+            instance.get_model.assert_called_once_with()
+
+    @given(st.text(ASCII), st.text(ASCII), st.text(ASCII), st.booleans())
+    def test_get_object_slug(self, slug_view_arg, slug_field, slug, success):
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.query = query = mock_query(success)
+        instance.slug_view_arg = slug_view_arg
+
+        instance.get_slug_field = Mock(return_value=slug_field)
+
+        return_value = query.filter_by.return_value.one.return_value
+
+        with patch.object(sqlalchemy, 'request') as m:
+            m.view_args = {slug_view_arg: slug}
+
+            if not success:
+                with pytest.raises(HTTPException) as excinfo:
+                    instance.get_object()
+
+                assert excinfo.value.code == 404
+            else:
+                assert instance.get_object() == return_value
+
+        query.filter_by.assert_called_once_with(**{slug_field: slug})
+
+    @given(st.integers(), st.text(ASCII),
+           st.lists(st.text(ASCII).filter(bool), 2, 2, 2, unique=True),
+           st.booleans())
+    @example(1, 'foobar', ['id', 'slug'], True)
+    @example(1, 'foobar', ['id', 'slug'], False)
+    def test_get_object(self, pk, slug, fields, query_pk_and_slug):
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.slug_field = fields[0]
+        instance.query_pk_and_slug = query_pk_and_slug
+
+        query = mock_query()
+
+        instance.query = query
+
+        rv = query.filter_by.return_value.one.return_value
+
+        with patch.object(sqlalchemy, 'inspect') as m1:
+            with patch.object(sqlalchemy, 'request') as m2:
+                m1.return_value.primary_key = [Column(name=fields[1])]
+                m2.view_args = {instance.pk_view_arg: pk,
+                                instance.slug_view_arg: slug}
+
+                assert instance.get_object() == rv
+
+        if query_pk_and_slug:
+            query.filter_by.assert_called_once_with(**{fields[0]: slug,
+                                                       fields[1]: pk})
+        else:
+            query.filter_by.assert_called_once_with(**{fields[1]: pk})
+
+    @given(st.sampled_from(['found', 'missing', 'invalid', 'criteria']),
+           st.booleans())
+    def test_get_object_identity(self, outcome, found):
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.use_identity_map = True
+        instance.query = query = mock_query(found)
+        instance.get_model = Mock()
+
+        query.whereclause = Mock() if outcome == 'criteria' else None
+
+        if outcome == 'missing':
+            query.get.return_value = None
+        elif outcome == 'invalid':
+            query.get.side_effect = sqlalchemy.InvalidRequestError
+
+        with patch.object(sqlalchemy, 'inspect') as m1:
+            with patch.object(sqlalchemy, 'request') as m2:
+                with patch.object(sqlalchemy, 'object_lookup') as m3:
+                    m1.return_value.primary_key = [Column(name='id')]
+                    m2.view_args = {'pk': 1}
+
+                    if outcome == 'found':
+                        assert instance.get_object() == query.get.return_value
+                    elif outcome == 'missing' or not found:
+                        with pytest.raises(HTTPException) as excinfo:
+                            instance.get_object()
+
+                        assert excinfo.value.code == 404
+                    else:
+                        assert instance.get_object() == \
+                            query.filter_by.return_value.one.return_value
+
+        if outcome in ('found', 'missing', 'invalid'):
+            query.get.assert_called_once_with(1)
+        else:
+            assert not query.get.called
+
+        if outcome in ('found', 'missing'):
+            assert not query.filter_by.called
+            m3.send.assert_called_once_with(instance, lookup='identity')
+        else:
+            query.filter_by.assert_called_once_with(id=1)
+            m3.send.assert_called_once_with(instance, lookup='query')
+
+    def test_get_object_identity_string_pk(self, flask, db, models):
+        Post = models.Post
+
+        post = Post(slug=u'a', title=u'a')
+        sqlalchemy.session.add(post)
+        sqlalchemy.session.commit()
+        sqlalchemy.session.refresh(post)
+
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.use_identity_map = True
+        instance.model = Post
+
+        with flask.test_request_context('/'), \
+                QueryCounter(db.engine) as queries:
+            request.view_args = {'pk': '1'}
+
+            assert instance.get_object() is post
+
+        assert len(queries) == 0
+
+        with flask.test_request_context('/'):
+            request.view_args = {'pk': 'a'}
+
+            with pytest.raises(HTTPException) as excinfo:
+                instance.get_object()
+
+        assert excinfo.value.code == 404
+
+    def test_get_object_identity_slug(self):
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.use_identity_map = True
+        instance.query_pk_and_slug = True
+        instance.query = query = mock_query()
+        instance.get_model = Mock()
+
+        query.whereclause = None
+
+        with patch.object(sqlalchemy, 'inspect') as m1:
+            with patch.object(sqlalchemy, 'request') as m2:
+                m1.return_value.primary_key = [Column(name='id')]
+                m2.view_args = {'pk': 1, 'slug': 'foo'}
+
+                assert instance.get_object() == \
+                    query.filter_by.return_value.one.return_value
+
+        assert not query.get.called
+
+        query.filter_by.assert_called_once_with(id=1, slug='foo')
+
+    def test_get_object_cache(self):
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.object_cache = Mock()
+
+        assert instance.get_object_cache() == instance.object_cache
+
+    @pytest.mark.parametrize('criteria', [False, True])
+    def test_get_object_cached(self, flask, db, models, criteria):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a', title=u'a'))
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.object_cache = sqlalchemy.ObjectCache()
+
+        if criteria:
+            instance.query = Post.query.filter(Post.title != u'b')
+        else:
+            instance.model = Post
+
+        instance.get_model = Mock(return_value=Post)
+
+        lookups = []
+
+        def record(sender, lookup):
+            lookups.append(lookup)
+
+        with signals.object_lookup.connected_to(record):
+            for i in range(2):
+                sqlalchemy.session.remove()
+
+                with flask.test_request_context('/posts/a'), \
+                        QueryCounter(db.engine) as queries:
+                    request.view_args = {'slug': 'a'}
+
+                    assert instance.get_object().title == u'a'
+
+        if criteria:
+            assert lookups == ['query', 'query']
+            assert len(queries) == 1
+        else:
+            assert lookups == ['query', 'cache']
+            assert len(queries) == 0
+
+    @pytest.mark.parametrize('criteria', [False, True])
+    def test_get_object_lambda(self, flask, db, models, criteria):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a', title=u'a'))
+        sqlalchemy.session.add(Post(slug=u'b', title=u'b'))
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.use_lambda_statements = True
+        instance.get_model = Mock(return_value=Post)
+
+        if criteria:
+            instance.query = Post.query.filter(Post.title != u'b')
+        else:
+            instance.model = Post
+
+        instance.get_lookup_statement = Mock(
+            wraps=instance.get_lookup_statement)
+
+        for view_args in ({'pk': 1}, {'slug': 'a'}):
+            with flask.test_request_context('/'):
+                request.view_args = view_args
+
+                assert instance.get_object().title == u'a'
+
+            with flask.test_request_context('/'):
+                request.view_args = {'pk': 2}
+
+                if criteria:
+                    with pytest.raises(HTTPException) as excinfo:
+                        instance.get_object()
+
+                    assert excinfo.value.code == 404
+                else:
+                    assert instance.get_object().title == u'b'
+
+        with flask.test_request_context('/'):
+            request.view_args = {'slug': 'c'}
+
+            with pytest.raises(HTTPException) as excinfo:
+                instance.get_object()
+
+            assert excinfo.value.code == 404
+
+        assert instance.get_lookup_statement.called is not criteria
+
+    def test_get_object_lambda_joined_collection(self, flask, models):
+        Post, Comment = models.Post, models.Comment
+
+        sqlalchemy.session.add(Post(slug=u'a', title=u'a', comments=[
+            Comment(body=u'a'), Comment(body=u'b')]))
+        sqlalchemy.session.commit()
+        sqlalchemy.session.remove()
+
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.use_lambda_statements = True
+        instance.model = Post
+        instance.joined_load = ('comments',)
+
+        with flask.test_request_context('/'):
+            request.view_args = {'pk': 1}
+
+            obj = instance.get_object()
+
+        assert len(obj.__dict__['comments']) == 2
+
+    def test_get_object_lambda_get_query(self, flask, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a', title=u'a'))
+        sqlalchemy.session.add(Post(slug=u'b', title=u'b'))
+        sqlalchemy.session.commit()
+
+        class PostMixin(sqlalchemy.SingleObjectMixin):
+            model = Post
+            use_lambda_statements = True
+
+            def get_query(self):
+                query = super(PostMixin, self).get_query()
+
+                return query.filter(Post.title != u'b')
+
+        instance = PostMixin()
+        instance.get_lookup_statement = Mock()
+
+        with flask.test_request_context('/'):
+            request.view_args = {'pk': 2}
+
+            with pytest.raises(HTTPException) as excinfo:
+                instance.get_object()
+
+        assert excinfo.value.code == 404
+        assert not instance.get_lookup_statement.called
+
+    def test_get_lookup_statement(self, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(slug=u'a', title=u'a', body=u'a'))
+        sqlalchemy.session.commit()
+        sqlalchemy.session.remove()
+
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.model = Post
+        instance.only_columns = ('title',)
+
+        statement = instance.get_lookup_statement({'slug': 'a', 'id': 1})
+        obj = sqlalchemy.session.execute(statement).scalars().one()
+
+        assert obj.title == u'a'
+        assert 'body' not in obj.__dict__
+
+        statement = instance.get_lookup_statement({'slug': 'b', 'id': 1})
+
+        assert sqlalchemy.session.execute(statement).first() is None
+
+    def test_get_object_neither(self):
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.query = mock_query()
+
+        with patch.object(sqlalchemy, 'request') as m:
+            m.view_args = {}
+
+            with pytest.raises(RuntimeError) as excinfo:
+                instance.get_object()
+
+        error = ('SingleObjectMixin must be called with either object pk or '
+                 'slug')
+
+        assert excinfo.value.args[0] == error
+
+    @given(st.booleans(), st.booleans())
+    def test_get_query(self, model, query):
+        instance = sqlalchemy.SingleObjectMixin()
+        if model:
+            instance.model = Mock()
+
+        if query:
+            instance.query = Mock()
+
+        if not model and not query:
+            with pytest.raises(NotImplementedError) as excinfo:
+                instance.get_query()
+
+            error = ('SingleObjectMixin requires either a definition of '
+                     "'query', 'model', or an implementation of 'get_query()'")
+
+            assert excinfo.value.args[0] == error
+
+        elif query:
+            assert instance.get_query() == instance.query
+        else:
+            assert instance.get_query() == instance.model.query
+
+    @given(st.text())
+    @example('slug')
+    def test_get_slug_field(self, slug):
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.slug_field = slug
+
+        assert instance.get_slug_field() == slug
+
+    @given(st.booleans(), st.text(SLUG).map(camelize).map(str))
+    def test_get_context_object_name(self, name, class_name):
+        instance = sqlalchemy.SingleObjectMixin()
+        instance.get_model = Mock(return_value=None)
+
+        if name:
+            instance.context_object_name = Mock()
+
+        if class_name:
+            instance.get_model.return_value = type(class_name, (object,), {})
+
+        result = instance.get_context_object_name()
+
+        if name:
+            assert result == instance.context_object_name
+        elif class_name:
+            assert result == underscore(class_name)
+        else:
+            assert result is None
+
+    @given(st.booleans(), st.text(), st.dictionaries(st.text(), st.text()))
+    @example(True, 'foo', {'foo': 'bar'})
+    @example(True, 'bar', {'object': 'baz'})
+    @example(True, 'baz', {'object': 'bar', 'baz': 'foo'})
+    @example(True, 'foo', {})
+    @example(True, '', {})
+    @example(True, '', {'object': 'foo bar'})
+    @example(False, '', {})
+    def test_get_context_data(self, obj, context_object_name, kwargs):
+        instance = sqlalchemy.SingleObjectMixin()
+
+        context = kwargs.copy()
+
+        if obj:
+            instance.object = Mock()
+            context.setdefault('object', instance.object)
+
+            if context_object_name:
+                context.setdefault(context_object_name, instance.object)
+
+        with patch.object(core.ContextMixin, 'get_context_data') as m1:
+            with patch.object(instance, 'get_context_object_name') as m2:
+                m2.return_value = context_object_name or None
+
+                result = instance.get_context_data(**kwargs)
+
+                m1.assert_called_once_with(**context)
+
+                assert result == m1.return_value
+
+
+class TestBaseDetailView(object):
+
+    def test_get(self):
+        instance = sqlalchemy.BaseDetailView()
+        instance.get_object = get_object = Mock()
+        instance.get_context_data = get_context_data = Mock()
+        instance.create_response = render = Mock()
+
+        assert instance.get() == render.return_value
+        assert instance.object == get_object.return_value
+
+        render.assert_called_once_with(get_context_data.return_value)
+
+        get_context_data.assert_called_once_with()
+
+
+class TestSingleObjectTemplateResponseMixin(object):
+
+    @given(st.text(ASCII), st.text(ASCII), st.text(ASCII))
     def test_format_template_name(self, blueprint, name, suffix):
         instance = sqlalchemy.SingleObjectTemplateResponseMixin()
         instance.template_name_suffix = suffix
 
-        with patch.object(sqlalchemy, 'request') as m:
-            m.blueprint = blueprint or None
+        with patch.object(sqlalchemy, 'request') as m:
+            m.blueprint = blueprint or None
+
+            if blueprint:
+                prefix = blueprint + '/'
+            else:
+                prefix = ''
+
+            expected = '{0}{1}{2}.html'.format(prefix, name, suffix)
+
+            assert instance._format_template_name(name) == expected
+
+    @given(st.text(), st.text(SLUG).map(camelize).map(str), st.text(SLUG),
+           st.text())
+    @example('', '', '', '')
+    @example('foo.html', '', '', '')
+    @example('',  'FooBar', '', '')
+    @example('', '', 'foo', '')
+    @example('', '', 'foo', 'bar')
+    def test_get_template_list(self, template_name, class_name, field, value):
+        model = class_name and type(class_name, (object,), {}) or None
+
+        instance = sqlalchemy.SingleObjectTemplateResponseMixin()
+        instance.template_name_field = field or None
+        instance._format_template_name = fmt = Mock()
+        instance.get_model = get_model = Mock(return_value=model)
+
+        if field and value:
+            instance.object = Mock()
+            setattr(instance.object, field, value or None)
+
+        p1 = patch.object(core.TemplateResponseMixin, 'get_template_list')
+
+        with p1 as m1:
+            if not template_name:
+                m1.side_effect = NotImplementedError
+
+                names = []
+
+                if field and value:
+                    names.append(value)
+
+                if class_name:
+                    names.append(fmt.return_value)
+
+                if names:
+                    assert instance.get_template_list() == names
+
+                    if class_name:
+                        fmt.assert_called_once_with(underscore(class_name))
+                else:
+                    with pytest.raises(NotImplementedError):
+                        instance.get_template_list()
+
+                get_model.assert_called_once_with()
+
+            else:
+                assert instance.get_template_list() == m1.return_value
+
+
+class TestMultipleObjectMixin(object):
+
+    @given(st.booleans(), st.booleans())
+    def test_get_model(self, query, model):
+        instance = sqlalchemy.MultipleObjectMixin()
+
+        if query:
+            instance.query = mock_query()
+
+        if model:
+            instance.model = Mock()
+
+        cls = instance.get_model()
+
+        if query:
+            assert cls == instance.query.column_descriptions[0]['entity']
+        elif model:
+            assert cls == instance.model
+        else:
+            assert cls is None
+
+    @given(st.booleans(), st.booleans(), st.integers(0, 10))
+    @example(True, False, 0)
+    @example(False, True, 0)
+    @example(True, True, 0)
+    @example(True, False, 10)
+    @example(False, True, 10)
+    @example(True, True, 10)
+    @example(False, False, 0)
+    def test_get_query(self, model, query, order_by):
+        order_by = [Mock() for x in range(order_by)]
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.get_order_by = Mock(return_value=order_by)
+
+        if query:
+            instance.query = Mock()
+
+        if model:
+            instance.model = Mock()
+
+        if not model and not query:
+            with pytest.raises(NotImplementedError) as excinfo:
+                instance.get_query()
+
+            error = ('MultipleObjectMixin requires either a definition of '
+                     "'query', 'model', or an implementation of 'get_query()'")
+
+            assert excinfo.value.args[0] == error
+        else:
+            result = instance.get_query()
+
+            if query:
+                expected = instance.query
+            else:
+                expected = instance.model.query
+
+            if order_by:
+                expected.order_by.assert_called_once_with(*order_by)
+                expected = expected.order_by.return_value
+
+            assert result == expected
+
+    def test_get_order_by(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.order_by = Mock()
+
+        assert instance.get_order_by() == instance.order_by
+
+    def test_get_error_out(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.error_out = Mock()
+
+        assert instance.get_error_out() == instance.error_out
+
+    def test_get_pagination(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.pagination_class = Mock()
+        query = Mock()
+        page = Mock()
+        per_page = Mock()
+        total = Mock()
+        items = Mock()
+
+        result = instance.get_pagination(
+            query, page, per_page, total, items)
+
+        assert result == instance.pagination_class.return_value
+
+        instance.pagination_class.assert_called_once_with(query, page,
+                                                          per_page, total,
+                                                          items)
+
+    def test_get_count_strategy(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.count_strategy = Mock()
+
+        assert instance.get_count_strategy() == instance.count_strategy
+
+    def test_apply_pagination_count_strategy(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.get_page = Mock(return_value=2)
+        instance.get_pagination = Mock()
+        instance.count_strategy = strategy = Mock()
+        instance.get_pagination.return_value.pages = 50
+
+        items = [object(), object()]
+
+        strategy.paginate.return_value = (items, 100, False)
+
+        object_list = mock_query()
+
+        instance.apply_pagination(object_list, 2, False)
+
+        strategy.paginate.assert_called_once_with(object_list, 2, 2)
+
+        instance.get_pagination.assert_called_once_with(object_list, 2, 2,
+                                                        100, items)
+
+        assert instance.get_pagination.return_value.exact is False
+
+    def test_apply_pagination_get_pagination_override(self, models):
+        Post = models.Post
+
+        for i in range(3):
+            sqlalchemy.session.add(Post(title=str(i)))
+
+        sqlalchemy.session.commit()
+
+        class PostListMixin(sqlalchemy.MultipleObjectMixin):
+            def get_pagination(self, query, page, per_page, total, items):
+                return super(PostListMixin, self).get_pagination(
+                    query, page, per_page, total, items)
+
+        instance = PostListMixin()
+        instance.get_page = Mock(return_value=1)
+
+        pagination, items, is_paginated = instance.apply_pagination(
+            Post.query.order_by(Post.id), 2, True)
+
+        assert [p.title for p in items] == [u'0', u'1']
+        assert pagination.total == 3
+        assert pagination.exact is True
+        assert is_paginated
+
+    @given(st.text().filter(bool),
+           st.one_of(st.none(), st.integers(), st.text(DIGITS).filter(bool),
+                     st.text()),
+           st.one_of(st.none(), st.integers(), st.text(DIGITS).filter(bool),
+                     st.text()),
+           st.booleans())
+    @example('page', 1, None, False)
+    @example('page', None, 2, False)
+    @example('page', '3', '4', False)
+    @example('page', 'five', None, False)
+    @example('page', 6, 'sevent', False)
+    @example('page', 'eight', None, True)
+    @example('page', None, 'nine', True)
+    @example('page', -10, None, True)
+    @example('page', None, '-11', False)
+    def test_get_page(self, page_arg, view_arg_value, arg_value, error_out):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.page_arg = page_arg
+
+        with patch.object(sqlalchemy, 'request') as m1:
+            if view_arg_value is not None:
+                m1.view_args = {page_arg: view_arg_value}
+            else:
+                m1.view_args = {}
+
+            if arg_value is not None:
+                m1.args = {page_arg: arg_value}
+            else:
+                m1.args = {}
+
+            if view_arg_value is not None:
+                expected = view_arg_value
+            elif arg_value is not None:
+                expected = arg_value
+            else:
+                expected = 1
+
+            try:
+                expected = int(expected)
+            except ValueError:
+                pass
+
+            print(repr(expected))
+
+            if error_out and (not isinstance(expected, integer_types) or
+                              expected < 1):
+                with pytest.raises(HTTPException) as excinfo:
+                    instance.get_page(error_out)
+
+                assert excinfo.value.code == 404
+            else:
+                if not isinstance(expected, integer_types) or expected < 1:
+                    expected = 1
+
+                assert instance.get_page(error_out) == expected
+
+    def test_get_per_page(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.per_page = Mock()
+
+        assert instance.get_per_page() == instance.per_page
+
+    @given(st.booleans(), st.text(SLUG).map(camelize).map(str))
+    def test_get_context_object_name(self, name, class_name):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.get_model = Mock(return_value=None)
+
+        if name:
+            instance.context_object_name = Mock()
+
+        if class_name:
+            instance.get_model.return_value = type(class_name, (object,), {})
+
+        result = instance.get_context_object_name()
+
+        if name:
+            assert result == instance.context_object_name
+        elif class_name:
+            assert result == '{0}_list'.format(underscore(class_name))
+        else:
+            assert result is None
+
+    @given(st.integers(1), st.integers(1, 100), st.integers(0),
+           st.booleans())
+    def test_apply_pagination(self, page, per_page, total, error_out):
+        pages = int(ceil(total / float(per_page)))  # number of pages
+        count = max(min(total - per_page * (page - 1), per_page), 0)
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.get_page = Mock(return_value=page)
+        instance.get_pagination = Mock()
+
+        pagination = instance.get_pagination.return_value
+        pagination.pages = pages
+
+        items = [object() for v in range(count)]
+
+        object_list = mock_query()
+        object_list_limit = object_list.limit
+        object_list_offset = object_list_limit.return_value.offset
+        object_list_all = object_list_offset.return_value.all
+        object_list_order_by = object_list.order_by
+        object_list_count = object_list_order_by.return_value.count
+
+        object_list_all.return_value = items
+        object_list_count.return_value = total
+
+        offset = (page - 1) * per_page
+
+        if count == 0 and page != 1 and error_out:
+            with pytest.raises(HTTPException) as excinfo:
+                instance.apply_pagination(object_list, per_page, error_out)
+
+            assert excinfo.value.code == 404
+        else:
+            result = instance.apply_pagination(
+                object_list, per_page, error_out)
+
+            assert result == (pagination, pagination.items, pages > 1)
+
+            instance.get_pagination.assert_called_once_with(object_list, page,
+                                                            per_page, total,
+                                                            items)
+
+            assert pagination.exact is True
+
+        object_list_limit.assert_called_once_with(per_page)
+        object_list_offset.assert_called_once_with(offset)
+        object_list_all.assert_called_once_with()
+
+        instance.get_page.assert_called_once_with(error_out)
+
+        if object_list_count.called:
+            object_list_order_by.assert_called_once_with(None)
+
+    def test_get_pagination_mode(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.pagination_mode = Mock()
+
+        assert instance.get_pagination_mode() == instance.pagination_mode
+
+    @given(st.integers(1), st.integers(1, 100), st.integers(0),
+           st.booleans())
+    def test_apply_simple_pagination(self, page, per_page, total, error_out):
+        count = max(min(total - per_page * (page - 1), per_page + 1), 0)
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.pagination_mode = 'simple'
+        instance.get_page = Mock(return_value=page)
+
+        items = [object() for v in range(count)]
+
+        object_list = mock_query()
+        object_list_limit = object_list.limit
+        object_list_offset = object_list_limit.return_value.offset
+        object_list_all = object_list_offset.return_value.all
+
+        object_list_all.return_value = items
+
+        if count == 0 and page != 1 and error_out:
+            with pytest.raises(HTTPException) as excinfo:
+                instance.apply_pagination(object_list, per_page, error_out)
+
+            assert excinfo.value.code == 404
+        else:
+            pagination, object_list_, is_paginated = \
+                instance.apply_pagination(object_list, per_page, error_out)
+
+            assert object_list_ == pagination.items == items[:per_page]
+            assert pagination.page == page
+            assert pagination.has_next == (count > per_page)
+            assert pagination.has_prev == (page > 1)
+            assert is_paginated == (count > per_page or page > 1)
+
+        object_list_limit.assert_called_once_with(per_page + 1)
+        object_list_offset.assert_called_once_with((page - 1) * per_page)
+
+        assert not object_list.order_by.called
+
+        instance.get_page.assert_called_once_with(error_out)
+
+    def test_apply_pagination_keyset(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.pagination_mode = 'keyset'
+        instance.apply_keyset_pagination = Mock()
+        object_list = mock_query()
+
+        result = instance.apply_pagination(object_list, 10, True)
+
+        assert result == instance.apply_keyset_pagination.return_value
+
+        instance.apply_keyset_pagination.assert_called_once_with(
+            object_list, 10, True)
+
+    @given(st.one_of(st.none(), st.booleans(), st.integers(), st.floats(),
+                     st.text(), st.datetimes(), st.dates(), st.times(),
+                     st.decimals(allow_nan=False), st.uuids()))
+    def test_cursor_value(self, value):
+        result = sqlalchemy._load_cursor_value(
+            sqlalchemy._dump_cursor_value(value))
+
+        if value != value:
+            assert result != result
+        else:
+            assert result == value
+            assert type(result) == type(value)
+
+    def test_cursor_value_timezone(self):
+        value = datetime(2016, 1, 2, 3, 4, 5, 6, fixed_offset(3600))
+
+        result = sqlalchemy._load_cursor_value(
+            sqlalchemy._dump_cursor_value(value))
+
+        assert result == value
+        assert result.utcoffset() == value.utcoffset()
+
+    @given(st.text(), st.booleans())
+    @example('', False)
+    @example('', True)
+    @example('invalid', False)
+    @example('invalid', True)
+    def test_get_cursor(self, cursor, error_out):
+        instance = sqlalchemy.MultipleObjectMixin()
+
+        with patch.object(sqlalchemy, 'request') as m:
+            m.args = {'cursor': cursor}
+
+            if not cursor:
+                assert instance.get_cursor(error_out) is None
+            elif error_out:
+                with pytest.raises(HTTPException) as excinfo:
+                    instance.get_cursor(error_out)
+
+                assert excinfo.value.code == 404
+            else:
+                assert instance.get_cursor(error_out) is None
+
+            m.args = {'cursor': sqlalchemy._cursor_serializer().dumps(
+                {'v': [1, sqlalchemy._dump_cursor_value(date(2016, 1, 1))],
+                 'r': True})}
+
+            assert instance.get_cursor(error_out) == ([1, date(2016, 1, 1)],
+                                                      True)
+
+    def test_get_cursor_secret_key(self, flask):
+        instance = sqlalchemy.MultipleObjectMixin()
+        flask.secret_key = None
+
+        with patch.object(sqlalchemy, 'request') as m:
+            m.args = {'cursor': 'foo'}
+
+            with pytest.raises(RuntimeError):
+                instance.get_cursor(False)
+
+    def test_get_keyset_order_by(self, models):
+        Post = models.Post
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
+
+        assert instance.get_keyset_order_by() == [(Post.id, False)]
+
+        instance.order_by = (Post.created_at.desc(), Post.title)
+
+        result = instance.get_keyset_order_by()
+
+        assert [(str(c), d) for c, d in result] == [
+            ('post.created_at', True), ('Post.title', False),
+            ('post.id', False)]
+
+        instance.order_by = (Post.title, Post.__table__.c.id.desc())
+
+        result = instance.get_keyset_order_by()
+
+        assert [(str(c), d) for c, d in result] == [
+            ('Post.title', False), ('post.id', True)]
+
+        instance.order_by = (func.lower(Post.title),)
+
+        with pytest.raises(RuntimeError):
+            instance.get_keyset_order_by()
+
+    @given(st.integers(1, 10), st.booleans())
+    @example(5, False)
+    @example(1, True)
+    def test_apply_keyset_pagination(self, models, per_page, descending):
+        Post = models.Post
+
+        if Post.query.count() == 0:
+            start = datetime(2016, 1, 1)
+
+            for i in range(23):
+                created_at = start + timedelta(days=i // 3)
+                sqlalchemy.session.add(Post(title=str(i),
+                                            created_at=created_at))
+
+            sqlalchemy.session.commit()
+
+        if descending:
+            order_by = (Post.created_at.desc(),)
+        else:
+            order_by = (Post.created_at,)
+
+        expected = [p.id for p in
+                    Post.query.order_by(*order_by + (Post.id,)).all()]
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
+        instance.order_by = order_by
+        instance.pagination_mode = 'keyset'
+
+        pages = []
+        cursor = None
+
+        while True:
+            url = '/?' + url_encode({'cursor': cursor}) if cursor else '/'
+
+            with current_app.test_request_context(url):
+                pagination, items, is_paginated = instance.apply_pagination(
+                    instance.get_query(), per_page, True)
+
+            assert items == pagination.items
+            assert len(items) <= per_page
+            assert is_paginated == (len(expected) > per_page)
+            assert pagination.has_prev == bool(pages)
+
+            pages.append([p.id for p in items])
+
+            if not pagination.has_next:
+                break
+
+            cursor = pagination.next_cursor
+
+        assert sum(pages, []) == expected
+
+        for page in reversed(pages[:-1]):
+            cursor = pagination.prev_cursor
+
+            with current_app.test_request_context(
+                    '/?' + url_encode({'cursor': cursor})):
+                pagination, items, is_paginated = instance.apply_pagination(
+                    instance.get_query(), per_page, True)
+
+            assert [p.id for p in items] == page
+            assert pagination.has_next
+
+        assert not pagination.has_prev
+
+    @pytest.mark.parametrize('per_page', [1, 2, 3])
+    @pytest.mark.parametrize('descending', [False, True])
+    def test_apply_keyset_pagination_null(self, models, per_page,
+                                          descending):
+        Post = models.Post
+
+        for i, title in enumerate([u'b', None, u'a', None, u'b', u'c']):
+            sqlalchemy.session.add(Post(id=i + 1, title=title))
+
+        sqlalchemy.session.commit()
+
+        # NULL is ordered after all other values, before them descending.
+        expected = [p.id for p in sorted(
+            Post.query.all(), reverse=descending,
+            key=lambda p: (p.title is None, p.title or u'',
+                           -p.id if descending else p.id))]
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
+        instance.order_by = (Post.title.desc() if descending else Post.title,)
+        instance.pagination_mode = 'keyset'
+
+        pages = []
+        cursor = None
+
+        while True:
+            url = '/?' + url_encode({'cursor': cursor}) if cursor else '/'
+
+            with current_app.test_request_context(url):
+                pagination, items, is_paginated = instance.apply_pagination(
+                    instance.get_query(), per_page, True)
+
+            pages.append([p.id for p in items])
+
+            if not pagination.has_next:
+                break
+
+            cursor = pagination.next_cursor
+
+        assert sum(pages, []) == expected
+
+        for page in reversed(pages[:-1]):
+            with current_app.test_request_context(
+                    '/?' + url_encode({'cursor': pagination.prev_cursor})):
+                pagination, items, is_paginated = instance.apply_pagination(
+                    instance.get_query(), per_page, True)
+
+            assert [p.id for p in items] == page
+
+    @given(st.booleans())
+    def test_apply_keyset_pagination_invalid(self, models, error_out):
+        Post = models.Post
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
+        instance.pagination_mode = 'keyset'
+
+        cursor = sqlalchemy._cursor_serializer().dumps({'v': [1, 2],
+                                                        'r': False})
+
+        with current_app.test_request_context(
+                '/?' + url_encode({'cursor': cursor})):
+
+            if error_out:
+                with pytest.raises(HTTPException) as excinfo:
+                    instance.apply_pagination(instance.get_query(), 10,
+                                              error_out)
+
+                assert excinfo.value.code == 404
+            else:
+                pagination, items, is_paginated = instance.apply_pagination(
+                    instance.get_query(), 10, error_out)
+
+                assert items == []
+                assert not pagination.has_prev
+                assert not pagination.has_next
+
+    def test_get_yield_per(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.yield_per = Mock()
+
+        assert instance.get_yield_per() == instance.yield_per
+
+    def test_get_context_data_yield_per(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.object_list = query = mock_query()
+        instance.yield_per = 100
+        instance.get_context_object_name = Mock(return_value=None)
+
+        context = instance.get_context_data()
+
+        assert context['object_list'] == query.yield_per.return_value
+        assert context['pagination'] is None
+        assert context['is_paginated'] is False
+
+        query.yield_per.assert_called_once_with(100)
+        assert not query.all.called
+
+    def test_get_row_mode(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.row_mode = Mock()
+
+        assert instance.get_row_mode() == instance.row_mode
+
+    def test_get_row_columns(self, models):
+        Post = models.Post
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
+
+        assert instance.get_row_columns() == [
+            Post.id, Post.slug, Post.title, Post.body, Post.created_at,
+            Post.author_id]
+
+        instance.defer_large_columns = True
+
+        assert Post.body not in instance.get_row_columns()
+
+        instance.only_columns = ('title', Post.created_at)
+
+        assert instance.get_row_columns() == [Post.id, Post.title,
+                                              Post.created_at]
+
+    def test_get_query_row_mode(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Mock()
+        instance.row_mode = True
+        instance.joined_load = ('author',)
+        instance.apply_row_mode = Mock()
+        instance.apply_load_options = Mock()
+
+        result = instance.get_query()
+
+        assert result == instance.apply_row_mode.return_value
+
+        instance.apply_row_mode.assert_called_once_with(instance.model.query)
+        assert not instance.apply_load_options.called
+
+    @pytest.mark.parametrize('mode', ['offset', 'simple', 'keyset'])
+    def test_apply_pagination_row_mode(self, models, mode):
+        Post = models.Post
+
+        for i in range(12):
+            sqlalchemy.session.add(Post(title=str(i), body='x' * 100))
+
+        sqlalchemy.session.commit()
+        sqlalchemy.session.expunge_all()
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
+        instance.order_by = (Post.id.desc(),)
+        instance.only_columns = ('title',)
+        instance.row_mode = True
+        instance.pagination_mode = mode
+        instance.get_page = Mock(return_value=1)
+
+        pagination, items, is_paginated = instance.apply_pagination(
+            instance.get_query(), 5, True)
+
+        assert [(r.id, r.title) for r in items] == \
+            [(12 - i, str(11 - i)) for i in range(5)]
+        assert not hasattr(items[0], 'body')
+        assert pagination.has_next
+        assert is_paginated
+        assert len(sqlalchemy.session.identity_map) == 0
+
+        if mode == 'keyset':
+            with current_app.test_request_context(
+                    '/?' + url_encode({'cursor': pagination.next_cursor})):
+                pagination, items, is_paginated = instance.apply_pagination(
+                    instance.get_query(), 5, True)
+
+            assert [r.id for r in items] == [7, 6, 5, 4, 3]
+
+    def test_get_page_cache(self):
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.page_cache = Mock()
+
+        assert instance.get_page_cache() == instance.page_cache
+
+    @pytest.mark.parametrize('mode', ['offset', 'simple'])
+    @pytest.mark.parametrize('row_mode', [False, True])
+    def test_apply_pagination_page_cache(self, db, models, mode, row_mode):
+        Author, Post = models.Author, models.Post
+
+        for i in range(12):
+            sqlalchemy.session.add(Post(title=str(i)))
+
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
+        instance.order_by = (Post.id.desc(),)
+        instance.pagination_mode = mode
+        instance.row_mode = row_mode
+        instance.page_cache = cache.TaggedCache(default_timeout=60)
+        instance.get_page = Mock(return_value=2)
+
+        def paginate(expected):
+            sqlalchemy.session.remove()
+
+            with QueryCounter(db.engine) as queries:
+                pagination, items, is_paginated = instance.apply_pagination(
+                    instance.get_query(), 5, True)
+
+            assert [i.title for i in items] == \
+                [str(i) for i in range(expected, expected - 5, -1)]
+            assert is_paginated
+            assert pagination.has_next
+
+            if mode == 'offset':
+                assert pagination.total == expected + 6
+
+            return len(queries)
+
+        assert paginate(6) in (1, 2)
+        assert paginate(6) == (0 if row_mode else 1)
+
+        sqlalchemy.session.add(Author(name=u'a'))
+        sqlalchemy.session.commit()
+
+        assert paginate(6) == (0 if row_mode else 1)
+
+        sqlalchemy.session.add(Post(title=u'12'))
+        sqlalchemy.session.commit()
+
+        assert paginate(7) in (1, 2)
+        assert paginate(7) == (0 if row_mode else 1)
+
+    @pytest.mark.parametrize('backend,timeout,valid', [
+        (None, None, False),
+        (None, 60, True),
+        (cache.LRUCache(default_timeout=60), None, True),
+        ('filesystem', None, True),
+    ])
+    def test_apply_pagination_page_cache_timeout(self, models, tmpdir,
+                                                 backend, timeout, valid):
+        if backend == 'filesystem':
+            backend = cache.FileSystemCache(str(tmpdir.join('cache')))
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = models.Post
+        instance.page_cache = cache.TaggedCache(backend, timeout)
+        instance.get_page = Mock(return_value=1)
+
+        if valid:
+            instance.apply_pagination(instance.get_query(), 5, True)
+        else:
+            with pytest.raises(RuntimeError) as excinfo:
+                instance.apply_pagination(instance.get_query(), 5, True)
+
+            error = ("MultipleObjectMixin requires a 'page_cache' with a "
+                     "timeout, or with a backend shared between processes")
+
+            assert excinfo.value.args[0] == error
+
+    def test_apply_pagination_page_cache_commit(self, db, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(title=u'a'))
+        sqlalchemy.session.commit()
+
+        strategy = sqlalchemy.ExactCount()
+
+        def paginate(query, page, per_page):
+            result = strategy.paginate(query, page, per_page)
+
+            # committed by another request while the page was retrieved.
+            session = sqlalchemy.SignallingSession(db)
+            session.add(Post(title=u'b'))
+            session.commit()
+
+            return result
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
+        instance.order_by = (Post.id,)
+        instance.page_cache = cache.TaggedCache(default_timeout=60)
+        instance.count_strategy = Mock(paginate=Mock(side_effect=paginate))
+        instance.get_page = Mock(return_value=1)
+
+        pagination, items, is_paginated = instance.apply_pagination(
+            instance.get_query(), 5, True)
+
+        assert [p.title for p in items] == [u'a']
+
+        instance.count_strategy = strategy
+
+        pagination, items, is_paginated = instance.apply_pagination(
+            instance.get_query(), 5, True)
+
+        assert [p.title for p in items] == [u'a', u'b']
+
+    def test_invalidate_other_sessions(self, db, models):
+        Post = models.Post
+
+        page_cache = cache.TaggedCache(default_timeout=60)
+        tag = sqlalchemy._table_tag(Post.__table__)
+
+        page_cache.set('posts', 1, tags=[tag])
+
+        session = orm.Session(bind=db.engine)
+        session.add(Post(title=u'a'))
+        session.commit()
+
+        assert page_cache.get('posts') == 1
+
+        sqlalchemy.session.add(Post(title=u'b'))
+        sqlalchemy.session.flush()
+
+        assert page_cache.get('posts') == 1
+
+        sqlalchemy.session.commit()
+
+        assert page_cache.get('posts') is None
+
+    def test_apply_pagination_page_cache_missing(self, db, models):
+        Post = models.Post
+
+        for i in range(12):
+            sqlalchemy.session.add(Post(title=str(i)))
+
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
+        instance.order_by = (Post.id,)
+        instance.page_cache = cache.TaggedCache(default_timeout=60)
+        instance.get_page = Mock(return_value=1)
+
+        instance.apply_pagination(instance.get_query(), 5, True)
+
+        db.engine.execute(Post.__table__.delete().where(Post.id == 1))
+
+        pagination, items, is_paginated = instance.apply_pagination(
+            instance.get_query(), 5, True)
+
+        assert [p.id for p in items] == [2, 3, 4, 5, 6]
+        assert pagination.total == 11
+
+    def test_apply_pagination_page_cache_mixed(self, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(title=u'a'))
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.model = Post
+        instance.page_cache = page_cache = cache.TaggedCache(
+            default_timeout=60)
+        instance.get_page = Mock(return_value=1)
+
+        instance.apply_pagination(instance.get_query().add_columns(Post.id),
+                                  5, True)
+
+        assert len(page_cache.backend) == 0
+
+    @given(st.integers(0), st.booleans(), st.text(SLUG),
+           st.dictionaries(st.text(SLUG), st.text()))
+    def test_get_context_data(self, per_page, error_out, name, kwargs):
+        paginated = [Mock(), Mock(), Mock()]
+
+        instance = sqlalchemy.MultipleObjectMixin()
+        instance.object_list = query = mock_query()
+        instance.apply_pagination = pagination = Mock(return_value=paginated)
+        instance.get_context_object_name = Mock(return_value=name or None)
+        instance.get_per_page = Mock(return_value=per_page)
+        instance.get_error_out = Mock(return_value=error_out)
+
+        context = kwargs.copy()
+
+        if per_page > 0:
+            context.setdefault('pagination', paginated[0])
+            context.setdefault('object_list', paginated[1])
+            context.setdefault('is_paginated', paginated[2])
+            if name:
+                context.setdefault(name, paginated[1])
+        else:
+            context.setdefault('pagination', None)
+            context.setdefault('object_list', query.all.return_value)
+            context.setdefault('is_paginated', False)
+            if name:
+                context.setdefault(name, query.all.return_value)
+
+        with patch.object(core.ContextMixin, 'get_context_data') as m:
+            assert instance.get_context_data(**kwargs) == m.return_value
+
+            m.assert_called_once_with(**context)
+
+            if per_page > 0:
+                pagination.assert_called_once_with(query, per_page, error_out)
+
+        instance.get_context_object_name.assert_called_once_with()
+
+
+class TestPagination(object):
+
+    @given(st.integers(1, 10), st.integers(1, 10), st.integers(0, 100),
+           st.booleans())
+    def test_has_next(self, page, per_page, total, exact):
+        count = max(min(total - per_page * (page - 1), per_page), 0)
+        items = [object() for v in range(count)]
+
+        instance = sqlalchemy.Pagination(None, page, per_page, total, items)
+        instance.exact = exact
+
+        if exact or count < per_page:
+            assert instance.has_next == (page < instance.pages)
+        else:
+            assert instance.has_next
+
+
+class TestSimplePagination(object):
+
+    @given(st.integers(1, 10), st.booleans())
+    def test_navigation(self, page, has_next):
+        instance = sqlalchemy.SimplePagination(None, page, 10, [], has_next)
+
+        assert instance.total is None
+        assert instance.has_next == has_next
+        assert instance.has_prev == (page > 1)
+        assert instance.next_num == (page + 1 if has_next else None)
+        assert instance.prev_num == (page - 1 if page > 1 else None)
+
+
+class TestCountStrategy(object):
+
+    @given(st.integers(1), st.integers(1, 100), st.integers(0))
+    def test_paginate(self, page, per_page, total):
+        count = max(min(total - per_page * (page - 1), per_page), 0)
+        items = [object() for v in range(count)]
+
+        instance = sqlalchemy.CountStrategy()
+        instance.count = Mock(return_value=(total, False))
+
+        query = mock_query()
+        query.limit.return_value.offset.return_value.all.return_value = items
+
+        result = instance.paginate(query, page, per_page)
+
+        if page == 1 and count < per_page:
+            assert result == (items, count, True)
+            assert not instance.count.called
+        else:
+            assert result == (items, total, False)
+            instance.count.assert_called_once_with(query)
+
+        query.limit.assert_called_once_with(per_page)
+        query.limit.return_value.offset.assert_called_once_with(
+            (page - 1) * per_page)
+
+    def test_count(self):
+        with pytest.raises(NotImplementedError):
+            sqlalchemy.CountStrategy().count(mock_query())
+
+
+class TestExactCount(object):
+
+    def test_count(self):
+        query = mock_query()
+
+        result = sqlalchemy.ExactCount().count(query)
+
+        assert result == (query.order_by.return_value.count.return_value,
+                          True)
+
+        query.order_by.assert_called_once_with(None)
+
+
+class TestCachedCount(object):
+
+    def test_count(self, models):
+        Post = models.Post
+
+        for i in range(5):
+            sqlalchemy.session.add(Post(title=str(i)))
+
+        sqlalchemy.session.commit()
+
+        instance = sqlalchemy.CachedCount(timeout=60)
+
+        query = Post.query.order_by(Post.id)
+
+        assert instance.count(query) == (5, True)
+
+        sqlalchemy.session.add(Post(title='5'))
+        sqlalchemy.session.commit()
+
+        assert instance.count(query) == (5, False)
+        assert instance.count(Post.query) == (5, False)
+        assert instance.count(query.filter(Post.id > 2)) == (4, True)
+
+        instance.cache.clear()
+
+        assert instance.count(query) == (6, True)
+
+
+class TestQueryKey(object):
+
+    def test_query_key(self, models):
+        Post = models.Post
+
+        statement_cache = cache.LRUCache()
+
+        with patch.object(sqlalchemy, 'statement_cache', statement_cache):
+            key = sqlalchemy._query_key(Post.query.filter_by(title=u'a'))
+
+            assert key == sqlalchemy._query_key(
+                Post.query.filter_by(title=u'a'))
+
+            other = sqlalchemy._query_key(Post.query.filter_by(title=u'b'))
+
+            assert other != key
+            assert other[0] == key[0]
+
+            assert sqlalchemy._query_key(Post.query) != key
+
+        assert statement_cache.info() == cache.CacheInfo(2, 2, 128, 2)
+
+    def test_query_key_uncached(self, models):
+        Post = models.Post
+
+        query = Post.query.filter_by(title=u'a')
+
+        with patch.object(type(query.statement), '_generate_cache_key',
+                          return_value=None):
+            key = sqlalchemy._query_key(query)
+
+        assert key == (str(query.statement.compile()), (('title_1', "'a'"),))
+
+
+class TestWindowCount(object):
+
+    @given(st.integers(1, 5), st.integers(1, 10))
+    def test_paginate(self, models, page, per_page):
+        Post = models.Post
+
+        if Post.query.count() == 0:
+            for i in range(12):
+                sqlalchemy.session.add(Post(title=str(i)))
+
+            sqlalchemy.session.commit()
+
+        query = Post.query.order_by(Post.id)
+
+        items, total, exact = sqlalchemy.WindowCount().paginate(
+            query, page, per_page)
+
+        assert items == query.limit(per_page) \
+            .offset((page - 1) * per_page).all()
+        assert total == 12
+        assert exact
+
+        rows, total, exact = sqlalchemy.WindowCount().paginate(
+            query.add_columns(Post.title), page, per_page)
+
+        assert rows == [(p, p.title) for p in items]
+        assert [r.title for r in rows] == [p.title for p in items]
+
+    def test_paginate_empty(self, models):
+        query = models.Post.query
+
+        assert sqlalchemy.WindowCount().paginate(query, 1, 10) == ([], 0,
+                                                                   True)
+
+
+class TestCappedCount(object):
+
+    @given(st.integers(0, 100), st.integers(0, 100))
+    def test_count(self, cap, total):
+        query = mock_query()
+
+        count = query.order_by.return_value.limit.return_value.count
+        count.return_value = min(total, cap + 1)
+
+        result = sqlalchemy.CappedCount(cap).count(query)
+
+        if total > cap:
+            assert result == (cap, False)
+        else:
+            assert result == (total, True)
+
+        query.order_by.assert_called_once_with(None)
+        query.order_by.return_value.limit.assert_called_once_with(cap + 1)
+
+
+class TestConcurrentCount(object):
+
+    @pytest.fixture
+    def session(self, request, db, models, tmpdir):
+        engine = create_engine('sqlite:///{0}'.format(tmpdir.join('test.db')),
+                               poolclass=QueuePool, pool_size=2,
+                               max_overflow=0, pool_timeout=1,
+                               connect_args={'check_same_thread': False})
+
+        models.Post.metadata.create_all(engine)
+
+        session = sqlalchemy.SignallingSession(db, bind=engine, binds={})
+        session.add_all([models.Post(title=str(i)) for i in range(5)])
+        session.commit()
+
+        request.addfinalizer(engine.dispose)
+        request.addfinalizer(session.close)
+
+        return session
+
+    def paginate(self, instance, query):
+        threads = []
+        count = instance.strategy.count
+
+        def record(query):
+            threads.append((current_thread(), query.session))
+
+            return count(query)
+
+        with patch.object(instance.strategy, 'count', side_effect=record):
+            items, total, exact = instance.paginate(query, 2, 2)
+
+        assert [item.title for item in items] == ['2', '3']
+        assert (total, exact) == (5, True)
+
+        thread, session = threads[0]
+
+        return thread is not current_thread() and session is not query.session
+
+    def test_paginate(self, models, session):
+        instance = sqlalchemy.ConcurrentCount()
+        query = session.query(models.Post).order_by(models.Post.id)
+
+        assert self.paginate(instance, query)
+        assert self.paginate(instance, query)
+        assert instance._slots.acquire(False)
+
+    def test_paginate_first(self, models, session):
+        instance = sqlalchemy.ConcurrentCount()
+        query = session.query(models.Post).order_by(models.Post.id)
+
+        with patch.object(instance, 'submit') as submit:
+            items, total, exact = instance.paginate(query, 1, 10)
+
+        assert [item.title for item in items] == ['0', '1', '2', '3', '4']
+        assert (total, exact) == (5, True)
+        assert not submit.called
+
+        with patch.object(instance.strategy, 'count',
+                          return_value=(5, True)) as count:
+            assert instance.paginate(query, 1, 2)[1:] == (5, True)
+
+        count.assert_called_once_with(query)
+
+    def test_paginate_strategy(self, models, session):
+        instance = sqlalchemy.ConcurrentCount(sqlalchemy.CappedCount(3))
+        query = session.query(models.Post).order_by(models.Post.id)
+
+        future = instance.submit(query)
+
+        assert future.result() == (3, False)
+
+    def test_paginate_memory(self, models):
+        instance = sqlalchemy.ConcurrentCount()
+
+        for i in range(5):
+            sqlalchemy.session.add(models.Post(title=str(i)))
+
+        sqlalchemy.session.commit()
+
+        assert not self.paginate(instance, models.Post.query.order_by(
+            models.Post.id))
+
+    def test_paginate_changes(self, models, session):
+        instance = sqlalchemy.ConcurrentCount()
+        query = session.query(models.Post).order_by(models.Post.id)
+
+        session.add(models.Post(title='5'))
+
+        assert instance.submit(query) is None
+
+        session.flush()
+
+        assert instance.submit(query) is None
+
+        session.rollback()
+
+        assert instance.submit(query).result() == (5, True)
+
+    def test_paginate_exhausted(self, models, session):
+        instance = sqlalchemy.ConcurrentCount(max_workers=1)
+        query = session.query(models.Post).order_by(models.Post.id)
+
+        instance._slots.acquire()
+
+        assert not self.paginate(instance, query)
+
+        instance._slots.release()
+
+        session.connection()
+        connection = session.bind.connect()
+
+        try:
+            assert not self.paginate(instance, query)
+        finally:
+            connection.close()
+
+    @pytest.mark.parametrize('url,poolclass,expected', [
+        ('sqlite://', None, True),
+        ('sqlite:///test.db', StaticPool, True),
+        ('sqlite:///test.db', NullPool, False)])
+    def test_shares_connection(self, url, poolclass, expected):
+        kwargs = {'poolclass': poolclass} if poolclass else {}
+        engine = create_engine(url, **kwargs)
+
+        assert sqlalchemy._shares_connection(engine) is expected
+        assert sqlalchemy._shares_connection(None)
+
+    def test_pool_exhausted(self, tmpdir):
+        engine = create_engine('sqlite:///{0}'.format(tmpdir.join('test.db')),
+                               poolclass=QueuePool, pool_size=1,
+                               max_overflow=-1)
+
+        assert not sqlalchemy._pool_exhausted(engine)
+
+        connection = engine.connect()
+
+        try:
+            assert sqlalchemy._pool_exhausted(engine)
+            assert not sqlalchemy._pool_exhausted(engine, 2)
+        finally:
+            connection.close()
+            engine.dispose()
+
+        assert not sqlalchemy._pool_exhausted(
+            create_engine('sqlite:///test.db', poolclass=NullPool))
+
+
+class TestBaseListView(object):
+
+    def test_get(self):
+        instance = sqlalchemy.BaseListView()
+        instance.get_query = get_query = Mock()
+        instance.get_context_data = get_context_data = Mock()
+        instance.create_response = render = Mock()
+
+        assert instance.get() == render.return_value
+        assert instance.object_list == get_query.return_value
+
+        render.assert_called_once_with(get_context_data.return_value)
+
+
+class TestListView(object):
+
+    def test_stream(self, flask, models):
+        Post = models.Post
+
+        for i in range(5):
+            sqlalchemy.session.add(Post(title=str(i)))
+
+        sqlalchemy.session.commit()
+
+        flask.jinja_loader = DictLoader({
+            'post_list.html': '{% for post in post_list %}{{ post.title }};'
+                              '{% endfor %}'})
+
+        flask.add_url_rule('/posts', view_func=sqlalchemy.ListView.as_view(
+            'post_list', model=Post, order_by=(Post.id,), stream=True,
+            yield_per=2))
+
+        response = flask.test_client().get('/posts')
+
+        assert response.is_streamed
+        assert response.headers.get('Content-Length') is None
+        assert response.get_data(as_text=True) == '0;1;2;3;4;'
+
+
+class TestStatementCacheStats(object):
+
+    def test_record(self):
+        instance = sqlalchemy.StatementCacheStats()
+
+        instance.record(sqlalchemy.DetailView, True)
+        instance.record(sqlalchemy.DetailView, False)
+        instance.record(sqlalchemy.DetailView, True)
+        instance.record(sqlalchemy.DetailView, True)
+        instance.record('list', False)
+
+        assert instance.info() == {
+            'flask_generic_views.sqlalchemy.DetailView':
+                sqlalchemy.StatementCacheInfo(3, 1, 0.75),
+            'list': sqlalchemy.StatementCacheInfo(0, 1, 0.0)}
+
+        instance.clear()
+
+        assert instance.info() == {}
+
+    def test_enable(self, flask, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(title=u'a'))
+        sqlalchemy.session.commit()
+
+        flask.jinja_loader = DictLoader({
+            'post_detail.html': '{{ post.title }}'})
+
+        view_func = sqlalchemy.DetailView.as_view('post_detail', model=Post)
+        flask.add_url_rule('/posts/<int:pk>', view_func=view_func)
+
+        instance = sqlalchemy.StatementCacheStats()
+        instance.enable()
+        instance.enable()
+
+        try:
+            for i in range(3):
+                response = flask.test_client().get('/posts/1')
+
+                assert response.get_data(as_text=True) == u'a'
+
+            sqlalchemy.session.query(Post).all()
+        finally:
+            instance.disable()
+            instance.disable()
+
+        flask.test_client().get('/posts/1')
+
+        info = instance.info()
+
+        assert list(info) == ['flask_generic_views.sqlalchemy.DetailView']
+        assert info['flask_generic_views.sqlalchemy.DetailView'].hits >= 2
+        assert sum(info['flask_generic_views.sqlalchemy.DetailView'][:2]) == 3
+
+
+class TestConditionalResponseMixin(object):
+
+    def test_detail(self, flask, db, models):
+        Post = models.Post
+
+        sqlalchemy.session.add(Post(title=u'a',
+                                    created_at=datetime(2016, 1, 1)))
+        sqlalchemy.session.commit()
+
+        flask.jinja_loader = DictLoader({
+            'post_detail.html': '{{ post.title }}'})
+
+        class PostDetailView(sqlalchemy.ConditionalResponseMixin,
+                             sqlalchemy.DetailView):
+            model = Post
+            updated_at_field = 'created_at'
+
+        flask.add_url_rule('/posts/<int:pk>',
+                           view_func=PostDetailView.as_view('detail'))
+
+        client = flask.test_client()
+
+        with QueryCounter(db.engine) as queries:
+            response = client.get('/posts/1')
+
+        assert response.data == b'a'
+        assert response.last_modified == datetime(2016, 1, 1)
+        assert len(queries) == 1
+
+        etag = response.headers['ETag']
+
+        with QueryCounter(db.engine) as queries:
+            response = client.get('/posts/1',
+                                  headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+        assert len(queries) == 1
+
+        response = client.get('/posts/1', headers={
+            'If-Modified-Since': 'Fri, 01 Jan 2016 00:00:00 GMT'})
+
+        assert response.status_code == 304
+
+        Post.query.get(1).created_at = datetime(2016, 1, 2)
+        sqlalchemy.session.commit()
+
+        response = client.get('/posts/1', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+        assert client.get('/posts/2').status_code == 404
+
+    def test_list(self, flask, db, models):
+        Comment = models.Comment
+
+        sqlalchemy.session.add_all([Comment(body=u'a'), Comment(body=u'b')])
+        sqlalchemy.session.commit()
+
+        flask.jinja_loader = DictLoader({
+            'comment_list.html': '{% for c in comment_list %}{{ c.body }};'
+                                 '{% endfor %}'})
+
+        class CommentListView(sqlalchemy.ConditionalResponseMixin,
+                              sqlalchemy.ListView):
+            model = Comment
+            version_field = 'version'
+
+        flask.add_url_rule('/comments',
+                           view_func=CommentListView.as_view('list'))
+
+        client = flask.test_client()
+
+        def etag(**kwargs):
+            response = client.get('/comments', headers=kwargs)
+
+            assert response.last_modified is None
 
-            if blueprint:
-                prefix = blueprint + '/'
-            else:
-                prefix = ''
+            return response.status_code, response.headers['ETag']
 
-            expected = '{0}{1}{2}.html'.format(prefix, name, suffix)
+        with QueryCounter(db.engine) as queries:
+            status, first = etag()
 
-            assert instance._format_template_name(name) == expected
+        assert status == 200
+        assert len(queries) == 1
+        assert etag(**{'If-None-Match': first}) == (304, first)
 
-    @given(st.text(), st.text(SLUG).map(camelize).map(str), st.text(SLUG),
-           st.text())
-    @example('', '', '', '')
-    @example('foo.html', '', '', '')
-    @example('',  'FooBar', '', '')
-    @example('', '', 'foo', '')
-    @example('', '', 'foo', 'bar')
-    def test_get_template_list(self, template_name, class_name, field, value):
-        model = class_name and type(class_name, (object,), {}) or None
+        Comment.query.get(2).version = 2
+        sqlalchemy.session.commit()
 
-        instance = sqlalchemy.SingleObjectTemplateResponseMixin()
-        instance.template_name_field = field or None
-        instance._format_template_name = fmt = Mock()
-        instance.get_model = get_model = Mock(return_value=model)
+        status, second = etag(**{'If-None-Match': first})
 
-        if field and value:
-            instance.object = Mock()
-            setattr(instance.object, field, value or None)
+        assert status == 200
+        assert second != first
 
-        p1 = patch.object(core.TemplateResponseMixin, 'get_template_list')
+        sqlalchemy.session.delete(Comment.query.get(1))
+        sqlalchemy.session.commit()
 
-        with p1 as m1:
-            if not template_name:
-                m1.side_effect = NotImplementedError
+        status, third = etag(**{'If-None-Match': second})
 
-                names = []
+        assert status == 200
+        assert third not in (first, second)
 
-                if field and value:
-                    names.append(value)
+    def test_list_paginated(self, flask, db, models):
+        Comment = models.Comment
 
-                if class_name:
-                    names.append(fmt.return_value)
+        sqlalchemy.session.add_all([Comment(body=u'a'), Comment(body=u'b'),
+                                    Comment(body=u'c')])
+        sqlalchemy.session.commit()
 
-                if names:
-                    assert instance.get_template_list() == names
+        flask.jinja_loader = DictLoader({'comment_list.html': ''})
 
-                    if class_name:
-                        fmt.assert_called_once_with(underscore(class_name))
-                else:
-                    with pytest.raises(NotImplementedError):
-                        instance.get_template_list()
+        class CommentListView(sqlalchemy.ConditionalResponseMixin,
+                              sqlalchemy.ListView):
+            model = Comment
+            version_field = 'version'
+            order_by = (Comment.id,)
+            per_page = 2
 
-                get_model.assert_called_once_with()
+        flask.add_url_rule('/comments',
+                           view_func=CommentListView.as_view('list'))
 
-            else:
-                assert instance.get_template_list() == m1.return_value
+        client = flask.test_client()
 
+        def etag(page, *etags):
+            with QueryCounter(db.engine) as queries:
+                response = client.get('/comments?page={0}'.format(page),
+                                      headers={'If-None-Match': etags})
 
-class TestMultipleObjectMixin(object):
+            assert len(queries) == 2
 
-    @given(st.booleans(), st.booleans())
-    def test_get_model(self, query, model):
-        instance = sqlalchemy.MultipleObjectMixin()
+            return response.status_code, response.headers['ETag']
 
-        if query:
-            instance.query = mock_query()
+        status, first = etag(1)
+        status, second = etag(2)
 
-        if model:
-            instance.model = Mock()
+        assert first != second
+        assert etag(1, first) == (304, first)
+        assert etag(2, second) == (304, second)
 
-        cls = instance.get_model()
+        Comment.query.get(3).version = 2
+        sqlalchemy.session.commit()
 
-        if query:
-            assert cls == instance.query._entities[0].entity_zero.class_
-        elif model:
-            assert cls == instance.model
-        else:
-            assert cls is None
+        assert etag(1, first) == (304, first)
+        assert etag(2, second)[0] == 200
 
-    @given(st.booleans(), st.booleans(), st.integers(0, 10))
-    @example(True, False, 0)
-    @example(False, True, 0)
-    @example(True, True, 0)
-    @example(True, False, 10)
-    @example(False, True, 10)
-    @example(True, True, 10)
-    @example(False, False, 0)
-    def test_get_query(self, model, query, order_by):
-        order_by = [Mock() for x in range(order_by)]
+        sqlalchemy.session.add(Comment(body=u'd'))
+        sqlalchemy.session.commit()
 
-        instance = sqlalchemy.MultipleObjectMixin()
-        instance.get_order_by = Mock(return_value=order_by)
+        assert etag(1, first)[0] == 200
 
-        if query:
-            instance.query = Mock()
+    def test_list_yield_per(self, flask, models):
+        Comment = models.Comment
 
-        if model:
-            instance.model = Mock()
+        sqlalchemy.session.add_all([Comment(body=u'a'), Comment(body=u'b')])
+        sqlalchemy.session.commit()
 
-        if not model and not query:
-            with pytest.raises(NotImplementedError) as excinfo:
-                instance.get_query()
+        flask.jinja_loader = DictLoader({'comment_list.html': ''})
 
-            error = ('MultipleObjectMixin requires either a definition of '
-                     "'query', 'model', or an implementation of 'get_query()'")
+        class CommentListView(sqlalchemy.ConditionalResponseMixin,
+                              sqlalchemy.ListView):
+            model = Comment
+            version_field = 'version'
+            yield_per = 10
 
-            assert excinfo.value.args[0] == error
-        else:
-            result = instance.get_query()
+        flask.add_url_rule('/comments',
+                           view_func=CommentListView.as_view('list'))
 
-            if query:
-                expected = instance.query
-            else:
-                expected = instance.model.query
+        client = flask.test_client()
 
-            if order_by:
-                expected.order_by.assert_called_once_with(*order_by)
-                expected = expected.order_by.return_value
+        etag = client.get('/comments').headers['ETag']
 
-            assert result == expected
+        assert client.get('/comments', headers={'If-None-Match': etag})\
+            .status_code == 304
 
-    def test_get_order_by(self):
-        instance = sqlalchemy.MultipleObjectMixin()
-        instance.order_by = Mock()
+    @pytest.mark.parametrize('last_modified', [
+        datetime(2016, 1, 1, 1, tzinfo=fixed_offset(3600)),
+        datetime(2016, 1, 1)])
+    def test_dispatch_request_last_modified(self, flask, last_modified):
+        class View(sqlalchemy.ConditionalResponseMixin, core.MethodView):
+            get_validators = Mock(return_value=(None, last_modified))
 
-        assert instance.get_order_by() == instance.order_by
+            def get(self):
+                return u'get'
 
-    def test_get_error_out(self):
-        instance = sqlalchemy.MultipleObjectMixin()
-        instance.error_out = Mock()
+        flask.add_url_rule('/', view_func=View.as_view('view'))
 
-        assert instance.get_error_out() == instance.error_out
+        client = flask.test_client()
 
-    def test_get_pagination(self):
-        instance = sqlalchemy.MultipleObjectMixin()
-        instance.pagination_class = Mock()
-        query = Mock()
-        page = Mock()
-        per_page = Mock()
-        total = Mock()
-        items = Mock()
+        response = client.get('/')
 
-        result = instance.get_pagination(
-            query, page, per_page, total, items)
+        assert response.headers['Last-Modified'] == \
+            'Fri, 01 Jan 2016 00:00:00 GMT'
 
-        assert result == instance.pagination_class.return_value
+        response = client.get('/', headers={
+            'If-Modified-Since': 'Fri, 01 Jan 2016 00:00:00 GMT'})
 
-        instance.pagination_class.assert_called_once_with(query, page,
-                                                          per_page, total,
-                                                          items)
+        assert response.status_code == 304
 
-    @given(st.text().filter(bool),
-           st.one_of(st.none(), st.integers(), st.text(DIGITS).filter(bool),
-                     st.text()),
-           st.one_of(st.none(), st.integers(), st.text(DIGITS).filter(bool),
-                     st.text()),
-           st.booleans())
-    @example('page', 1, None, False)
-    @example('page', None, 2, False)
-    @example('page', '3', '4', False)
-    @example('page', 'five', None, False)
-    @example('page', 6, 'sevent', False)
-    @example('page', 'eight', None, True)
-    @example('page', None, 'nine', True)
-    @example('page', -10, None, True)
-    @example('page', None, '-11', False)
-    def test_get_page(self, page_arg, view_arg_value, arg_value, error_out):
-        instance = sqlalchemy.MultipleObjectMixin()
-        instance.page_arg = page_arg
+        response = client.get('/', headers={
+            'If-Modified-Since': 'Thu, 31 Dec 2015 23:59:59 GMT'})
 
-        with patch.object(sqlalchemy, 'request') as m1:
-            if view_arg_value is not None:
-                m1.view_args = {page_arg: view_arg_value}
-            else:
-                m1.view_args = {}
+        assert response.status_code == 200
 
-            if arg_value is not None:
-                m1.args = {page_arg: arg_value}
-            else:
-                m1.args = {}
+    def test_get_validators(self):
+        instance = sqlalchemy.ConditionalResponseMixin()
+        instance.get_model = Mock()
 
-            if view_arg_value is not None:
-                expected = view_arg_value
-            elif arg_value is not None:
-                expected = arg_value
-            else:
-                expected = 1
+        assert instance.get_validators() == (None, None)
 
-            try:
-                expected = int(expected)
-            except ValueError:
-                pass
+    def test_dispatch_request(self, flask):
+        class View(sqlalchemy.ConditionalResponseMixin, core.MethodView):
+            get_validators = Mock(return_value=('abc', None))
 
-            print(repr(expected))
+            def get(self):
+                return u'get'
 
-            if error_out and (not isinstance(expected, integer_types) or
-                              expected < 1):
-                with pytest.raises(HTTPException) as excinfo:
-                    instance.get_page(error_out)
+            def post(self):
+                return u'post'
 
-                assert excinfo.value.code == 404
-            else:
-                if not isinstance(expected, integer_types) or expected < 1:
-                    expected = 1
+        flask.add_url_rule('/', view_func=View.as_view('view'))
 
-                assert instance.get_page(error_out) == expected
+        client = flask.test_client()
 
-    def test_get_per_page(self):
-        instance = sqlalchemy.MultipleObjectMixin()
-        instance.per_page = Mock()
+        assert client.get('/').headers['ETag'] == '"abc"'
+        assert client.get('/', headers={'If-None-Match': '"abc"'})\
+            .status_code == 304
+        assert client.post('/', headers={'If-None-Match': '"abc"'}).data \
+            == b'post'
 
-        assert instance.get_per_page() == instance.per_page
+        assert View.get_validators.call_count == 2
 
-    @given(st.booleans(), st.text(SLUG).map(camelize).map(str))
-    def test_get_context_object_name(self, name, class_name):
-        instance = sqlalchemy.MultipleObjectMixin()
-        instance.get_model = Mock(return_value=None)
 
-        if name:
-            instance.context_object_name = Mock()
+class TestExportView(object):
 
-        if class_name:
-            instance.get_model.return_value = type(class_name, (object,), {})
+    @pytest.mark.parametrize('values,expected', [
+        ((1, u'a', None), u'1,a,\r\n'),
+        ((u'a,b', u'say "hi"', u'x\ny'),
+         u'"a,b","say ""hi""","x\ny"\r\n'),
+        ((datetime(2016, 1, 2, 3, 4, 5), date(2016, 1, 2)),
+         u'2016-01-02T03:04:05,2016-01-02\r\n'),
+        ((u'\u2603',), u'\u2603\r\n'),
+    ])
+    def test_csv_line(self, values, expected):
+        assert sqlalchemy._csv_line(values) == expected
 
-        result = instance.get_context_object_name()
+    def test_get_row_columns(self, models):
+        Post = models.Post
 
-        if name:
-            assert result == instance.context_object_name
-        elif class_name:
-            assert result == '{0}_list'.format(underscore(class_name))
-        else:
-            assert result is None
+        instance = sqlalchemy.ExportView()
+        instance.model = Post
 
-    @given(st.integers(1), st.integers(1, 100), st.integers(0),
-           st.booleans())
-    def test_apply_pagination(self, page, per_page, total, error_out):
-        pages = int(ceil(total / float(per_page)))  # number of pages
-        count = max(min(total - per_page * (page - 1), per_page), 0)
+        assert instance.get_row_columns() == [
+            Post.id, Post.slug, Post.title, Post.body, Post.created_at,
+            Post.author_id]
 
-        instance = sqlalchemy.MultipleObjectMixin()
-        instance.get_page = Mock(return_value=page)
-        instance.get_pagination = Mock()
+        instance.fields = ('title', Post.created_at)
 
-        pagination = instance.get_pagination.return_value
-        pagination.pages = pages
+        assert instance.get_row_columns() == [Post.title, Post.created_at]
 
-        items = [object() for v in range(count)]
+    def test_get_export_format(self):
+        instance = sqlalchemy.ExportView()
+        instance.export_format = Mock()
 
-        object_list = mock_query()
-        object_list_limit = object_list.limit
-        object_list_offset = object_list_limit.return_value.offset
-        object_list_all = object_list_offset.return_value.all
-        object_list_order_by = object_list.order_by
-        object_list_count = object_list_order_by.return_value.count
+        assert instance.get_export_format() == instance.export_format
 
-        object_list_all.return_value = items
-        object_list_count.return_value = total
+    def test_get_batch_size(self):
+        instance = sqlalchemy.ExportView()
+        instance.batch_size = Mock()
 
-        offset = (page - 1) * per_page
+        assert instance.get_batch_size() == instance.batch_size
 
-        if count == 0 and page != 1 and error_out:
-            with pytest.raises(HTTPException) as excinfo:
-                instance.apply_pagination(object_list, per_page, error_out)
+    def test_get_filename(self):
+        instance = sqlalchemy.ExportView()
+        instance.filename = Mock()
 
-            assert excinfo.value.code == 404
-        else:
-            result = instance.apply_pagination(
-                object_list, per_page, error_out)
+        assert instance.get_filename() == instance.filename
 
-            assert result == (pagination, pagination.items, pages > 1)
+    @given(st.integers(0, 20), st.integers(1, 5))
+    def test_iter_batches(self, total, batch_size):
+        instance = sqlalchemy.ExportView()
+        instance.batch_size = batch_size
 
-            instance.get_pagination.assert_called_once_with(object_list, page,
-                                                            per_page, total,
-                                                            items)
+        query = Mock()
+        query.yield_per.return_value = iter(range(total))
 
-        object_list_limit.assert_called_once_with(per_page)
-        object_list_offset.assert_called_once_with(offset)
-        object_list_all.assert_called_once_with()
+        batches = list(instance.iter_batches(query))
 
-        instance.get_page.assert_called_once_with(error_out)
+        assert sum(batches, []) == list(range(total))
+        assert all(0 < len(b) <= batch_size for b in batches)
+        assert len(batches) == int(ceil(total / float(batch_size)))
 
-        if object_list_count.called:
-            object_list_order_by.assert_called_once_with(None)
+        query.yield_per.assert_called_once_with(batch_size)
 
-    @given(st.integers(0), st.booleans(), st.text(SLUG),
-           st.dictionaries(st.text(SLUG), st.text()))
-    def test_get_context_data(self, per_page, error_out, name, kwargs):
-        paginated = [Mock(), Mock(), Mock()]
+    def test_create_response_unknown_format(self):
+        instance = sqlalchemy.ExportView()
+        instance.export_format = 'xml'
 
-        instance = sqlalchemy.MultipleObjectMixin()
-        instance.object_list = query = mock_query()
-        instance.apply_pagination = pagination = Mock(return_value=paginated)
-        instance.get_context_object_name = Mock(return_value=name or None)
-        instance.get_per_page = Mock(return_value=per_page)
-        instance.get_error_out = Mock(return_value=error_out)
+        with pytest.raises(RuntimeError) as excinfo:
+            instance.create_response(Mock())
 
-        context = kwargs.copy()
+        error = "ExportView has unknown export format 'xml'"
 
-        if per_page > 0:
-            context.setdefault('pagination', paginated[0])
-            context.setdefault('object_list', paginated[1])
-            context.setdefault('is_paginated', paginated[2])
-            if name:
-                context.setdefault(name, paginated[1])
-        else:
-            context.setdefault('pagination', None)
-            context.setdefault('object_list', query.all.return_value)
-            context.setdefault('is_paginated', False)
-            if name:
-                context.setdefault(name, query.all.return_value)
+        assert excinfo.value.args[0] == error
 
-        with patch.object(core.ContextMixin, 'get_context_data') as m:
-            assert instance.get_context_data(**kwargs) == m.return_value
+    @pytest.mark.parametrize('export_format,mimetype,expected', [
+        ('csv', 'text/csv',
+         u'id,slug,created_at\r\n'
+         u'1,"a, b",2016-01-01T00:00:00\r\n'
+         u'2,,2016-01-02T00:00:00\r\n'
+         u'3,d,2016-01-03T00:00:00\r\n'),
+        ('ndjson', 'application/x-ndjson',
+         u'{"created_at": "2016-01-01T00:00:00", "id": 1, "slug": "a, b"}\n'
+         u'{"created_at": "2016-01-02T00:00:00", "id": 2, "slug": null}\n'
+         u'{"created_at": "2016-01-03T00:00:00", "id": 3, "slug": "d"}\n'),
+    ])
+    def test_get(self, flask, models, export_format, mimetype, expected):
+        Post = models.Post
 
-            m.assert_called_once_with(**context)
+        sqlalchemy.session.add_all([
+            Post(slug=u'a, b', created_at=datetime(2016, 1, 1)),
+            Post(slug=None, created_at=datetime(2016, 1, 2)),
+            Post(slug=u'd', created_at=datetime(2016, 1, 3))])
+        sqlalchemy.session.commit()
 
-            if per_page > 0:
-                pagination.assert_called_once_with(query, per_page, error_out)
+        view = sqlalchemy.ExportView.as_view(
+            'post_export', model=Post, order_by=(Post.id,),
+            fields=('id', 'slug', 'created_at'), batch_size=2,
+            export_format=export_format, filename='posts')
 
-        instance.get_context_object_name.assert_called_once_with()
+        flask.add_url_rule('/posts', view_func=view)
 
+        response = flask.test_client().get('/posts')
 
-class TestBaseListView(object):
+        assert response.is_streamed
+        assert response.mimetype == mimetype
+        assert response.headers['Content-Disposition'] == \
+            'attachment; filename=posts'
 
-    def test_get(self):
-        instance = sqlalchemy.BaseListView()
-        instance.get_query = get_query = Mock()
-        instance.get_context_data = get_context_data = Mock()
-        instance.create_response = render = Mock()
+        data = response.get_data(as_text=True)
 
-        assert instance.get() == render.return_value
-        assert instance.object_list == get_query.return_value
+        if export_format == 'ndjson':
+            data = u''.join(json.dumps(json.loads(line), sort_keys=True) +
+                            u'\n' for line in data.splitlines())
 
-        render.assert_called_once_with(get_context_data.return_value)
+        assert data == expected
 
 
 class TestMultipleObjectTemplateResponseMixin(object):
@@ -702,7 +3147,7 @@ class TestModelFormMixin(object):
         if form_class:
             instance.form_class = Mock()
 
-        with patch.object(sqlalchemy, 'model_form') as m:
+        with patch.object(sqlalchemy, 'get_model_form') as m:
             if form_class and fields:
                 with pytest.raises(RuntimeError) as excinfo:
                     instance.get_form_class()
@@ -725,8 +3170,21 @@ class TestModelFormMixin(object):
                 assert instance.get_form_class() == m.return_value
 
                 m.assert_called_once_with(instance.get_model.return_value,
-                                          sqlalchemy.session, Form,
-                                          instance.fields)
+                                          instance.fields, Form)
+
+    def test_get_form_class_options(self):
+        instance = sqlalchemy.ModelFormMixin()
+        instance.get_model = Mock()
+        instance.fields = ('foo', 'bar')
+        instance.form_base_class = base_class = Mock()
+        instance.form_options = {'field_args': {'foo': {'label': 'Foo'}}}
+
+        with patch.object(sqlalchemy, 'get_model_form') as m:
+            assert instance.get_form_class() == m.return_value
+
+            m.assert_called_once_with(instance.get_model.return_value,
+                                      instance.fields, base_class,
+                                      field_args={'foo': {'label': 'Foo'}})
 
     @given(st.booleans(), st.dictionaries(st.text(SLUG), st.text()))
     @example(True, {'foo': 'abc', 'bar': 'def'})
@@ -782,30 +3240,60 @@ class TestModelFormMixin(object):
         form = Mock()
 
         mocks = Mock()
-        with patch.object(sqlalchemy, 'session') as m1:
-            with patch.object(sqlalchemy.FormMixin, 'form_valid') as m2:
-                with patch.object(sqlalchemy, '_touch') as m3:
+        with patch.object(sqlalchemy, 'session') as m1, \
+                patch.object(sqlalchemy.FormMixin, 'form_valid') as m2, \
+                patch.object(sqlalchemy, '_column_values') as m3, \
+                patch.object(sqlalchemy, '_restore_column_values') as m4, \
+                patch.object(sqlalchemy, 'invalidate_tags') as m5, \
+                patch.object(sqlalchemy, '_expired_columns',
+                             return_value=['created_at']):
+            mocks.attach_mock(m1, 'session')
+            mocks.attach_mock(form, 'form')
+            mocks.attach_mock(m3, 'column_values')
+            mocks.attach_mock(m4, 'restore_column_values')
+            mocks.attach_mock(m5, 'invalidate_tags')
+
+            assert instance.form_valid(form) == m2.return_value
+
+            m2.assert_called_once_with(form)
+
+            calls = [call.form.populate_obj(instance.object),
+                     call.session.flush(),
+                     call.session.refresh(instance.object, ['created_at']),
+                     call.column_values(instance.object),
+                     call.session.commit(),
+                     call.restore_column_values(instance.object,
+                                                m3.return_value),
+                     call.invalidate_tags(instance.model)]
+
+            if not existing:
+                assert instance.object == instance.model.return_value
+
+                calls.insert(0, call.session.add(instance.object))
+            else:
+                assert instance.object == obj
 
-                    mocks.attach_mock(m1, 'session')
-                    mocks.attach_mock(form, 'form')
-                    mocks.attach_mock(m3, 'touch')
+            mocks.assert_has_calls(calls)
 
-                    assert instance.form_valid(form) == m2.return_value
+    def test_create_server_default(self, flask, db, models):
+        class Revision(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            title = db.Column(db.String(80))
+            status = db.Column(db.String(80), server_default='draft')
 
-                    m2.assert_called_once_with(form)
+        db.create_all()
 
-                    calls = [call.form.populate_obj(instance.object),
-                             call.session.commit(),
-                             call.touch(instance.object)]
+        flask.config['WTF_CSRF_ENABLED'] = False
+        flask.add_url_rule('/revisions/new', view_func=(
+            sqlalchemy.CreateView.as_view(
+                'revision_create', model=Revision, fields=('title',),
+                success_url='/revisions/{id}/{status}')))
 
-                    if not existing:
-                        assert instance.object == instance.model.return_value
+        client = flask.test_client()
 
-                        calls.insert(0, call.session.add(instance.object))
-                    else:
-                        assert instance.object == obj
+        response = client.post('/revisions/new', data={'title': 'new'})
 
-                    mocks.assert_has_calls(calls)
+        assert response.location.endswith('/revisions/1/draft')
 
 
 class TestBaseCreateView(object):
@@ -864,25 +3352,76 @@ class TestDeletionMixin(object):
         instance = sqlalchemy.DeletionMixin()
         instance.get_object = get_object = Mock()
         instance.get_success_url = get_success_url = Mock()
+        instance.get_model = get_model = Mock()
+        instance.get_passive_deletes = Mock(return_value=())
+        instance.record_write = record_write = Mock()
 
         mocks = Mock()
+        mocks.attach_mock(record_write, 'record_write')
+
+        with patch.object(sqlalchemy, 'session') as m1, \
+                patch.object(sqlalchemy, 'redirect') as m2, \
+                patch.object(sqlalchemy, '_column_values') as m3, \
+                patch.object(sqlalchemy, '_restore_column_values') as m4, \
+                patch.object(sqlalchemy, 'invalidate_tags') as m5:
+            mocks.attach_mock(m1, 'session')
+            mocks.attach_mock(m3, 'column_values')
+            mocks.attach_mock(m4, 'restore_column_values')
+            mocks.attach_mock(m5, 'invalidate_tags')
+
+            assert instance.delete() == m2.return_value
+            assert instance.object == get_object.return_value
+
+            calls = [call.column_values(instance.object),
+                     call.session.delete(instance.object),
+                     call.session.commit(),
+                     call.restore_column_values(instance.object,
+                                                m3.return_value),
+                     call.invalidate_tags(get_model.return_value),
+                     call.record_write()]
+
+            mocks.assert_has_calls(calls)
+
+            m2.assert_called_once_with(get_success_url.return_value)
+
+    def test_delete_by_query(self):
+        instance = sqlalchemy.DeletionMixin()
+        instance.get_delete_by_query = Mock(return_value=True)
+        instance.delete_object_by_query = delete_object_by_query = Mock()
+        instance.get_object = get_object = Mock()
+        instance.get_success_url = get_success_url = Mock()
+        instance.get_model = get_model = Mock()
+        instance.get_passive_deletes = Mock(return_value=())
+        instance.record_write = Mock()
+
+        with patch.object(sqlalchemy, 'session') as m1, \
+                patch.object(sqlalchemy, 'redirect') as m2, \
+                patch.object(sqlalchemy, 'invalidate_tags') as m3:
+            assert instance.delete() == m2.return_value
+            assert instance.object is None
+
+            m2.assert_called_once_with(get_success_url.return_value)
+            m3.assert_called_once_with(get_model.return_value)
+
+        delete_object_by_query.assert_called_once_with()
+        instance.record_write.assert_called_once_with()
+
+        assert not get_object.called
+        assert not m1.delete.called
+
+    def test_get_delete_by_query(self, models):
+        instance = sqlalchemy.DeletionMixin()
+        instance.get_model = Mock(return_value=models.Comment)
 
-        with patch.object(sqlalchemy, 'session') as m1:
-            with patch.object(sqlalchemy, 'redirect') as m2:
-                with patch.object(sqlalchemy, '_touch') as m3:
-                    mocks.attach_mock(m1, 'session')
-                    mocks.attach_mock(m3, 'touch')
+        assert not instance.get_delete_by_query()
 
-                    assert instance.delete() == m2.return_value
-                    assert instance.object == get_object.return_value
+        instance.delete_by_query = True
 
-                    calls = [call.session.delete(instance.object),
-                             call.session.commit(),
-                             call.touch(instance.object)]
+        assert instance.get_delete_by_query()
 
-                    mocks.assert_has_calls(calls)
+        instance.get_model.return_value = models.Post
 
-                    m2.assert_called_once_with(get_success_url.return_value)
+        assert not instance.get_delete_by_query()
 
     @given(st.dictionaries(st.text(SLUG), st.text()))
     @example({'bar': 'baz'})
@@ -919,3 +3458,754 @@ class TestDeletionMixin(object):
             assert excinfo.value.args[0] == error
         else:
             assert instance.get_success_url() == success_url.format(**kwargs)
+
+    def test_delete_invalidates_cache(self, flask, models):
+        Post = models.Post
+
+        sqlalchemy.session.add_all([Post(title=u'a'), Post(title=u'b')])
+        sqlalchemy.session.commit()
+
+        flask.jinja_loader = DictLoader({
+            'post_list.html': '{% for post in post_list %}{{ post.title }};'
+                              '{% endfor %}'})
+
+        class PostListView(core.ResponseCacheMixin, sqlalchemy.ListView):
+            response_cache = cache.TaggedCache()
+            model = Post
+            order_by = (Post.id,)
+
+        flask.add_url_rule('/posts', view_func=PostListView.as_view('list'))
+        flask.add_url_rule('/posts/<int:pk>/delete',
+                           view_func=sqlalchemy.DeleteView.as_view(
+                               'delete', model=Post, success_url='/posts'))
+
+        client = flask.test_client()
+
+        assert client.get('/posts').data == b'a;b;'
+
+        sqlalchemy.session.execute(Post.__table__.update().values(title='c'))
+        sqlalchemy.session.commit()
+
+        assert client.get('/posts').data == b'a;b;'
+
+        assert client.post('/posts/1/delete').status_code == 302
+
+        assert client.get('/posts').data == b'c;'
+
+
+class TestWriteQueries(object):
+
+    @pytest.fixture(autouse=True)
+    def setup(self, flask, db, models):
+        flask.config['WTF_CSRF_ENABLED'] = False
+
+        db.session.add(models.Comment(body=u'foo'))
+        db.session.commit()
+        db.session.remove()
+
+    def post(self, flask, db, rule, view_func, url, data=None):
+        flask.add_url_rule(rule, view_func=view_func)
+
+        with QueryCounter(db.engine) as queries:
+            response = flask.test_client().post(url, data=data)
+
+        assert response.status_code == 302
+
+        return response, queries
+
+    def test_create(self, flask, db, models):
+        view_func = sqlalchemy.CreateView.as_view(
+            'comment_create', model=models.Comment, fields=('body',),
+            success_url='/comments/{id}?version={version}')
+
+        response, queries = self.post(flask, db, '/comments/new', view_func,
+                                      '/comments/new', {'body': 'bar'})
+
+        assert response.location.endswith('/comments/2?version=1')
+        assert [q.split()[0] for q in queries.statements] == ['INSERT']
+
+    def test_update(self, flask, db, models):
+        view_func = sqlalchemy.UpdateView.as_view(
+            'comment_update', model=models.Comment, fields=('body',),
+            success_url='/comments/{id}?body={body}')
+
+        response, queries = self.post(flask, db, '/comments/<int:pk>/edit',
+                                      view_func, '/comments/1/edit',
+                                      {'body': 'bar'})
+
+        assert response.location.endswith('/comments/1?body=bar')
+        assert [q.split()[0] for q in queries.statements] == \
+            ['SELECT', 'UPDATE']
+
+    def test_delete(self, flask, db, models):
+        view_func = sqlalchemy.DeleteView.as_view(
+            'comment_delete', model=models.Comment,
+            success_url='/comments?deleted={body}')
+
+        response, queries = self.post(flask, db, '/comments/<int:pk>/delete',
+                                      view_func, '/comments/1/delete')
+
+        assert response.location.endswith('/comments?deleted=foo')
+        assert [q.split()[0] for q in queries.statements] == \
+            ['SELECT', 'DELETE']
+
+    def test_delete_by_query(self, flask, db, models):
+        Comment = models.Comment
+
+        object_cache = sqlalchemy.ObjectCache()
+
+        flask.jinja_loader = DictLoader({
+            'comment_detail.html': '{{ comment.body }}'})
+        flask.add_url_rule('/comments/<int:pk>', view_func=(
+            sqlalchemy.DetailView.as_view(
+                'comment_detail', model=Comment, object_cache=object_cache)))
+
+        client = flask.test_client()
+
+        assert client.get('/comments/1').get_data(as_text=True) == 'foo'
+
+        view_func = sqlalchemy.DeleteView.as_view(
+            'comment_delete', model=Comment, delete_by_query=True,
+            joined_load=('post',), success_url='/comments?deleted={pk}')
+
+        response, queries = self.post(flask, db, '/comments/<int:pk>/delete',
+                                      view_func, '/comments/1/delete')
+
+        assert response.location.endswith('/comments?deleted=1')
+        assert [q.split()[0] for q in queries.statements] == ['DELETE']
+
+        assert Comment.query.count() == 0
+        assert client.get('/comments/1').status_code == 404
+        assert client.post('/comments/1/delete').status_code == 404
+
+    def test_delete_by_query_scope(self, flask, db, models):
+        Comment = models.Comment
+
+        db.session.add(Comment(body=u'foo'))
+        db.session.commit()
+
+        class CommentDeleteView(sqlalchemy.DeleteView):
+            model = Comment
+            slug_field = 'body'
+            delete_by_query = True
+            success_url = '/comments?deleted={slug}'
+
+            def get_query(self):
+                query = super(CommentDeleteView, self).get_query()
+
+                return query.filter(Comment.id > 1)
+
+        flask.add_url_rule('/comments/<slug>/delete',
+                           view_func=CommentDeleteView.as_view('delete'))
+
+        flask.add_url_rule('/all/<slug>/delete', view_func=(
+            sqlalchemy.DeleteView.as_view(
+                'comment_delete_all', model=Comment, slug_field='body',
+                delete_by_query=True, success_url='/comments')))
+
+        flask.testing = True
+
+        client = flask.test_client()
+
+        with pytest.raises(MultipleResultsFound):
+            client.post('/all/foo/delete')
+
+        assert Comment.query.count() == 2
+
+        response = client.post('/comments/foo/delete')
+
+        assert response.status_code == 302
+        assert response.location.endswith('/comments?deleted=foo')
+
+        assert [c.id for c in Comment.query] == [1]
+
+        assert client.post('/comments/bar/delete').status_code == 404
+
+    def test_delete_by_query_string_pk(self, flask, db, models):
+        Comment = models.Comment
+
+        object_cache = sqlalchemy.ObjectCache()
+
+        flask.jinja_loader = DictLoader({
+            'comment_detail.html': '{{ comment.body }}'})
+        flask.add_url_rule('/comments/<pk>', view_func=(
+            sqlalchemy.DetailView.as_view(
+                'comment_detail', model=Comment, object_cache=object_cache)))
+        flask.add_url_rule('/comments/<pk>/delete', view_func=(
+            sqlalchemy.DeleteView.as_view(
+                'comment_delete', model=Comment, delete_by_query=True,
+                success_url='/comments')))
+
+        client = flask.test_client()
+
+        assert client.get('/comments/1').get_data(as_text=True) == 'foo'
+        assert client.post('/comments/1/delete').status_code == 302
+        assert client.get('/comments/1').status_code == 404
+
+    def test_delete_by_query_join(self, flask, db, models):
+        Post, Comment = models.Post, models.Comment
+
+        db.session.add_all([
+            Comment(body=u'bar', post=Post(title=u'old')),
+            Comment(body=u'baz', post=Post(title=u'new'))])
+        db.session.commit()
+
+        class CommentDeleteView(sqlalchemy.DeleteView):
+            model = Comment
+            delete_by_query = True
+            success_url = '/comments?deleted={pk}'
+
+            def get_query(self):
+                query = super(CommentDeleteView, self).get_query()
+
+                return query.join(Comment.post).filter(Post.title == u'old')
+
+        response, queries = self.post(
+            flask, db, '/comments/<int:pk>/delete',
+            CommentDeleteView.as_view('delete'), '/comments/2/delete')
+
+        assert response.location.endswith('/comments?deleted=2')
+        assert [q.split()[0] for q in queries.statements] == \
+            ['SELECT', 'DELETE']
+
+        assert [c.body for c in Comment.query.order_by('id')] == \
+            [u'foo', u'baz']
+
+        response = flask.test_client().post('/comments/3/delete')
+
+        assert response.status_code == 404
+
+        assert Comment.query.count() == 2
+
+
+class TestPassiveDeletes(object):
+
+    @pytest.fixture
+    def models(self, flask, db):
+        class Account(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            name = db.Column(db.String(80))
+
+        class Event(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            account_id = db.Column(db.Integer, db.ForeignKey(
+                Account.id, ondelete='CASCADE'))
+
+            account = db.relationship(Account, backref=db.backref(
+                'events', cascade='all, delete-orphan'))
+
+        class Login(db.Model):
+            id = db.Column(db.Integer, primary_key=True)
+            account_id = db.Column(db.Integer, db.ForeignKey(Account.id))
+
+            account = db.relationship(Account, backref='logins')
+
+        db.create_all()
+
+        # the database removes the account from logins, without the model
+        # declaring it.
+        with db.engine.connect() as conn:
+            conn.exec_driver_sql('DROP TABLE login')
+            conn.exec_driver_sql(
+                'CREATE TABLE login (id INTEGER PRIMARY KEY, account_id '
+                'INTEGER REFERENCES account (id) ON DELETE SET NULL)')
+            conn.exec_driver_sql('PRAGMA foreign_keys=ON')
+
+        for name in (u'foo', u'bar'):
+            account = Account(name=name)
+            account.events = [Event() for i in range(50)]
+            account.logins = [Login()]
+
+            db.session.add(account)
+
+        db.session.commit()
+        db.session.remove()
+
+        flask.config['WTF_CSRF_ENABLED'] = False
+
+        return Account, Event, Login
+
+    def delete(self, flask, db, models, **kwargs):
+        kwargs.setdefault('success_url', '/accounts?deleted={name}')
+
+        view_func = sqlalchemy.DeleteView.as_view(
+            'account_delete', model=models[0], **kwargs)
+
+        flask.add_url_rule('/accounts/<int:pk>/delete', view_func=view_func)
+
+        deleted = []
+
+        def record(sender, model, count, cascaded, nullified):
+            deleted.append((model, count, cascaded, nullified))
+
+        with signals.rows_deleted.connected_to(record), \
+                QueryCounter(db.engine) as queries:
+            response = flask.test_client().post('/accounts/1/delete')
+
+        assert response.status_code == 302
+
+        return response, queries, deleted
+
+    def test_get_passive_deletes(self, models):
+        Account, Event, Login = models
+
+        instance = sqlalchemy.DeletionMixin()
+        instance.get_model = Mock(return_value=Account)
+
+        assert instance.get_passive_deletes() == ()
+
+        instance.passive_deletes = True
+
+        assert instance.get_passive_deletes() == ('events',)
+
+        instance.passive_deletes = ('logins', 'events')
+
+        assert instance.get_passive_deletes() == ('events', 'logins')
+
+    def test_delete(self, flask, db, models):
+        Account, Event, Login = models
+
+        response, queries, deleted = self.delete(
+            flask, db, models, passive_deletes=('logins',))
+
+        assert response.location.endswith('/accounts?deleted=foo')
+
+        assert [q.split()[0] for q in queries.statements] == \
+            ['SELECT', 'SELECT', 'SELECT', 'DELETE']
+        assert not any('FROM event' in q and 'count' not in q
+                       for q in queries.statements)
+
+        assert deleted == [(Account, 1, {'events': 50}, {'logins': 1})]
+
+        assert Event.query.filter_by(account_id=1).count() == 0
+        assert Event.query.filter_by(account_id=2).count() == 50
+        assert Login.query.filter_by(account_id=None).count() == 1
+        assert [a.name for a in Account.query] == [u'bar']
+
+    def test_delete_by_query(self, flask, db, models):
+        Account, Event, Login = models
+
+        response, queries, deleted = self.delete(
+            flask, db, models, passive_deletes=('logins',),
+            delete_by_query=True,
+            success_url='/accounts?deleted={pk}')
+
+        assert response.location.endswith('/accounts?deleted=1')
+
+        assert [q.split()[0] for q in queries.statements] == \
+            ['SELECT', 'SELECT', 'DELETE']
+
+        assert deleted == [(Account, 1, {'events': 50}, {'logins': 1})]
+        assert Event.query.count() == 50
+
+    def test_delete_orm(self, flask, db, models):
+        Account, Event, Login = models
+
+        response, queries, deleted = self.delete(flask, db, models)
+
+        assert deleted == []
+        assert len(queries) > 4
+
+        assert Event.query.count() == 50
+        assert Login.query.filter_by(account_id=None).count() == 1
+
+    def test_bulk_delete(self, flask, db, models):
+        Account, Event, Login = models
+
+        view_func = sqlalchemy.BulkDeleteView.as_view(
+            'account_bulk_delete', model=Account, passive_deletes=('logins',),
+            success_url='/accounts?deleted={count}')
+
+        flask.add_url_rule('/accounts/delete', view_func=view_func)
+
+        deleted = []
+
+        def record(sender, model, count, cascaded, nullified):
+            deleted.append((model, count, cascaded, nullified))
+
+        with signals.rows_deleted.connected_to(record):
+            response = flask.test_client().post('/accounts/delete',
+                                                data={'pk': ['1', '2']})
+
+        assert response.location.endswith('/accounts?deleted=2')
+
+        assert deleted == [(Account, 2, {'events': 100}, {'logins': 2})]
+        assert Event.query.count() == 0
+        assert Login.query.filter_by(account_id=None).count() == 2
+
+
+class TestBulkDeleteView(object):
+
+    @pytest.fixture
+    def client(self, flask, db, models):
+        Comment = models.Comment
+
+        db.session.add_all([Comment(body=u'comment {0}'.format(i))
+                            for i in range(5)])
+        db.session.commit()
+        db.session.remove()
+
+        class CommentBulkDeleteView(sqlalchemy.BulkDeleteView):
+            model = Comment
+            order_by = (Comment.id,)
+            joined_load = ('post',)
+            chunk_size = 2
+            success_url = '/comments?deleted={count}'
+
+            def get_query(self):
+                query = super(CommentBulkDeleteView, self).get_query()
+
+                return query.filter(Comment.id > 1)
+
+        flask.add_url_rule('/comments/delete', view_func=(
+            CommentBulkDeleteView.as_view('comment_bulk_delete')))
+
+        return flask.test_client()
+
+    def ids(self, models):
+        return [c.id for c in models.Comment.query.order_by('id')]
+
+    def test_methods(self):
+        assert sqlalchemy.BulkDeleteView.methods == ['DELETE', 'POST']
+
+    def test_post(self, client, db, models):
+        object_cache = sqlalchemy.ObjectCache()
+        object_cache.set(models.Comment, {'id': 2},
+                         models.Comment.query.get(2))
+
+        with QueryCounter(db.engine) as queries:
+            response = client.post('/comments/delete',
+                                   data={'pk': ['2', '3', '5', '3']})
+
+        assert response.status_code == 302
+        assert response.location.endswith('/comments?deleted=3')
+
+        assert [q.split()[0] for q in queries.statements] == \
+            ['SELECT', 'DELETE', 'SELECT', 'DELETE']
+
+        assert self.ids(models) == [1, 4]
+        assert object_cache.get(db.session, models.Comment, {'id': 2}) \
+            is None
+
+    @pytest.mark.parametrize('data', [[2, 4], {'pk': [2, 4]}])
+    def test_json(self, client, models, data):
+        response = client.open('/comments/delete', method='DELETE',
+                               data=json.dumps(data),
+                               content_type='application/json')
+
+        assert response.location.endswith('/comments?deleted=2')
+
+        assert self.ids(models) == [1, 3, 5]
+
+    @pytest.mark.parametrize('pks', [['1', '2'], ['4', '9']])
+    def test_post_not_found(self, client, models, pks):
+        response = client.post('/comments/delete', data={'pk': pks})
+
+        assert response.status_code == 404
+
+        assert self.ids(models) == [1, 2, 3, 4, 5]
+
+    @pytest.mark.parametrize('kwargs', [
+        {},
+        {'data': {'pk': 'abc'}},
+        {'data': json.dumps({'pk': []}), 'content_type': 'application/json'},
+        {'data': json.dumps([[2]]), 'content_type': 'application/json'},
+        {'data': json.dumps([True]), 'content_type': 'application/json'},
+        {'data': json.dumps([2.5]), 'content_type': 'application/json'},
+    ])
+    def test_post_invalid(self, client, models, kwargs):
+        response = client.post('/comments/delete', **kwargs)
+
+        assert response.status_code == 400
+
+        assert self.ids(models) == [1, 2, 3, 4, 5]
+
+    def test_json_float(self, client, models):
+        response = client.post('/comments/delete', data=json.dumps([2.0]),
+                               content_type='application/json')
+
+        assert response.location.endswith('/comments?deleted=1')
+
+        assert self.ids(models) == [1, 3, 4, 5]
+
+    def test_post_model_query(self, client, flask, db, models):
+        flask.add_url_rule('/all/delete', view_func=(
+            sqlalchemy.BulkDeleteView.as_view(
+                'comment_bulk_delete_all', model=models.Comment,
+                row_mode=True, success_url='/comments?deleted={count}')))
+
+        with QueryCounter(db.engine) as queries:
+            response = flask.test_client().post('/all/delete',
+                                                data={'pk': ['1', '2']})
+
+        assert response.location.endswith('/comments?deleted=2')
+
+        assert [q.split()[0] for q in queries.statements] == ['DELETE']
+
+        assert self.ids(models) == [3, 4, 5]
+
+    @pytest.mark.parametrize('row_mode', [False, True])
+    def test_post_join(self, client, flask, db, models, row_mode):
+        Post, Comment = models.Post, models.Comment
+
+        db.session.add_all([
+            Comment(body=u'a', post=Post(title=u'old')),
+            Comment(body=u'b', post=Post(title=u'new'))])
+        db.session.commit()
+
+        class CommentBulkDeleteView(sqlalchemy.BulkDeleteView):
+            model = Comment
+            joined_load = ('post',)
+            success_url = '/comments?deleted={count}'
+
+            def get_query(self):
+                query = super(CommentBulkDeleteView, self).get_query()
+
+                return query.join(Comment.post).filter(Post.title == u'old')
+
+        flask.add_url_rule('/old/delete', view_func=(
+            CommentBulkDeleteView.as_view('old_delete', row_mode=row_mode)))
+
+        assert client.post('/old/delete', data={'pk': ['6', '7']}) \
+            .status_code == 404
+
+        response = client.post('/old/delete', data={'pk': ['6']})
+
+        assert response.location.endswith('/comments?deleted=1')
+
+        assert self.ids(models) == [1, 2, 3, 4, 5, 7]
+
+    def test_post_cascades(self, flask, db, models):
+        Post, Comment = models.Post, models.Comment
+
+        db.session.add_all([
+            Post(title=u'a', comments=[Comment(body=u'a')]),
+            Post(title=u'b', comments=[Comment(body=u'b')]),
+            Post(title=u'c')])
+        db.session.commit()
+        db.session.remove()
+
+        flask.add_url_rule('/posts/delete', view_func=(
+            sqlalchemy.BulkDeleteView.as_view(
+                'post_bulk_delete', model=Post, chunk_size=1,
+                success_url='/posts?deleted={count}')))
+
+        response = flask.test_client().post('/posts/delete',
+                                            data={'pk': ['1', '2']})
+
+        assert response.location.endswith('/posts?deleted=2')
+
+        assert [p.title for p in Post.query] == [u'c']
+        assert [c.post_id for c in Comment.query] == [None, None]
+
+    def test_get_pk_column(self, models):
+        instance = sqlalchemy.BulkDeletionMixin()
+        instance.get_model = Mock(return_value=models.Post)
+
+        assert instance.get_pk_column() is models.Post.id
+
+    def test_get_success_url(self):
+        instance = sqlalchemy.BulkDeletionMixin()
+
+        with pytest.raises(NotImplementedError) as excinfo:
+            instance.get_success_url()
+
+        error = ("BulkDeletionMixin requires either a definition of "
+                 "'success_url' or an implementation of 'get_success_url()'")
+
+        assert excinfo.value.args[0] == error
+
+        instance.success_url = '/posts?deleted={count}'
+        instance.deleted_count = 3
+
+        assert instance.get_success_url() == '/posts?deleted=3'
+
+
+class TestPurgeView(object):
+
+    @pytest.fixture
+    def view_class(self, db, models):
+        Comment = models.Comment
+
+        db.session.add_all([Comment(body=u'comment {0}'.format(i))
+                            for i in range(10)])
+        db.session.commit()
+        db.session.remove()
+
+        class CommentPurgeView(sqlalchemy.PurgeView):
+            model = Comment
+            order_by = (Comment.id,)
+            chunk_size = 3
+            min_chunk_size = 1
+            lock_time = 60
+
+            def get_query(self):
+                query = super(CommentPurgeView, self).get_query()
+
+                return query.filter(Comment.id > 2)
+
+        return CommentPurgeView
+
+    def ids(self, models):
+        return [c.id for c in models.Comment.query.order_by('id')]
+
+    def test_methods(self):
+        assert sqlalchemy.PurgeView.methods == ['DELETE', 'POST']
+
+    def test_iter_purge(self, db, models, view_class):
+        instance = view_class()
+
+        sent = []
+
+        def record(sender, **kwargs):
+            sent.append(kwargs['count'])
+
+        with QueryCounter(db.engine) as queries, \
+                signals.rows_deleted.connected_to(record):
+            progress = list(instance.iter_purge())
+
+        assert [(p.deleted, p.chunks, p.chunk_size) for p in progress] == \
+            [(3, 1, 3), (8, 2, 5)]
+        assert sent == [3, 5]
+
+        assert [q.split()[0] for q in queries.statements] == \
+            ['SELECT', 'DELETE', 'SELECT', 'DELETE', 'SELECT']
+
+        assert instance.deleted_count == 8
+        assert instance.purge_complete is True
+
+        assert self.ids(models) == [1, 2]
+
+    def test_iter_purge_interrupted(self, db, models, view_class):
+        progress = view_class().iter_purge()
+
+        assert next(progress).deleted == 3
+
+        progress.close()
+
+        assert self.ids(models) == [1, 2, 6, 7, 8, 9, 10]
+
+        assert view_class().purge() == 5
+
+        assert self.ids(models) == [1, 2]
+
+    def test_iter_purge_error(self, db, models, view_class):
+        instance = view_class()
+
+        delete_rows = sqlalchemy._delete_rows
+        calls = []
+
+        def side_effect(*args):
+            count = delete_rows(*args)
+            calls.append(count)
+
+            if len(calls) > 1:
+                raise RuntimeError()
+
+            return count
+
+        with patch.object(sqlalchemy, '_delete_rows', side_effect=side_effect):
+            with pytest.raises(RuntimeError):
+                list(instance.iter_purge())
+
+        assert calls == [(3, {}, {}), (5, {}, {})]
+        assert instance.deleted_count == 3
+        assert instance.purge_complete is False
+
+        db.session.remove()
+
+        assert self.ids(models) == [1, 2, 6, 7, 8, 9, 10]
+
+    def test_iter_purge_time_limit(self, models, view_class):
+        instance = view_class(time_limit=10)
+
+        with patch.object(sqlalchemy, '_time') as m:
+            m.time.side_effect = [0, 0, 0, 1, 11]
+
+            progress = list(instance.iter_purge())
+
+        assert [p.seconds for p in progress] == [1]
+        assert instance.purge_complete is False
+
+        assert self.ids(models) == [1, 2, 6, 7, 8, 9, 10]
+
+    def test_iter_purge_cascades(self, db, models):
+        Post, Comment = models.Post, models.Comment
+
+        db.session.add_all([
+            Post(title=u'a', comments=[Comment(body=u'a')]),
+            Post(title=u'b', comments=[Comment(body=u'b')]),
+            Post(title=u'c')])
+        db.session.commit()
+        db.session.remove()
+
+        instance = sqlalchemy.PurgeView(model=Post, chunk_size=2)
+
+        assert instance.purge() == 3
+
+        assert Post.query.count() == 0
+        assert [c.post_id for c in Comment.query] == [None, None]
+
+    @pytest.mark.parametrize('row_mode', [False, True])
+    def test_iter_purge_join(self, db, models, row_mode):
+        Post, Comment = models.Post, models.Comment
+
+        db.session.add_all([
+            Comment(body=u'a', post=Post(title=u'old')),
+            Comment(body=u'b', post=Post(title=u'old')),
+            Comment(body=u'c', post=Post(title=u'new'))])
+        db.session.commit()
+        db.session.remove()
+
+        class CommentPurgeView(sqlalchemy.PurgeView):
+            model = Comment
+            order_by = (Comment.body,)
+            joined_load = ('post',)
+            chunk_size = 1
+
+            def get_query(self):
+                query = super(CommentPurgeView, self).get_query()
+
+                return query.join(Comment.post).filter(Post.title == u'old')
+
+        instance = CommentPurgeView(row_mode=row_mode)
+
+        assert [p.deleted for p in instance.iter_purge()] == [1, 2]
+
+        assert [c.body for c in Comment.query] == [u'c']
+
+    @pytest.mark.parametrize('chunk_size,seconds,expected', [
+        (100, 0.5, 100),
+        (100, 1.0, 50),
+        (100, 0.1, 200),
+        (100, 0, 200),
+        (100, 100, 10),
+        (8000, 0.1, 10000),
+    ])
+    def test_get_next_chunk_size(self, chunk_size, seconds, expected):
+        instance = sqlalchemy.PurgeMixin()
+
+        assert instance.get_next_chunk_size(chunk_size, seconds) == expected
+
+    def test_get_chunk_size(self):
+        instance = sqlalchemy.PurgeMixin()
+        instance.chunk_size = 50
+
+        assert instance.get_chunk_size() == 50
+
+    def test_post(self, flask, models, view_class):
+        flask.add_url_rule('/comments/purge',
+                           view_func=view_class.as_view('comment_purge'))
+
+        response = flask.test_client().post('/comments/purge')
+
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+
+        lines = [json.loads(line) for line in
+                 response.get_data(as_text=True).splitlines()]
+
+        assert [line['deleted'] for line in lines] == [3, 8, 8]
+        assert lines[-1] == {'deleted': 8, 'complete': True}
+
+        assert self.ids(models) == [1, 2]
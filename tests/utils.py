@@ -7,3 +7,28 @@ DIGITS = string.digits
 
 def nondigit(value):
     return value and not value.isdigit()
+
+
+class QueryCounter(object):
+    """Counts the SQL statements executed by ``engine`` while active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def __enter__(self):
+        from sqlalchemy import event
+
+        event.listen(self.engine, 'before_cursor_execute', self._execute)
+        return self
+
+    def __exit__(self, *exc_info):
+        from sqlalchemy import event
+
+        event.remove(self.engine, 'before_cursor_execute', self._execute)
+
+    def __len__(self):
+        return len(self.statements)
+
+    def _execute(self, conn, cursor, statement, *args):
+        self.statements.append(statement)